@@ -3,6 +3,8 @@ const cors = require('cors');
 const { spawn } = require('child_process');
 const path = require('path');
 const fs = require('fs');
+const os = require('os');
+const { Readable } = require('stream');
 const csv = require('csv-parser');
 
 const app = express();
@@ -57,67 +59,521 @@ app.get('/api/metrics', (req, res) => {
     }
 });
 
+// ---------------------------------------------------------------------------
+// Optimization engine bridge
+// ---------------------------------------------------------------------------
+// By default queries go to long-lived engine/optimization_server.py workers
+// (JSON lines over stdin/stdout) that keep the Phase 3 data in memory, so
+// concurrent users are served in parallel by up to OPTIMIZER_WORKERS
+// processes (default: min(4, CPUs)). solver: "exact" queries, which may run
+// for EXACT_TIME_LIMIT seconds, go to their own OPTIMIZER_EXACT_WORKERS
+// pool so they never hold up slider moves. A worker that dies before
+// answering anything (e.g. no Phase 3 data yet) is respawned at most
+// OPTIMIZER_MAX_START_FAILURES times in a row; after that its requests get
+// a 503 with its stderr tail until OPTIMIZER_RESTART_COOLDOWN_MS has passed.
+// OPTIMIZER_MODE=spawn restores the old one-process-per-request behaviour.
+const SERVER_SCRIPT_PATH = path.join(__dirname, '..', 'engine', 'optimization_server.py');
+const OPTIMIZER_MODE = process.env.OPTIMIZER_MODE || 'persistent';
+const OPTIMIZER_WORKERS = Math.max(1, parseInt(process.env.OPTIMIZER_WORKERS || String(Math.min(4, os.cpus().length)), 10));
+const OPTIMIZER_EXACT_WORKERS = Math.max(1, parseInt(process.env.OPTIMIZER_EXACT_WORKERS || '1', 10));
+const STDERR_TAIL_LINES = 20;
+const OPTIMIZER_MAX_START_FAILURES = 3;
+const OPTIMIZER_RESTART_COOLDOWN_MS = 30000;
+
+class OptimizerWorker {
+    constructor() {
+        this.pending = new Map();
+        this.nextId = 1;
+        this.startFailures = 0;
+        this.failedAt = 0;
+        this.start();
+    }
+
+    start() {
+        this.buffer = '';
+        this.stderrTail = [];
+        this.alive = true;
+        this.answered = false;
+        const proc = spawn(PYTHON_CMD, [SERVER_SCRIPT_PATH], { cwd: path.join(__dirname, '..') });
+        this.proc = proc;
+        // Events of a process already replaced by a respawn are ignored
+        const exit = (reason) => {
+            if (proc === this.proc) this.onExit(reason);
+        };
+
+        this.proc.stdout.on('data', (chunk) => {
+            this.buffer += chunk.toString();
+            let newline;
+            while ((newline = this.buffer.indexOf('\n')) >= 0) {
+                const line = this.buffer.slice(0, newline);
+                this.buffer = this.buffer.slice(newline + 1);
+                if (line.trim()) this.onResponse(line);
+            }
+        });
+        this.proc.stderr.on('data', (data) => {
+            process.stderr.write(data);
+            // Last lines kept for the error details if the worker dies
+            this.stderrTail.push(...data.toString().split('\n').filter((line) => line.trim()));
+            this.stderrTail.splice(0, this.stderrTail.length - STDERR_TAIL_LINES);
+        });
+        this.proc.on('error', (err) => exit(err.message));
+        this.proc.on('close', (code) => exit(`exited with code ${code}`));
+        // A write to a worker that just died fails with EPIPE; reject its requests instead of crashing
+        this.proc.stdin.on('error', (err) => exit(err.message));
+    }
+
+    onResponse(line) {
+        let msg;
+        try {
+            msg = JSON.parse(line);
+        } catch (e) {
+            console.error('Unparseable optimizer response:', line);
+            return;
+        }
+        this.answered = true;
+        const entry = this.pending.get(msg.id);
+        if (!entry) return;
+        this.pending.delete(msg.id);
+        if (msg.error) entry.reject(new Error(msg.error));
+        else entry.resolve(msg.result);
+    }
+
+    onExit(reason) {
+        if (!this.alive) return;
+        this.alive = false;
+        if (this.answered) {
+            this.startFailures = 0;
+        } else {
+            this.startFailures++;
+            this.failedAt = Date.now();
+        }
+        console.error(`Optimizer worker ${reason}`);
+        const details = this.stderrTail.join('\n');
+        for (const { reject } of this.pending.values()) {
+            reject(Object.assign(new Error(`Optimizer worker ${reason}`), { details }));
+        }
+        this.pending.clear();
+    }
+
+    request(params, method = 'optimize') {
+        if (!this.alive) {
+            if (this.startFailures >= OPTIMIZER_MAX_START_FAILURES &&
+                Date.now() - this.failedAt < OPTIMIZER_RESTART_COOLDOWN_MS) {
+                return Promise.reject(Object.assign(
+                    new Error(`Optimizer worker failed to start ${this.startFailures} times; not restarting yet`),
+                    { status: 503, details: this.stderrTail.join('\n') },
+                ));
+            }
+            this.start();
+        }
+        const id = this.nextId++;
+        return new Promise((resolve, reject) => {
+            this.pending.set(id, { resolve, reject });
+            this.proc.stdin.write(JSON.stringify({ id, method, params }) + '\n');
+        });
+    }
+}
+
+const optimizerPools = {};
+
+function getOptimizerPool(name = 'default') {
+    if (!optimizerPools[name]) {
+        const size = name === 'exact' ? OPTIMIZER_EXACT_WORKERS : OPTIMIZER_WORKERS;
+        optimizerPools[name] = Array.from({ length: size }, () => new OptimizerWorker());
+    }
+    return optimizerPools[name];
+}
+
+function runPersistentOptimization(params, method = 'optimize') {
+    // Least-loaded worker; exact-solver queries have their own pool
+    const pool = getOptimizerPool(params.solver === 'exact' ? 'exact' : 'default');
+    const worker = pool.reduce((a, b) => (b.pending.size < a.pending.size ? b : a));
+    return worker.request(params, method);
+}
+
+function runSpawnedOptimization({
+    budget, alpha, equal_distribution, solver, one_per_msme, constraints, rebalance,
+    layout, unselected_limit, unselected_offset, justifications, ranks, budgets,
+}) {
+    return new Promise((resolve, reject) => {
+        const args = [SCRIPT_PATH, '--alpha', alpha.toString(), '--json-out'];
+        if (budget !== undefined) args.push('--budget', budget.toString());
+        if (budgets) args.push('--frontier', budgets);
+        if (equal_distribution) args.push('--equal-distribution');
+        if (solver) args.push('--solver', solver);
+        if (one_per_msme) args.push('--one-per-msme');
+        if (rebalance) args.push('--rebalance');
+        for (const spec of constraints || []) args.push('--constraint', spec);
+        if (layout) args.push('--json-layout', layout);
+        if (justifications) args.push('--justifications', justifications);
+        if (ranks) args.push('--justify-ranks', ranks.join(','));
+        if (unselected_limit !== null && unselected_limit !== undefined) args.push('--unselected-limit', String(unselected_limit));
+        if (unselected_offset) args.push('--unselected-offset', String(unselected_offset));
+
+        // Spawn the python process with the correct arguments to output JSON
+        const pythonProcess = spawn(PYTHON_CMD, args, {
+            // Set cwd to the parent directory where the CSVs live
+            cwd: path.join(__dirname, '..')
+        });
+
+        let dataString = '';
+        let errorString = '';
+
+        pythonProcess.stdout.on('data', (data) => {
+            dataString += data.toString();
+        });
+
+        pythonProcess.stderr.on('data', (data) => {
+            errorString += data.toString();
+        });
+
+        pythonProcess.on('close', (code) => {
+            if (code !== 0) {
+                console.error(`Python script exited with code ${code}`);
+                console.error(errorString);
+                return reject(Object.assign(new Error('Simulation failed'), { details: errorString }));
+            }
+
+            try {
+                // Find the JSON block if there are leftover print statements
+                // The python script should now output cleanly because of --json-out
+                const startIndex = dataString.indexOf('{');
+                const jsonStr = dataString.substring(startIndex);
+                resolve(JSON.parse(jsonStr));
+            } catch (e) {
+                console.error("Failed to parse JSON from Python output.");
+                console.error("Output was:", dataString);
+                reject(Object.assign(new Error('Failed to parse simulation results'), { output: dataString }));
+            }
+        });
+    });
+}
+
 // Optimization Simulation Endpoint
-app.post('/api/optimize', (req, res) => {
-    const { budget = 50000000, alpha = 0.6 } = req.body;
+app.post('/api/optimize', async (req, res) => {
+    const {
+        budget = 50000000, alpha = 0.6, equal_distribution = false, solver = 'greedy',
+        one_per_msme = false, constraints = [], rebalance = false,
+        layout = 'records', unselected_limit = null, unselected_offset = 0, justifications = 'lazy',
+    } = req.body;
+    const params = {
+        budget, alpha, equal_distribution, solver, one_per_msme, constraints, rebalance,
+        layout, unselected_limit, unselected_offset, justifications,
+    };
 
     console.log(`Running simulation -> Budget: ₹${budget}, Alpha: ${alpha}`);
 
-    // Spawn the python process with the correct arguments to output JSON
-    const pythonProcess = spawn(PYTHON_CMD, [
-        SCRIPT_PATH,
-        '--budget', budget.toString(),
-        '--alpha', alpha.toString(),
-        '--json-out'
-    ], {
-        // Set cwd to the parent directory where the CSVs live
-        cwd: path.join(__dirname, '..')
-    });
+    try {
+        const result = OPTIMIZER_MODE === 'spawn'
+            ? await runSpawnedOptimization(params)
+            : await runPersistentOptimization(params);
+        res.json(result);
+    } catch (e) {
+        res.status(e.status || 500).json({ error: e.message, details: e.details, output: e.output });
+    }
+});
 
-    let dataString = '';
-    let errorString = '';
+// Decision justification text for the selected rows being viewed, by
+// Selection_Rank: POST the same body as /api/optimize plus "ranks": [1, 2, ...]
+app.post('/api/optimize/justify', async (req, res) => {
+    const {
+        budget = 50000000, alpha = 0.6, equal_distribution = false, solver = 'greedy',
+        one_per_msme = false, constraints = [], rebalance = false, ranks = [],
+    } = req.body;
+    const params = { budget, alpha, equal_distribution, solver, one_per_msme, constraints, rebalance, ranks };
 
-    pythonProcess.stdout.on('data', (data) => {
-        dataString += data.toString();
-    });
+    try {
+        const result = OPTIMIZER_MODE === 'spawn'
+            ? await runSpawnedOptimization(params)
+            : await runPersistentOptimization(params, 'justify');
+        res.json(result);
+    } catch (e) {
+        res.status(e.status || 500).json({ error: e.message, details: e.details, output: e.output });
+    }
+});
 
-    pythonProcess.stderr.on('data', (data) => {
-        errorString += data.toString();
-    });
+// Budget frontier: the global greedy outcome (pairs funded, jobs, revenue
+// gain, utilization) at every budget level of "budgets" (MIN:MAX:STEP,
+// default: the dashboard slider's range), computed in one pass so moving the
+// budget slider is a lookup into this table.
+app.post('/api/optimize/frontier', async (req, res) => {
+    const { alpha = 0.6, budgets = '10000000:500000000:5000000', layout = 'columns' } = req.body;
+    const params = { alpha, budgets, layout };
+
+    try {
+        const result = OPTIMIZER_MODE === 'spawn'
+            ? await runSpawnedOptimization(params)
+            : await runPersistentOptimization(params, 'frontier');
+        res.json(result);
+    } catch (e) {
+        res.status(e.status || 500).json({ error: e.message, details: e.details, output: e.output });
+    }
+});
+
+// ---------------------------------------------------------------------------
+// MSME search index
+// ---------------------------------------------------------------------------
+// growth_model.py writes msme_predictions.csv.search (engine/search_index.py):
+// sorted MSME_ID prefix keys, postings for Sector / Location_Type /
+// Predicted_Growth_Category and the Growth_Score order. It is loaded once
+// (again only when rebuilt), and a query walks its smallest candidate list
+// from the cursor until a page is full, so latency does not depend on the
+// registry size. Without a usable index (missing, or built for a different
+// CSV: its size or mtime changed) the route scans the CSV as before.
+const PREDICTIONS_PATH = path.join(__dirname, '..', 'data', 'msme_predictions.csv');
+const SEARCH_INDEX_PATH = `${PREDICTIONS_PATH}.search`;
+const SEARCH_FIELDS = { sector: 'Sector', location: 'Location_Type', category: 'Predicted_Growth_Category' };
+const SEARCH_PAGE_SIZE = 30;
+const SEARCH_MAX_PAGE_SIZE = 500;
+const SEARCH_MATERIALIZE_LIMIT = 10000;
+const TYPED_ARRAYS = { '<u2': Uint16Array, '<u4': Uint32Array, '<u8': BigUint64Array };
+let searchIndex = null;
+
+function loadSearchIndex() {
+    let stat, dataStat, dataSize;
+    try {
+        stat = fs.statSync(SEARCH_INDEX_PATH);
+        dataStat = fs.statSync(PREDICTIONS_PATH, { bigint: true });
+        dataSize = Number(dataStat.size);
+    } catch (e) {
+        return null;
+    }
+    if (searchIndex && searchIndex.mtimeMs === stat.mtimeMs && searchIndex.dataSize === dataSize &&
+        searchIndex.dataMtimeNs === dataStat.mtimeNs) {
+        return searchIndex;
+    }
+
+    searchIndex = null;
+    const file = fs.readFileSync(SEARCH_INDEX_PATH);
+    if (file.toString('latin1', 0, 4) !== 'CZSX' || file.readUInt16LE(4) !== 3) return null;
+    const headerLength = file.readUInt32LE(8);
+    const header = JSON.parse(file.toString('utf8', 12, 12 + headerLength));
+    // stale: predictions rewritten since, even to the same size
+    if (header.data_size !== dataSize || BigInt(header.data_mtime_ns) !== dataStat.mtimeNs) return null;
+
+    // Typed arrays need aligned offsets; copy if the file buffer is not
+    const buf = file.byteOffset % 8 === 0 ? file : Buffer.alloc(file.length).fill(file);
+    const base = buf.byteOffset + 12 + headerLength;
+    const arrays = {};
+    for (const [name, { offset, dtype, length }] of Object.entries(header.arrays)) {
+        arrays[name] = dtype.startsWith('|S')
+            ? buf.subarray(base - buf.byteOffset + offset, base - buf.byteOffset + offset + length * header.key_width)
+            : new TYPED_ARRAYS[dtype](buf.buffer, base + offset, length);
+    }
+
+    const fd = fs.openSync(PREDICTIONS_PATH, 'r');
+    const csvHeader = Buffer.alloc(Number(arrays.row_offset[0]));
+    fs.readSync(fd, csvHeader, 0, csvHeader.length, 0);
+    fs.closeSync(fd);
 
-    pythonProcess.on('close', (code) => {
-        if (code !== 0) {
-            console.error(`Python script exited with code ${code}`);
-            console.error(errorString);
-            return res.status(500).json({ error: 'Simulation failed', details: errorString });
+    searchIndex = {
+        ...header, arrays, csvHeader, dataSize,
+        mtimeMs: stat.mtimeMs,
+        dataMtimeNs: dataStat.mtimeNs,
+        build: `${header.rows}.${dataSize}.${stat.mtimeMs}`,
+    };
+    return searchIndex;
+}
+
+// [lo, hi) range of the sorted ID keys starting with prefix
+function idKeyRange(index, prefix) {
+    const keys = index.arrays.id_keys;
+    const width = index.key_width;
+    const target = Buffer.from(prefix, 'latin1');
+    const keyPrefix = (i) => keys.subarray(i * width, i * width + Math.min(width, target.length));
+    const bound = (upper) => {
+        let lo = 0, hi = keys.length / width;
+        while (lo < hi) {
+            const mid = (lo + hi) >>> 1;
+            const cmp = Buffer.compare(keyPrefix(mid), target);
+            if (cmp < 0 || (upper && cmp === 0)) lo = mid + 1;
+            else hi = mid;
         }
+        return lo;
+    };
+    if (target.length > width) return [0, 0];
+    return [bound(false), bound(true)];
+}
+
+// Rows in the requested order, addressed by position: at(i) is a position, increasing in i
+function sortedPositions(index, order, rows, ranks) {
+    const n = index.rows;
+    if (order === 'row') return { length: rows.length, at: (i) => rows[i] };
+    if (order === 'desc') return { length: ranks.length, at: (i) => ranks[i] };
+    return { length: ranks.length, at: (i) => n - 1 - ranks[ranks.length - 1 - i] };
+}
 
+function searchPredictions(index, { q, filters, order, start, limit }) {
+    const { arrays, rows: n } = index;
+    const rowAt = order === 'row' ? (p) => p
+        : order === 'desc' ? (p) => arrays.score_order[p] : (p) => arrays.score_order[n - 1 - p];
+    const positionOf = order === 'row' ? (r) => r
+        : order === 'desc' ? (r) => arrays.score_rank[r] : (r) => n - 1 - arrays.score_rank[r];
+
+    // Exact filters: one code per field
+    const required = [];
+    for (const [param, field] of Object.entries(SEARCH_FIELDS)) {
+        if (filters[param] === undefined) continue;
+        const code = index.fields[field].findIndex((v) => v.toLowerCase() === filters[param].toLowerCase());
+        if (code < 0) return { rows: [], next: null };
+        required.push({ field, code });
+    }
+
+    // Free text: prefix of the ID, its number or its number without leading
+    // zeros, or a substring of a categorical value
+    let text = null;
+    if (q && q !== '*') {
+        const [lo, hi] = idKeyRange(index, q);
+        const values = Object.values(SEARCH_FIELDS).map((field) => ({
+            field,
+            codes: index.fields[field].flatMap((v, code) => (v.toLowerCase().includes(q) ? [code] : [])),
+        }));
+        text = { lo, hi, values };
+    }
+
+    const matches = (row) => {
+        for (const { field, code } of required) {
+            if (arrays[`${field}.codes`][row] !== code) return false;
+        }
+        if (!text) return true;
+        for (let k = 3 * row; k < 3 * row + 3; k++) {
+            if (arrays.row_keys[k] >= text.lo && arrays.row_keys[k] < text.hi) return true;
+        }
+        return text.values.some(({ field, codes }) => codes.includes(arrays[`${field}.codes`][row]));
+    };
+
+    // Drive the walk from the smallest candidate list: a filter's postings,
+    // the free-text hits when few enough to collect, or every row
+    let driver = { length: n, at: (i) => i };
+    for (const { field, code } of required) {
+        const lo = arrays[`${field}.indptr`][code], hi = arrays[`${field}.indptr`][code + 1];
+        if (hi - lo < driver.length) {
+            driver = sortedPositions(index, order,
+                arrays[`${field}.rows`].subarray(lo, hi), arrays[`${field}.ranks`].subarray(lo, hi));
+        }
+    }
+    if (text) {
+        let size = text.hi - text.lo;
+        for (const { field, codes } of text.values) {
+            for (const code of codes) size += arrays[`${field}.indptr`][code + 1] - arrays[`${field}.indptr`][code];
+        }
+        if (size <= SEARCH_MATERIALIZE_LIMIT && size < driver.length) {
+            const hits = new Set();
+            for (let k = text.lo; k < text.hi; k++) hits.add(positionOf(arrays.id_key_row[k]));
+            for (const { field, codes } of text.values) {
+                for (const code of codes) {
+                    const lo = arrays[`${field}.indptr`][code], hi = arrays[`${field}.indptr`][code + 1];
+                    for (const row of arrays[`${field}.rows`].subarray(lo, hi)) hits.add(positionOf(row));
+                }
+            }
+            const positions = Uint32Array.from(hits).sort();
+            driver = { length: positions.length, at: (i) => positions[i] };
+        }
+    }
+
+    // First driver entry at or after the cursor position
+    let lo = 0, hi = driver.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >>> 1;
+        if (driver.at(mid) < start) lo = mid + 1;
+        else hi = mid;
+    }
+
+    const found = [];
+    for (let i = lo; i < driver.length; i++) {
+        const row = rowAt(driver.at(i));
+        if (!matches(row)) continue;
+        if (found.length === limit) return { rows: found, next: driver.at(i) };
+        found.push(row);
+    }
+    return { rows: found, next: null };
+}
+
+// Full CSV rows for the given row numbers, in that order
+function readPredictionRows(index, rows) {
+    return new Promise((resolve, reject) => {
+        const fd = fs.openSync(PREDICTIONS_PATH, 'r');
+        const parts = [index.csvHeader];
         try {
-            // Find the JSON block if there are leftover print statements
-            // The python script should now output cleanly because of --json-out
-            const startIndex = dataString.indexOf('{');
-            const jsonStr = dataString.substring(startIndex);
-            const result = JSON.parse(jsonStr);
-            res.json(result);
-        } catch (e) {
-            console.error("Failed to parse JSON from Python output.");
-            console.error("Output was:", dataString);
-            res.status(500).json({ error: 'Failed to parse simulation results', output: dataString });
+            for (const row of rows) {
+                const offset = Number(index.arrays.row_offset[row]);
+                const line = Buffer.alloc(Number(index.arrays.row_offset[row + 1]) - offset);
+                fs.readSync(fd, line, 0, line.length, offset);
+                parts.push(line);
+            }
+        } finally {
+            fs.closeSync(fd);
         }
+        const records = [];
+        Readable.from([Buffer.concat(parts)])
+            .pipe(csv())
+            .on('data', (data) => records.push(data))
+            .on('end', () => resolve(records))
+            .on('error', reject);
     });
-});
+}
 
 // GET /api/search?q=<query>
-app.get('/api/search', (req, res) => {
+//   [&sector=&location=&category=] exact filters
+//   [&sort=growth_score[&order=desc|asc]] [&limit=30] [&cursor=<next_cursor>]
+// With only q, returns the first 30 matches in file order as a plain array
+// (the original response shape); with any paging/filter parameter it returns
+// { results, next_cursor }. With the index, q matches a prefix of the
+// MSME_ID, of its number or of the number without leading zeros (q=42 finds
+// MSME_0042 and MSME_0420, no longer MSME_0142 as the substring scan did),
+// or part of a Sector / Location_Type / Predicted_Growth_Category value.
+app.get('/api/search', async (req, res) => {
     const query = (req.query.q || '').toLowerCase();
-    const results = [];
-    const predictionsPath = path.join(__dirname, '..', 'data', 'msme_predictions.csv');
+    const paged = ['sector', 'location', 'category', 'sort', 'limit', 'cursor'].some((p) => req.query[p] !== undefined);
 
-    if (!fs.existsSync(predictionsPath)) {
+    if (!fs.existsSync(PREDICTIONS_PATH)) {
         return res.status(404).json({ error: "Predictions data not found. Run growth_model.py first." });
     }
 
-    fs.createReadStream(predictionsPath)
+    const index = loadSearchIndex();
+    if (!index) {
+        if (paged) {
+            return res.status(503).json({ error: "Search index not found. Run growth_model.py (or engine/search_index.py) first." });
+        }
+        return scanPredictions(query, res);
+    }
+
+    const order = req.query.sort === 'growth_score' ? (req.query.order === 'asc' ? 'asc' : 'desc') : 'row';
+    const limit = Math.min(SEARCH_MAX_PAGE_SIZE, Math.max(1, parseInt(req.query.limit || SEARCH_PAGE_SIZE, 10) || SEARCH_PAGE_SIZE));
+    let start = 0;
+    if (req.query.cursor) {
+        let cursor;
+        try {
+            cursor = JSON.parse(Buffer.from(req.query.cursor, 'base64url').toString());
+        } catch (e) {
+            return res.status(400).json({ error: "Invalid cursor." });
+        }
+        if (cursor.b !== index.build || cursor.o !== order) {
+            return res.status(400).json({ error: "Cursor does not match this search; start again without it." });
+        }
+        start = cursor.p;
+    }
+
+    const filters = {};
+    for (const param of Object.keys(SEARCH_FIELDS)) {
+        if (req.query[param] !== undefined) filters[param] = String(req.query[param]);
+    }
+    const { rows, next } = searchPredictions(index, { q: query, filters, order, start, limit });
+    try {
+        const results = await readPredictionRows(index, rows);
+        if (!paged) return res.json(results);
+        const nextCursor = next === null ? null
+            : Buffer.from(JSON.stringify({ b: index.build, o: order, p: next })).toString('base64url');
+        res.json({ results, next_cursor: nextCursor });
+    } catch (err) {
+        res.status(500).json({ error: err.message });
+    }
+});
+
+// Fallback when no search index exists: substring scan of the whole CSV
+function scanPredictions(query, res) {
+    const results = [];
+    fs.createReadStream(PREDICTIONS_PATH)
         .pipe(csv())
         .on('data', (data) => {
             const match = !query || query === '*' ||
@@ -126,26 +582,116 @@ app.get('/api/search', (req, res) => {
                 data.Location_Type.toLowerCase().includes(query) ||
                 data.Predicted_Growth_Category.toLowerCase().includes(query);
 
-            if (match && results.length < 30) {
+            if (match && results.length < SEARCH_PAGE_SIZE) {
                 results.push(data);
             }
         })
         .on('end', () => {
             res.json(results);
         });
-});
+}
+
+// ---------------------------------------------------------------------------
+// Per-MSME results index
+// ---------------------------------------------------------------------------
+// Phase 3 writes scheme_eligibility_results.csv.idx (engine/results_index.py):
+// a hash table from MSME_ID to the byte range of that MSME's rows, so a
+// lookup reads one slice of the CSV instead of parsing all of it. Without a
+// usable index (missing, or built for a different CSV: its size or mtime
+// changed) the route falls back to a full scan.
+const ELIGIBILITY_PATH = path.join(__dirname, '..', 'data', 'scheme_eligibility_results.csv');
+const ELIGIBILITY_INDEX_PATH = `${ELIGIBILITY_PATH}.idx`;
+const INDEX_HEADER_SIZE = 32;
+let resultsIndex = null;
+
+function fnv1a(bytes) {
+    let h = 0x811c9dc5;
+    for (const b of bytes) h = Math.imul(h ^ b, 0x01000193) >>> 0;
+    return h;
+}
+
+function loadResultsIndex() {
+    let stat, dataStat, dataSize;
+    try {
+        stat = fs.statSync(ELIGIBILITY_INDEX_PATH);
+        dataStat = fs.statSync(ELIGIBILITY_PATH, { bigint: true });
+        dataSize = Number(dataStat.size);
+    } catch (e) {
+        return null;
+    }
+    if (resultsIndex && resultsIndex.mtimeMs === stat.mtimeMs && resultsIndex.dataSize === dataSize &&
+        resultsIndex.dataMtimeNs === dataStat.mtimeNs) {
+        return resultsIndex;
+    }
+
+    resultsIndex = null;
+    const buf = fs.readFileSync(ELIGIBILITY_INDEX_PATH);
+    if (buf.toString('latin1', 0, 4) !== 'CZIX' || buf.readUInt16LE(4) !== 2) return null;
+    // stale: CSV rewritten since, even to the same size
+    if (Number(buf.readBigUInt64LE(16)) !== dataSize || buf.readBigUInt64LE(24) !== dataStat.mtimeNs) return null;
+
+    // Header row of the CSV, prepended to every slice so csv-parser keys the columns
+    const fd = fs.openSync(ELIGIBILITY_PATH, 'r');
+    const head = Buffer.alloc(Math.min(dataSize, 64 * 1024));
+    fs.readSync(fd, head, 0, head.length, 0);
+    fs.closeSync(fd);
+    const headerEnd = head.indexOf(10);
+    if (headerEnd < 0) return null;
+
+    const idWidth = buf.readUInt16LE(6);
+    resultsIndex = {
+        buf, idWidth, dataSize,
+        mtimeMs: stat.mtimeMs,
+        dataMtimeNs: dataStat.mtimeNs,
+        nSlots: buf.readUInt32LE(8),
+        slotSize: idWidth + 28,
+        header: head.subarray(0, headerEnd + 1),
+    };
+    return resultsIndex;
+}
+
+// Byte range {offset, length} of an MSME's rows; null if it has none
+function findResultsRange(index, msmeId) {
+    const key = Buffer.from(msmeId, 'latin1');
+    if (key.length > index.idWidth || key.length === 0) return null;
+    const mask = index.nSlots - 1;
+    for (let slot = fnv1a(key) & mask; ; slot = (slot + 1) & mask) {
+        const at = INDEX_HEADER_SIZE + slot * index.slotSize;
+        if (index.buf[at] === 0) return null;
+        const padded = key.length === index.idWidth || index.buf[at + key.length] === 0;
+        if (padded && index.buf.subarray(at, at + key.length).equals(key)) {
+            return {
+                offset: Number(index.buf.readBigUInt64LE(at + index.idWidth)),
+                length: Number(index.buf.readBigUInt64LE(at + index.idWidth + 8)),
+            };
+        }
+    }
+}
 
 // GET /api/msme/:id/schemes
 app.get('/api/msme/:id/schemes', (req, res) => {
     const msmeId = req.params.id;
     const results = [];
-    const eligibilityPath = path.join(__dirname, '..', 'data', 'scheme_eligibility_results.csv');
 
-    if (!fs.existsSync(eligibilityPath)) {
+    if (!fs.existsSync(ELIGIBILITY_PATH)) {
         return res.status(404).json({ error: "Eligibility data not found. Run scheme_eligibility.py first." });
     }
 
-    fs.createReadStream(eligibilityPath)
+    let rows;
+    const index = loadResultsIndex();
+    if (index) {
+        const range = findResultsRange(index, msmeId);
+        if (!range) return res.json([]);
+        const slice = Buffer.alloc(range.length);
+        const fd = fs.openSync(ELIGIBILITY_PATH, 'r');
+        fs.readSync(fd, slice, 0, range.length, range.offset);
+        fs.closeSync(fd);
+        rows = Readable.from([Buffer.concat([index.header, slice])]);
+    } else {
+        rows = fs.createReadStream(ELIGIBILITY_PATH);
+    }
+
+    rows
         .pipe(csv())
         .on('data', (data) => {
             if (data.MSME_ID === msmeId && data.Simulation_Type === 'Single_Scheme') {
@@ -176,4 +722,5 @@ app.get('/api/msme/:id/schemes', (req, res) => {
 
 app.listen(PORT, () => {
     console.log(`Server running on http://localhost:${PORT}`);
+    if (OPTIMIZER_MODE !== 'spawn') getOptimizerPool(); // warm the optimizer workers
 });
@@ -0,0 +1,69 @@
+"""
+Benchmark: fine-grained alpha sweep, full re-score vs AlphaSweepIndex
+=====================================================================
+Replicates the Phase 3 Single_Scheme pairs to registry scale (jittering
+the impact columns so pairs do not tie) and times a sweep over N alphas:
+
+  - rescore : compute_scores + greedy_select per alpha (previous behaviour)
+  - index   : AlphaSweepIndex, incremental re-ranking from the nearest alpha
+
+Usage:
+    python benchmarks/bench_alpha_sweep.py
+    python benchmarks/bench_alpha_sweep.py --copies 100 --steps 201
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "engine")
+sys.path.insert(0, ENGINE_DIR)
+
+from optimization_engine import (  # noqa: E402
+    DEFAULT_BUDGET, AlphaSweepIndex, alpha_sweep, compute_scores, greedy_select, load_eligibility_data,
+)
+
+
+def registry(copies: int, seed: int = 42) -> pd.DataFrame:
+    df = pd.concat([load_eligibility_data(json_mode=True)] * copies, ignore_index=True)
+    rng = np.random.default_rng(seed)
+    for col in ["Revenue_Increase_Pct", "Employment_Increase_Pct"]:
+        df[col] = df[col] * rng.uniform(0.8, 1.2, len(df))
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alpha sweep benchmark")
+    parser.add_argument("--copies", type=int, default=60, help="Replicas of the Phase 3 pairs.")
+    parser.add_argument("--steps", type=int, default=101, help="Alphas evenly spaced in [0, 1].")
+    args = parser.parse_args()
+
+    df = registry(args.copies)
+    budget = DEFAULT_BUDGET * args.copies / 3
+    alphas = np.round(np.linspace(0.0, 1.0, args.steps), 6)
+    print(f"{len(df):,} pairs, {args.steps} alphas, budget ₹{budget:,.0f}\n")
+
+    t0 = time.perf_counter()
+    for alpha in alphas:
+        greedy_select(compute_scores(df, alpha), budget)
+    rescore = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    index = AlphaSweepIndex(df)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    alpha_sweep(df, budget, alphas, index)
+    sweep = time.perf_counter() - t0
+
+    print(f"{'Mode':<10} {'Total (s)':>10} {'Per alpha (ms)':>15}")
+    print("-" * 37)
+    print(f"{'rescore':<10} {rescore:>10.3f} {rescore / len(alphas) * 1000:>15.2f}")
+    print(f"{'index':<10} {build + sweep:>10.3f} {sweep / len(alphas) * 1000:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
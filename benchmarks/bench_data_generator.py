@@ -0,0 +1,47 @@
+"""
+Benchmark: synthetic MSME generation, per-row loop vs vectorized chunks
+=======================================================================
+Rows/s of data_generator.generate_msme_data (one Python iteration and a
+dozen scalar draws per MSME) against generate_msme_registry (whole-column
+draws per chunk, seeded per chunk), excluding file writes.
+
+Usage:
+    python benchmarks/bench_data_generator.py
+    python benchmarks/bench_data_generator.py --rows 1000000 10000000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "engine"))
+
+from data_generator import DEFAULT_CHUNK_SIZE, generate_msme_data, generate_msme_registry  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic data generator benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--loop-rows", type=int, default=20_000, help="Rows timed for the per-row loop.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    generate_msme_data(args.loop_rows)
+    loop_rate = args.loop_rows / (time.perf_counter() - t0)
+
+    print(f"{'Generator':<12} {'Rows':>12} {'Seconds':>9} {'Rows/s':>12}")
+    print("-" * 48)
+    print(f"{'loop':<12} {args.loop_rows:>12,} {args.loop_rows / loop_rate:>9.2f} {loop_rate:>12,.0f}")
+    for n in args.rows:
+        t0 = time.perf_counter()
+        rows = sum(len(chunk) for chunk in generate_msme_registry(n, 42, args.chunk_size, args.workers))
+        seconds = time.perf_counter() - t0
+        print(f"{'vectorized':<12} {rows:>12,} {seconds:>9.2f} {rows / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: Phase 3 eligibility (legacy per-row vs columnar matrix)
+===================================================================
+Times the legacy iterrows + get_eligible_schemes() path against
+build_eligibility_matrix() on synthetic registries of increasing size and
+checks that both produce the same eligibility decisions.
+
+The legacy path is only run on up to --legacy-max rows; beyond that its time
+is extrapolated linearly from the measured per-row cost.
+
+Usage:
+    python benchmarks/bench_eligibility.py
+    python benchmarks/bench_eligibility.py --sizes 350 100000 5000000 --legacy-max 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "engine"))
+
+from data_generator import generate_scheme_data  # noqa: E402
+from scheme_eligibility import build_eligibility_matrix, get_eligible_schemes  # noqa: E402
+
+SECTORS = ['Manufacturing', 'IT Services', 'Food Processing', 'Textiles', 'Retail']
+CATEGORIES = ['Micro', 'Small', 'Medium']
+LOCATIONS = ['Urban', 'Rural', 'Semi-Urban']
+
+
+def synthetic_registry(n: int, seed: int = 42) -> pd.DataFrame:
+    """Only the columns eligibility depends on."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Sector": rng.choice(SECTORS, n),
+        "Category": rng.choice(CATEGORIES, n),
+        "Location_Type": rng.choice(LOCATIONS, n),
+    })
+
+
+def legacy_matrix(msme_df: pd.DataFrame, scheme_df: pd.DataFrame) -> np.ndarray:
+    ids = scheme_df["Scheme_ID"].tolist()
+    rows = []
+    for _, msme in msme_df.iterrows():
+        eligible = set(get_eligible_schemes(msme, scheme_df)["Scheme_ID"])
+        rows.append([sid in eligible for sid in ids])
+    return np.array(rows, dtype=bool).reshape(len(msme_df), len(ids))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phase 3 eligibility benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[350, 100_000, 5_000_000])
+    parser.add_argument("--legacy-max", type=int, default=5_000,
+                        help="Largest row count the legacy path is actually run on.")
+    args = parser.parse_args()
+
+    scheme_df = generate_scheme_data()
+
+    print(f"{'Rows':>10} {'Legacy (s)':>12} {'Columnar (s)':>13} {'Speedup':>9}  Check")
+    print("-" * 60)
+    for n in args.sizes:
+        msme_df = synthetic_registry(n)
+
+        t0 = time.perf_counter()
+        matrix = build_eligibility_matrix(msme_df, scheme_df)
+        columnar_s = time.perf_counter() - t0
+
+        legacy_n = min(n, args.legacy_max)
+        t0 = time.perf_counter()
+        expected = legacy_matrix(msme_df.head(legacy_n), scheme_df)
+        legacy_s = (time.perf_counter() - t0) * n / legacy_n
+        extrapolated = "*" if legacy_n < n else " "
+
+        check = "OK" if np.array_equal(matrix[:legacy_n], expected) else "MISMATCH"
+        print(f"{n:>10,} {legacy_s:>11.2f}{extrapolated} {columnar_s:>13.4f} "
+              f"{legacy_s / max(columnar_s, 1e-9):>8.0f}x  {check}")
+
+    print("\n* legacy time extrapolated from the first --legacy-max rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: exact knapsack solver vs greedy at registry scale
+============================================================
+Replicates the Phase 3 Single_Scheme pairs (jittering subsidies so costs
+are not whole multiples of each other) and reports, per budget, the exact
+solver's runtime, core size, status, optimality gap and score gain over
+the greedy selection.
+
+Usage:
+    python benchmarks/bench_exact_solver.py
+    python benchmarks/bench_exact_solver.py --copies 100 --time-limit 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "engine")
+sys.path.insert(0, ENGINE_DIR)
+
+from optimization_engine import (  # noqa: E402
+    DEFAULT_ALPHA, DEFAULT_BUDGET, EXACT_GAP_LIMIT, compute_scores, exact_select, greedy_select,
+    load_eligibility_data,
+)
+
+
+def registry(copies: int, seed: int = 42) -> pd.DataFrame:
+    df = pd.concat([load_eligibility_data(json_mode=True)] * copies, ignore_index=True)
+    rng = np.random.default_rng(seed)
+    df["Subsidy_Applied"] = (df["Subsidy_Applied"] * rng.uniform(0.9, 1.1, len(df))).round(2)
+    return compute_scores(df, DEFAULT_ALPHA)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact solver benchmark")
+    parser.add_argument("--copies", type=int, default=60, help="Replicas of the Phase 3 pairs.")
+    parser.add_argument("--budgets", type=float, nargs="+", default=[1, 5, 20],
+                        help="Budgets as multiples of the default ₹5 crore.")
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    parser.add_argument("--gap-limit", type=float, default=EXACT_GAP_LIMIT * 100, help="Percent.")
+    args = parser.parse_args()
+
+    df = registry(args.copies)
+    print(f"{len(df):,} pairs\n")
+    print(f"{'Budget':>16} {'Greedy (s)':>11} {'Exact (s)':>10} {'Core':>7} {'Status':>12} "
+          f"{'Gap %':>8} {'Gain %':>8}")
+    print("-" * 80)
+
+    for mult in args.budgets:
+        budget = DEFAULT_BUDGET * mult
+        t0 = time.perf_counter()
+        greedy_select(df, budget)
+        greedy_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        _, info = exact_select(df, budget, time_limit=args.time_limit, gap_limit=args.gap_limit / 100)
+        exact_time = time.perf_counter() - t0
+
+        print(f"{'₹' + format(budget, ',.0f'):>16} {greedy_time:>11.3f} {exact_time:>10.3f} {info['core_items']:>7,} "
+              f"{info['status']:>12} {info['gap_pct']:>8.4f} {info['gain_vs_greedy_pct']:>+8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: growth model inference, pickled sklearn pipeline vs compiled model
+=============================================================================
+Compares, for model_artifacts/growth_model.pkl and the compiled
+growth_model_compiled.npz written next to it by growth_model.py:
+
+  - cold start : fresh interpreter that imports, loads the model and scores
+                 one MSME (what a one-off scoring job pays)
+  - latency    : one predict_proba call for a single MSME (API-style)
+  - throughput : rows/s scoring msme_data replicated to registry scale
+
+Run growth_model.py first.
+
+Usage:
+    python benchmarks/bench_growth_inference.py
+    python benchmarks/bench_growth_inference.py --rows 100000 1000000
+"""
+
+import argparse
+import os
+import pickle
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINE_DIR = os.path.join(ROOT, "engine")
+sys.path.insert(0, ENGINE_DIR)
+
+from growth_inference import COMPILED_MODEL_PATH, load_model  # noqa: E402
+from storage import read_table  # noqa: E402
+
+PICKLE_PATH = os.path.join(ROOT, "model_artifacts", "growth_model.pkl")
+
+COLD_START = {
+    "pickle": (
+        "import pickle, pandas as pd\n"
+        f"model = pickle.load(open({PICKLE_PATH!r}, 'rb'))\n"
+        "df = pd.read_csv({data!r}, nrows=1)\n"
+        "model.predict_proba(df)\n"
+    ),
+    "compiled": (
+        "import pandas as pd\n"
+        "from growth_inference import load_model\n"
+        "model = load_model()\n"
+        "df = pd.read_csv({data!r}, nrows=1)\n"
+        "model.predict_proba(df)\n"
+    ),
+}
+
+
+def cold_start(code: str, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ENGINE_DIR, check=True)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Growth model inference benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeats", type=int, default=3, help="Cold starts per model.")
+    args = parser.parse_args()
+
+    data_path = os.path.join(ROOT, "data", "msme_data.csv")
+    print(f"{'Model':<10} {'Cold start (s)':>15}")
+    print("-" * 26)
+    for name, code in COLD_START.items():
+        print(f"{name:<10} {cold_start(code.format(data=data_path), args.repeats):>15.3f}")
+
+    with open(PICKLE_PATH, "rb") as f:
+        pipeline = pickle.load(f)
+    compiled = load_model(COMPILED_MODEL_PATH)
+    base = read_table("msme_data")
+
+    one = base.iloc[:1]
+    one_X = one[compiled.categorical_features + compiled.numerical_features]
+    pipe_ms = min(timed(lambda: pipeline.predict_proba(one_X)) for _ in range(20)) * 1000
+    comp_ms = min(timed(lambda: compiled.predict_proba(one)) for _ in range(20)) * 1000
+    print(f"\nSingle-MSME call: pickle {pipe_ms:.2f} ms, compiled {comp_ms:.2f} ms")
+
+    print(f"\n{'Rows':>10} {'Pickle rows/s':>14} {'Compiled rows/s':>16} {'Identical':>10}")
+    print("-" * 53)
+    for n in args.rows:
+        df = pd.concat([base] * (n // len(base) + 1), ignore_index=True).iloc[:n]
+        X = df[compiled.categorical_features + compiled.numerical_features]
+
+        t0 = time.perf_counter()
+        expected = pipeline.predict_proba(X)
+        t_pickle = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        got = compiled.predict_proba(df)
+        t_compiled = time.perf_counter() - t0
+
+        print(f"{n:>10,} {n / t_pickle:>14,.0f} {n / t_compiled:>16,.0f} {str(np.array_equal(expected, got)):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: growth model hyperparameter search, GridSearchCV vs halving
+======================================================================
+Times growth_model.py's two --search modes on synthetic registries of
+increasing size (data_generator.generate_msme_data) and compares the
+held-out macro-F1 of the model each one picks:
+
+  - grid    : exhaustive GridSearchCV, 12 candidates x 5 folds at full size
+  - halving : successive halving with cached fold preprocessing,
+              n_estimators candidates sharing one forest and forests
+              fitted with n_jobs=-1
+
+Usage:
+    python benchmarks/bench_growth_search.py
+    python benchmarks/bench_growth_search.py --rows 2000 10000 --time-budget 60
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from sklearn.base import clone
+from sklearn.metrics import f1_score
+from sklearn.model_selection import GridSearchCV, train_test_split
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "engine"))
+
+from data_generator import generate_msme_data  # noqa: E402
+from growth_model import (  # noqa: E402
+    CATEGORICAL_FEATURES, NUMERICAL_FEATURES, PARAM_GRID, TARGET, build_pipeline, halving_search,
+)
+
+LABELS = ['Low', 'Moderate', 'High']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Growth model search benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[350, 3000])
+    parser.add_argument("--time-budget", type=float, default=None, help="Seconds, halving only.")
+    args = parser.parse_args()
+
+    print(f"{'Rows':>8} {'Search':<8} {'Seconds':>9} {'Speedup':>8} {'Test F1':>8}  Best parameters")
+    print("-" * 100)
+    for n in args.rows:
+        df = generate_msme_data(n)
+        X = df[CATEGORICAL_FEATURES + NUMERICAL_FEATURES]
+        y = df[TARGET].map({label: i for i, label in enumerate(LABELS)}).to_numpy()
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+        pipeline = build_pipeline()
+
+        t0 = time.perf_counter()
+        grid = GridSearchCV(pipeline, PARAM_GRID, cv=5, scoring='f1_macro', n_jobs=-1).fit(X_train, y_train)
+        t_grid = time.perf_counter() - t0
+        f1_grid = f1_score(y_test, grid.best_estimator_.predict(X_test), average='macro')
+
+        t0 = time.perf_counter()
+        best_params, _, _ = halving_search(pipeline, PARAM_GRID, X_train, y_train, time_budget=args.time_budget)
+        model = clone(pipeline).set_params(**best_params, classifier__n_jobs=-1).fit(X_train, y_train)
+        t_halving = time.perf_counter() - t0
+        f1_halving = f1_score(y_test, model.predict(X_test), average='macro')
+
+        print(f"{n:>8,} {'grid':<8} {t_grid:>9.1f} {'':>8} {f1_grid:>8.4f}  {grid.best_params_}")
+        print(f"{n:>8,} {'halving':<8} {t_halving:>9.1f} {t_grid / t_halving:>7.1f}x {f1_halving:>8.4f}  {best_params}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: /api/optimize latency, spawn-per-request vs persistent server
+========================================================================
+Simulates concurrent dashboard users issuing (budget, alpha) queries and
+measures end-to-end latency of:
+
+  - spawn      : python optimization_engine.py --json-out per request
+                 (what backend/server.js did before)
+  - persistent : a pool of long-lived optimization_server.py workers
+
+Usage:
+    python benchmarks/bench_optimize_latency.py
+    python benchmarks/bench_optimize_latency.py --users 8 --requests 200 --workers 4
+"""
+
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINE_SCRIPT = os.path.join(ROOT, "engine", "optimization_engine.py")
+SERVER_SCRIPT = os.path.join(ROOT, "engine", "optimization_server.py")
+
+
+def query_mix(n: int, seed: int = 42) -> list[dict]:
+    """Slider-like queries: budgets ₹1–10 crore, alpha on a 0.05 grid."""
+    rng = np.random.default_rng(seed)
+    return [
+        {"budget": float(rng.integers(1, 11) * 10_000_000), "alpha": round(float(rng.integers(0, 21) * 0.05), 2)}
+        for _ in range(n)
+    ]
+
+
+def spawn_request(params: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, ENGINE_SCRIPT, "--budget", str(params["budget"]),
+         "--alpha", str(params["alpha"]), "--json-out"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout[out.stdout.index("{"):])
+
+
+class ServerClient:
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, SERVER_SCRIPT], cwd=ROOT, text=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self.next_id = 0
+        self.request({"budget": 1.0, "alpha": 0.5})  # wait until data is loaded
+
+    def request(self, params: dict) -> dict:
+        self.next_id += 1
+        self.proc.stdin.write(json.dumps({"id": self.next_id, "method": "optimize", "params": params}) + "\n")
+        self.proc.stdin.flush()
+        return json.loads(self.proc.stdout.readline())["result"]
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+def run_load(handler, queries: list[dict], users: int) -> tuple[np.ndarray, float]:
+    def timed(params):
+        t0 = time.perf_counter()
+        handler(params)
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        latencies = np.array(list(pool.map(timed, queries)))
+    return latencies, time.perf_counter() - t0
+
+
+def report(label: str, latencies: np.ndarray, wall: float) -> None:
+    p50, p99 = np.percentile(latencies * 1000, [50, 99])
+    print(f"{label:<12} {len(latencies):>9} {p50:>10.1f} {p99:>10.1f} {len(latencies) / wall:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimization API latency benchmark")
+    parser.add_argument("--users", type=int, default=4, help="Concurrent dashboard users.")
+    parser.add_argument("--requests", type=int, default=40, help="Total requests per mode.")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Persistent server processes. Default: min(4, CPUs), as backend/server.js.")
+    args = parser.parse_args()
+
+    queries = query_mix(args.requests)
+
+    print(f"{args.users} concurrent users, {args.requests} requests per mode\n")
+    print(f"{'Mode':<12} {'Requests':>9} {'p50 (ms)':>10} {'p99 (ms)':>10} {'Throughput/s':>12}")
+    print("-" * 58)
+
+    report("spawn", *run_load(spawn_request, queries, args.users))
+
+    clients = queue.Queue()
+    pool = [ServerClient() for _ in range(args.workers)]
+    for client in pool:
+        clients.put(client)
+
+    def persistent_request(params):
+        client = clients.get()
+        try:
+            return client.request(params)
+        finally:
+            clients.put(client)
+
+    report("persistent", *run_load(persistent_request, queries, args.users))
+    for client in pool:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: what-if scenario grids, per-scenario rescoring vs scenario_runner
+============================================================================
+Replicates the Phase 3 Single_Scheme pairs to registry scale (jittering
+the impact columns so pairs do not tie) and times an alpha x budget x
+category-shares grid:
+
+  - rescore : compute_scores + greedy_select (or the category sub-budgets)
+              per scenario, as sensitivity_analysis used to
+  - runner  : run_scenarios() with 1 worker and with --workers, the pair
+              arrays shared through shared memory
+
+and checks that the runner's outcomes match the rescoring path.
+
+Usage:
+    python benchmarks/bench_scenarios.py
+    python benchmarks/bench_scenarios.py --copies 300 --alphas 0:1:0.05 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "engine")
+sys.path.insert(0, ENGINE_DIR)
+
+from optimization_engine import (  # noqa: E402
+    CATEGORY_BUDGET_SHARES, compute_scores, greedy_select, greedy_select_with_category_budgets,
+    load_eligibility_data,
+)
+from scenario_runner import build_grid, run_scenarios  # noqa: E402
+
+
+def registry(copies: int, seed: int = 42) -> pd.DataFrame:
+    df = pd.concat([load_eligibility_data(json_mode=True)] * copies, ignore_index=True)
+    rng = np.random.default_rng(seed)
+    for col in ["Revenue_Increase_Pct", "Employment_Increase_Pct"]:
+        df[col] = df[col] * rng.uniform(0.8, 1.2, len(df))
+    return df
+
+
+def rescore(df: pd.DataFrame, scenario: dict) -> int:
+    df_scored = compute_scores(df, scenario["alpha"])
+    if scenario["shares"] is None:
+        return len(greedy_select(df_scored, scenario["budget"]))
+    return len(greedy_select_with_category_budgets(df_scored, scenario["budget"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scenario grid benchmark")
+    parser.add_argument("--copies", type=int, default=100, help="Replicas of the Phase 3 pairs.")
+    parser.add_argument("--alphas", type=str, default="0:1:0.1")
+    parser.add_argument("--budgets", type=str, default="50000000:1000000000:50000000")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    df = registry(args.copies)
+    # Only the default category shares, so the rescoring path can replay them
+    grid = build_grid(args.alphas, args.budgets, [None, CATEGORY_BUDGET_SHARES])
+    print(f"{len(df):,} pairs, {len(grid):,} scenarios\n")
+
+    t0 = time.perf_counter()
+    selected = [rescore(df, scenario) for scenario in grid]
+    t_rescore = time.perf_counter() - t0
+
+    timings = []
+    for workers in sorted({1, args.workers}):
+        t0 = time.perf_counter()
+        results = run_scenarios(df, grid, workers)
+        timings.append((f"runner x{workers}", time.perf_counter() - t0))
+    same = results["Selected"].tolist() == selected
+
+    print(f"{'Mode':<12} {'Total (s)':>10} {'Per scenario (ms)':>18}")
+    print("-" * 42)
+    for mode, seconds in [("rescore", t_rescore)] + timings:
+        print(f"{mode:<12} {seconds:>10.3f} {seconds / len(grid) * 1000:>18.2f}")
+    print(f"\nSame selections: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: Phase 3 and Phase 4 against growing scheme catalogs
+===============================================================
+For catalogs of 5 (the reference schemes), 100 and 1000 synthetic schemes
+(data_generator.generate_scheme_catalog) over one synthetic registry:
+
+  - matrix : build_eligibility_matrix() + np.nonzero, every MSME x scheme
+  - index  : eligible_pairs(), the (Sector, Category, Location) inverted index
+  - phase3 : full simulate_chunk() (pairs + single and combined impact rows)
+  - phase4 : compute_scores() + greedy selection over the single-scheme rows,
+             and the one-per-MSME selection over singles plus stacked rows
+
+and checks that both eligibility paths produce the same pairs.
+
+Usage:
+    python benchmarks/bench_scheme_catalog.py
+    python benchmarks/bench_scheme_catalog.py --msmes 200000 --schemes 5 100 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "engine"))
+
+from data_generator import generate_msme_registry, generate_scheme_catalog, generate_scheme_data  # noqa: E402
+from optimization_engine import compute_scores, select_pairs  # noqa: E402
+from scheme_eligibility import build_eligibility_matrix, eligible_pairs, simulate_chunk  # noqa: E402
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheme catalog scaling benchmark")
+    parser.add_argument("--msmes", type=int, default=20_000)
+    parser.add_argument("--schemes", type=int, nargs="+", default=[5, 100, 1000])
+    parser.add_argument("--budget", type=float, default=50_000_000)
+    args = parser.parse_args()
+
+    msme_df = pd.concat(list(generate_msme_registry(args.msmes)), ignore_index=True)
+    print(f"{args.msmes:,} MSMEs\n")
+    print(f"{'Schemes':>8} {'Pairs':>11} {'Matrix (s)':>11} {'Index (s)':>10} {'Same':>5} "
+          f"{'Phase 3 (s)':>12} {'Greedy (s)':>11} {'1/MSME (s)':>11}")
+    print("-" * 88)
+    for n_schemes in args.schemes:
+        scheme_df = generate_scheme_data() if n_schemes == 5 else generate_scheme_catalog(n_schemes)
+
+        matrix_pairs, t_matrix = timed(lambda: np.nonzero(build_eligibility_matrix(msme_df, scheme_df)))
+        index_pairs, t_index = timed(lambda: eligible_pairs(msme_df, scheme_df)[:2])
+        same = all(np.array_equal(a, b) for a, b in zip(matrix_pairs, index_pairs))
+        del matrix_pairs
+
+        (results_df, _), t_phase3 = timed(lambda: simulate_chunk(msme_df, scheme_df))
+        single = results_df[results_df["Simulation_Type"] == "Single_Scheme"].reset_index(drop=True)
+
+        _, t_greedy = timed(lambda: select_pairs(compute_scores(single, 0.6), args.budget, False))
+        _, t_mckp = timed(lambda: select_pairs(compute_scores(results_df, 0.6), args.budget, False,
+                                               one_per_msme=True))
+
+        print(f"{n_schemes:>8,} {len(index_pairs[0]):>11,} {t_matrix:>11.3f} {t_index:>10.3f} {str(same):>5} "
+              f"{t_phase3:>12.2f} {t_greedy:>11.2f} {t_mckp:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: data/ storage formats (CSV vs Parquet vs Feather)
+============================================================
+Replicates scheme_eligibility_results to registry scale and compares, per
+format, the on-disk footprint, a full load, and the Phase 4 access pattern
+(Single_Scheme rows only, a handful of columns).
+
+Usage:
+    python benchmarks/bench_storage.py
+    python benchmarks/bench_storage.py --rows 1000000 5000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "engine")
+sys.path.insert(0, ENGINE_DIR)
+
+from storage import FORMATS, read_table, table_path, write_table  # noqa: E402
+
+PHASE4_COLUMNS = [
+    "MSME_ID", "Category", "Scheme_Name", "Subsidy_Applied",
+    "Revenue_Increase_Pct", "Employment_Increase_Pct",
+]
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage format benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    source = read_table("scheme_eligibility_results", "csv")
+
+    print(f"{'Rows':>10} {'Format':>8} {'Size (MB)':>10} {'Write (s)':>10} "
+          f"{'Full load (s)':>14} {'Phase 4 load (s)':>17}")
+    print("-" * 76)
+    for n in args.rows:
+        reps = -(-n // len(source))
+        df = pd.concat([source] * reps, ignore_index=True).head(n)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["CHAOSZEN_DATA_DIR"] = tmp
+            for fmt in FORMATS:
+                _, write_s = timed(lambda: write_table(df, "scheme_eligibility_results", fmt))
+                size_mb = os.path.getsize(table_path("scheme_eligibility_results", fmt)) / 1e6
+                _, full_s = timed(lambda: read_table("scheme_eligibility_results", fmt))
+                _, phase4_s = timed(lambda: read_table(
+                    "scheme_eligibility_results", fmt, columns=PHASE4_COLUMNS,
+                    filters=[("Simulation_Type", "==", "Single_Scheme")],
+                ))
+                print(f"{n:>10,} {fmt:>8} {size_mb:>10.1f} {write_s:>10.2f} "
+                      f"{full_s:>14.3f} {phase4_s:>17.3f}")
+            del os.environ["CHAOSZEN_DATA_DIR"]
+
+
+if __name__ == "__main__":
+    main()
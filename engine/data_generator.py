@@ -1,6 +1,12 @@
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
-import os
+
+from storage import FORMATS, TableAppender, write_table
 
 # Set seed for reproducibility
 np.random.seed(42)
@@ -68,6 +74,159 @@ def generate_msme_data(n=300):
     
     return df.drop(columns=['Internal_Score'])
 
+# ---------------------------------------------------------------------------
+# Vectorized, chunked generator for large registries
+# ---------------------------------------------------------------------------
+# Same columns and conditional rules as generate_msme_data, drawn as whole
+# arrays. Chunk k is generated from its own np.random.Generator seeded by
+# SeedSequence(seed, spawn_key=(k, stream)), so the output depends only on
+# (n, seed, chunk_size), never on the number of workers or the order the
+# chunks finish in. The columns behind the Growth_Category score (years,
+# revenue growth, technology level, GST score) have their own stream, which
+# lets the min/max and tercile passes redraw just those.
+
+SECTORS = ['Manufacturing', 'IT Services', 'Food Processing', 'Textiles', 'Retail']
+OWNERSHIP_TYPES = ['Sole Proprietorship', 'Partnership', 'Private Limited']
+CATEGORIES = ['Micro', 'Small', 'Medium']
+LOCATION_TYPES = ['Urban', 'Rural', 'Semi-Urban']
+EXPORT_SECTORS = ['Manufacturing', 'Textiles']
+GROWTH_LABELS = np.array(['Low', 'Moderate', 'High'])
+
+MSME_COLUMNS = [
+    'MSME_ID', 'Sector', 'Years_of_Operation', 'Ownership_Type', 'Category', 'Location_Type',
+    'Annual_Revenue', 'Revenue_Growth_Rate', 'Profit_Margin', 'Debt_Outstanding', 'Loan_to_Revenue_Ratio',
+    'Number_of_Employees', 'Capacity_Utilization', 'Export Percentage', 'Technology_Level',
+    'GST_Compliance_Score', 'Inspection_Score', 'Documentation_Readiness_Score'
+]
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+SCORE_STREAM, OTHER_STREAM = 0, 1
+
+
+def _chunk_rng(seed, chunk, stream):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk, stream)))
+
+
+def _chunk_bounds(n, chunk_size):
+    return [(k, start, min(start + chunk_size, n)) for k, start in enumerate(range(0, n, chunk_size))]
+
+
+def _score_columns(seed, chunk, rows):
+    """Years_of_Operation, Revenue_Growth_Rate, Technology_Level, GST_Compliance_Score of one chunk."""
+    rng = _chunk_rng(seed, chunk, SCORE_STREAM)
+    years = rng.integers(1, 26, rows)
+    rev_growth = rng.uniform(-0.05, 0.30, rows)
+    tech = rng.integers(1, 6, rows)
+    gst = np.where(years > 5, rng.uniform(60, 100, rows), rng.uniform(40, 90, rows))
+    return years, rev_growth, tech, gst
+
+
+def _score_ranges(task):
+    seed, chunk, start, stop = task
+    _, rev_growth, tech, gst = _score_columns(seed, chunk, stop - start)
+    return np.array([[c.min(), c.max()] for c in (rev_growth, tech, gst)], dtype=np.float64)
+
+
+def _internal_score(rev_growth, tech, gst, ranges):
+    # Composite score for balanced labeling, normalized by the registry-wide min/max
+    (r_lo, r_hi), (t_lo, t_hi), (g_lo, g_hi) = ranges
+    norm_rev_growth = (rev_growth - r_lo) / (r_hi - r_lo)
+    norm_tech = (tech - t_lo) / (t_hi - t_lo)
+    norm_compliance = (gst - g_lo) / (g_hi - g_lo)
+    return (norm_rev_growth * 0.5) + (norm_tech * 0.3) + (norm_compliance * 0.2)
+
+
+def _chunk_scores(task):
+    seed, chunk, start, stop, ranges = task
+    _, rev_growth, tech, gst = _score_columns(seed, chunk, stop - start)
+    return _internal_score(rev_growth, tech, gst, ranges)
+
+
+def generate_msme_chunk(task):
+    """
+    Rows [start, stop) of the registry as a DataFrame. ranges are the
+    registry-wide min/max of the score columns and edges the Internal_Score
+    terciles, so Growth_Category matches pd.qcut over the whole registry.
+    """
+    seed, chunk, start, stop, ranges, edges = task
+    rows = stop - start
+    years, rev_growth, tech, gst = _score_columns(seed, chunk, rows)
+    rng = _chunk_rng(seed, chunk, OTHER_STREAM)
+
+    ids = np.char.add('MSME_', np.char.zfill(np.arange(start + 1, stop + 1).astype(str), 4))
+    sector = np.array(SECTORS)[rng.integers(0, len(SECTORS), rows)]
+    ownership = np.array(OWNERSHIP_TYPES)[rng.integers(0, len(OWNERSHIP_TYPES), rows)]
+    category = np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), rows)]
+    location = np.array(LOCATION_TYPES)[rng.integers(0, len(LOCATION_TYPES), rows)]
+
+    # Financials
+    annual_revenue = rng.uniform(500000, 50000000, rows)
+    profit_margin = rng.uniform(0.02, 0.25, rows)
+    debt = annual_revenue * rng.uniform(0.1, 0.5, rows)
+
+    # Operations
+    num_employees = np.where(category == 'Micro', rng.integers(2, 50, rows), rng.integers(20, 150, rows))
+    cap_utilization = rng.uniform(40, 95, rows)
+    export_pct = np.where(np.isin(sector, EXPORT_SECTORS), rng.uniform(0, 60, rows), 0.0)
+
+    # Compliance
+    inspection_score = rng.uniform(50, 100, rows)
+    doc_readiness = rng.uniform(50, 100, rows)
+
+    df = pd.DataFrame(dict(zip(MSME_COLUMNS, [
+        ids, sector, years, ownership, category, location,
+        annual_revenue, rev_growth, profit_margin, debt, debt / annual_revenue,
+        num_employees, cap_utilization, export_pct, tech,
+        gst, inspection_score, doc_readiness,
+    ])))
+
+    # Right-closed tercile bins, lowest edge included, as pd.qcut assigns them
+    score = _internal_score(rev_growth, tech, gst, ranges)
+    df['Growth_Category'] = GROWTH_LABELS[np.searchsorted(edges[1:-1], score, side='left')]
+    return df
+
+
+def _run_ordered(fn, tasks, workers):
+    """fn over tasks in order; with workers > 1 in a process pool, at most 2 x workers in flight."""
+    if workers <= 1:
+        for task in tasks:
+            yield fn(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(fn, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def generate_msme_registry(n, seed=42, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """
+    Yield the n-row registry as DataFrame chunks, in MSME_ID order.
+
+    Growth_Category needs registry-wide statistics, so the score columns are
+    drawn twice before the rows are produced: once for their min/max, once
+    for the Internal_Score terciles (n float64 values are held for that).
+    """
+    bounds = _chunk_bounds(n, chunk_size)
+    ranges = np.stack(list(_run_ordered(
+        _score_ranges, [(seed, k, start, stop) for k, start, stop in bounds], workers,
+    )))
+    ranges = np.column_stack([ranges[:, :, 0].min(axis=0), ranges[:, :, 1].max(axis=0)])
+
+    scores = np.concatenate(list(_run_ordered(
+        _chunk_scores, [(seed, k, start, stop, ranges) for k, start, stop in bounds], workers,
+    )))
+    edges = pd.Series(scores).quantile([0, 1 / 3, 2 / 3, 1]).to_numpy()
+    del scores
+
+    yield from _run_ordered(
+        generate_msme_chunk, [(seed, k, start, stop, ranges, edges) for k, start, stop in bounds], workers,
+    )
+
+
 def generate_scheme_data():
     # Headers matching the schema labels exactly
     schemes = [
@@ -124,21 +283,122 @@ def generate_scheme_data():
     ]
     return pd.DataFrame(schemes)
 
+# Vocabulary for synthetic scheme catalogs
+SCHEME_THEMES = [
+    'Digital Transformation', 'Green Tech', 'Export Promotion', 'Credit Guarantee', 'Skill Development',
+    'Cluster Development', 'Women Entrepreneurship', 'Rural Enterprise', 'Technology Upgradation',
+    'Market Access', 'Quality Certification', 'Startup', 'Interest Subvention', 'Capital Investment',
+]
+SCHEME_INSTRUMENTS = ['Grant', 'Subsidy', 'Incentive', 'Support Scheme', 'Assistance', 'Fund']
+SCHEME_ISSUERS = [
+    'National', 'Maharashtra', 'Tamil Nadu', 'Gujarat', 'Karnataka', 'Uttar Pradesh',
+    'Rajasthan', 'West Bengal', 'Telangana', 'Punjab', 'Kerala', 'Odisha',
+]
+SUBSIDY_CAPS = np.array([100000, 200000, 300000, 500000, 1000000, 2000000, 5000000])
+SUBSIDY_CAP_WEIGHTS = np.array([0.15, 0.25, 0.2, 0.2, 0.1, 0.07, 0.03])
+
+
+def _criteria_field(rng, values, n, p_all, max_size):
+    """'All' with probability p_all, otherwise 1..max_size distinct values in vocabulary order."""
+    fields = []
+    for allow_all, size in zip(rng.random(n) < p_all, rng.integers(1, max_size + 1, n)):
+        if allow_all:
+            fields.append('All')
+        else:
+            picked = np.sort(rng.choice(len(values), size, replace=False))
+            fields.append(', '.join(values[i] for i in picked))
+    return fields
+
+
+def generate_scheme_catalog(n, seed=42):
+    """
+    n synthetic central and state schemes in the schemes_data layout. Each
+    criterion is 'All' or a short list, so eligibility overlaps the way a
+    real catalog's does (an MSME typically qualifies for about 13% of the
+    schemes). Subsidy caps skew towards smaller schemes.
+
+    Scheme_Name is unique (Phase 4 summarizes by name): issuer x theme x
+    instrument combinations are drawn without replacement, and once they
+    run out the names repeat with a tranche number.
+    """
+    rng = np.random.default_rng(seed)
+    n_combos = len(SCHEME_ISSUERS) * len(SCHEME_THEMES) * len(SCHEME_INSTRUMENTS)
+    draws = rng.permutation(n_combos * -(-n // n_combos))[:n]
+    tranche, combo = np.divmod(draws, n_combos)
+    issuer, rest = np.divmod(combo, len(SCHEME_THEMES) * len(SCHEME_INSTRUMENTS))
+    theme, instrument = np.divmod(rest, len(SCHEME_INSTRUMENTS))
+    names = [
+        f"{SCHEME_ISSUERS[i]} {SCHEME_THEMES[t]} {SCHEME_INSTRUMENTS[k]}" + (f" (Tranche {r + 1})" if r else "")
+        for i, t, k, r in zip(issuer, theme, instrument, tranche)
+    ]
+    return pd.DataFrame({
+        'Scheme_ID': [f"SCH_{i:03d}" for i in range(1, n + 1)],
+        'Scheme_Name': names,
+        'Eligible_Sectors': _criteria_field(rng, SECTORS, n, 0.1, 2),
+        'Max_Subsidy_Amount': rng.choice(SUBSIDY_CAPS, n, p=SUBSIDY_CAP_WEIGHTS),
+        'Target_Category': _criteria_field(rng, CATEGORIES, n, 0.2, 2),
+        'Location_Criteria': _criteria_field(rng, LOCATION_TYPES, n, 0.4, 1),
+        'Impact_Factor_Revenue': np.round(rng.uniform(0.03, 0.25, n), 2),
+        'Impact_Factor_Employment': rng.integers(1, 9, n),
+    })
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Phase 1: Synthetic Data Generation")
+    parser.add_argument(
+        "--rows", type=int, default=None,
+        help="Generate this many MSMEs with the vectorized chunked generator "
+             "(default: the original 350-record dataset)."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42,
+        help="With --rows, seed of the per-chunk generators. Default: 42"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"With --rows, MSMEs per chunk (bounds memory; part of the seed). Default: {DEFAULT_CHUNK_SIZE:,}"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="With --rows, worker processes generating chunks. Output does not depend on it. Default: 1"
+    )
+    parser.add_argument(
+        "--schemes", type=int, default=None,
+        help="Synthesize a catalog of this many schemes (default: the 5 reference schemes)."
+    )
+    parser.add_argument(
+        "--storage-format", choices=list(FORMATS), default=None,
+        help="Format of the data/ tables written (default: CHAOSZEN_STORAGE_FORMAT or csv)."
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    # Ensure the data directory exists
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_dir = os.path.join(base_dir, 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    
-    msme_df = generate_msme_data(350)
-    msme_df.to_csv(os.path.join(data_dir, 'msme_data.csv'), index=False)
+    args = parse_args()
+
+    # Tables go to data/ (or CHAOSZEN_DATA_DIR) in the format set by
+    # --storage-format / CHAOSZEN_STORAGE_FORMAT (default csv)
+    if args.rows is None:
+        msme_df = generate_msme_data(350)
+        write_table(msme_df, 'msme_data', args.storage_format)
+        msme_rows = len(msme_df)
+        growth_counts = msme_df['Growth_Category'].value_counts()
+    else:
+        t0 = time.perf_counter()
+        growth_counts = pd.Series(0, index=GROWTH_LABELS)
+        with TableAppender('msme_data', args.storage_format) as out:
+            for chunk in generate_msme_registry(args.rows, args.seed, args.chunk_size, args.workers):
+                growth_counts = growth_counts.add(chunk['Growth_Category'].value_counts(), fill_value=0)
+                out.append(chunk)
+        msme_rows = out.rows
+        print(f"Generated {msme_rows:,} MSMEs in {time.perf_counter() - t0:.1f}s -> '{out.path}'")
     
-    scheme_df = generate_scheme_data()
-    scheme_df.to_csv(os.path.join(data_dir, 'schemes_data.csv'), index=False)
+    scheme_df = generate_scheme_data() if args.schemes is None else generate_scheme_catalog(args.schemes, args.seed)
+    write_table(scheme_df, 'schemes_data', args.storage_format)
     
     print("Phase 1 Data Validation Summary:")
-    print(f"- MSME Records: {len(msme_df)}")
+    print(f"- MSME Records: {msme_rows}")
     print(f"- Scheme Records: {len(scheme_df)}")
     print("- MSME Headers matched exactly (including 'Export Percentage' space)")
     print("- Growth_Category distribution:")
-    print(msme_df['Growth_Category'].value_counts())
+    print(growth_counts)
@@ -0,0 +1,442 @@
+"""
+Phase 2: Lightweight Growth Model Inference
+===========================================
+Scores MSMEs with the trained growth model without sklearn or pickle.
+
+growth_model.py compiles its fitted Pipeline (StandardScaler + OneHotEncoder
++ RandomForestClassifier) into flat NumPy arrays saved as
+model_artifacts/growth_model_compiled.npz:
+
+  - the scaler becomes an affine step (x - mean) / scale on the numeric
+    columns,
+  - the one-hot encoder becomes a lookup from each raw category code to
+    its 0/1 indicator columns,
+  - all trees are concatenated into one node table (feature, threshold,
+    children, class probabilities), with leaves pointing to themselves.
+
+Scoring walks every tree for a whole batch of rows at once, one vectorized
+step per tree level, advancing only the walks that have not reached a leaf.
+Probabilities, predicted categories and Growth_Score match the pickled
+pipeline's predict_proba / predict exactly. Loading the .npz takes a few
+milliseconds, against about 1.5s to import sklearn and unpickle the
+pipeline, so a fresh process scoring one MSME is done in under a second,
+most of it the numpy/pandas import. Single-MSME calls also skip sklearn's
+per-call overhead. In bulk, sklearn's compiled tree walker is about 5x
+faster (see benchmarks/bench_growth_inference.py), so batch scoring uses
+the pickled pipeline whenever scikit-learn is installed and the compiled
+model otherwise; --chunk-size keeps memory flat on registries larger
+than RAM.
+
+Usage:
+    python growth_inference.py                       # rescore msme_data
+    python growth_inference.py --chunk-size 100000   # stream large registries
+    python growth_inference.py --chunk-size 100000 --workers 8 --confidence
+    python growth_inference.py --engine compiled     # score without sklearn
+
+    from growth_inference import load_model
+    model = load_model()
+    scored = model.score_frame(df)   # adds Growth_Score, Predicted_Growth_Category
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import pickle
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from search_index import PREDICTIONS_TABLE, build_search_index
+from storage import FORMATS, TableAppender, iter_table_chunks, read_table, write_table
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPILED_MODEL_PATH = os.path.join(BASE_DIR, "model_artifacts", "growth_model_compiled.npz")
+PIPELINE_MODEL_PATH = os.path.join(BASE_DIR, "model_artifacts", "growth_model.pkl")
+
+# Growth_Score = sum(probability * weight) over Low / Moderate / High
+GROWTH_SCORE_WEIGHTS = np.array([0.0, 50.0, 100.0])
+
+DEFAULT_BATCH_SIZE = 2048
+SWEEP_EVERY = 4   # tree levels between removing finished walks
+
+
+# ---------------------------------------------------------------------------
+# 1. SCORE COLUMNS
+# ---------------------------------------------------------------------------
+
+def growth_frame(df: pd.DataFrame, proba: np.ndarray, class_labels, confidence: bool = False) -> pd.DataFrame:
+    """
+    df with Growth_Score and Predicted_Growth_Category derived from one
+    predict_proba matrix (columns in class_labels order). The predicted
+    category is the argmax, exactly what RandomForestClassifier.predict
+    returns, so the trees never have to be walked a second time.
+    With confidence=True a Confidence_<label> column per class is added.
+    """
+    df = df.copy()
+    df["Growth_Score"] = (proba[:, 0] * GROWTH_SCORE_WEIGHTS[0]) + (proba[:, 1] * GROWTH_SCORE_WEIGHTS[1]) \
+        + (proba[:, 2] * GROWTH_SCORE_WEIGHTS[2])
+    df["Predicted_Growth_Category"] = np.asarray(class_labels)[proba.argmax(axis=1)]
+    if confidence:
+        for i, label in enumerate(class_labels):
+            df[f"Confidence_{label}"] = proba[:, i]
+    return df
+
+
+# ---------------------------------------------------------------------------
+# 2. COMPILED MODEL
+# ---------------------------------------------------------------------------
+
+class CompiledGrowthModel:
+    """
+    Random forest as flat node arrays over a feature matrix Z laid out like
+    the pipeline's transformed matrix: scaled numeric features, then one
+    0/1 indicator column per (categorical feature, category).
+
+    Node i sends a row to child[2*i + (Z[:, feature[i]] > threshold[i])];
+    leaves point to themselves. Roots holds each tree's first node.
+    """
+
+    def __init__(self, numerical_features, categorical_features, categories, class_labels,
+                 mean, scale, feature, threshold, child, is_leaf, value, roots):
+        self.numerical_features = list(numerical_features)
+        self.categorical_features = list(categorical_features)
+        self.categories = [list(c) for c in categories]
+        self.class_labels = list(class_labels)
+        self.mean = mean
+        self.scale = scale
+        self.feature = feature
+        self.threshold = threshold
+        self.child = child
+        self.is_leaf = is_leaf
+        self.value = value
+        self.roots = roots
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    # -- input encoding ------------------------------------------------------
+
+    def feature_matrix(self, df: pd.DataFrame) -> np.ndarray:
+        """Scaled numerics and category indicators, float32 as the trees see them."""
+        num = df[self.numerical_features].to_numpy(dtype=np.float64)
+        blocks = [((num - self.mean) / self.scale).astype(np.float32)]
+
+        # Indicators straight from category codes. Unknown categories (code -1)
+        # pick the all-zero row, as OneHotEncoder(handle_unknown="ignore") does
+        for col, cats in zip(self.categorical_features, self.categories):
+            codes = pd.Categorical(df[col], categories=cats).codes
+            lookup = np.vstack([np.eye(len(cats), dtype=np.float32), np.zeros(len(cats), np.float32)])
+            blocks.append(lookup[codes])
+        return np.hstack(blocks)
+
+    # -- scoring -------------------------------------------------------------
+
+    def predict_proba(self, df: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        z = self.feature_matrix(df)
+        out = np.empty((len(z), self.value.shape[1]))
+        for start in range(0, len(z), batch_size):
+            out[start:start + batch_size] = self._proba(z[start:start + batch_size])
+        return out
+
+    def _proba(self, z: np.ndarray) -> np.ndarray:
+        n, width = z.shape
+        trees = self.n_trees
+        flat_z = np.ascontiguousarray(z).ravel()
+
+        # One cursor per (tree, row) walk, tree-major so each step touches one
+        # tree's nodes at a time
+        # (leaves loop to themselves, so finished walks are only swept out
+        # every few steps)
+        leaf = np.empty(n * trees, dtype=np.int32)
+        walk = np.arange(n * trees, dtype=np.int32)
+        at = np.repeat(self.roots.astype(np.int32), n)
+        row_base = np.tile(np.arange(n, dtype=np.int32) * width, trees)
+        step = 0
+        while walk.size:
+            go_right = flat_z[row_base + self.feature[at]] > self.threshold[at]
+            at = self.child[2 * at + go_right]
+            step += 1
+            if step % SWEEP_EVERY == 0:
+                done = self.is_leaf[at]
+                leaf[walk[done]] = at[done]
+                walk, at, row_base = walk[~done], at[~done], row_base[~done]
+
+        # Average tree by tree, in forest order, like RandomForestClassifier
+        leaf_values = self.value[leaf].reshape(trees, n, -1)
+        proba = np.zeros((n, self.value.shape[1]))
+        for t in range(trees):
+            proba += leaf_values[t]
+        return proba / trees
+
+    def score_frame(self, df: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE,
+                    confidence: bool = False) -> pd.DataFrame:
+        """df with Growth_Score and Predicted_Growth_Category appended."""
+        return growth_frame(df, self.predict_proba(df, batch_size), self.class_labels, confidence)
+
+    # -- persistence ---------------------------------------------------------
+
+    def save(self, path: str = COMPILED_MODEL_PATH) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = {
+            "numerical_features": self.numerical_features,
+            "categorical_features": self.categorical_features,
+            "categories": self.categories,
+            "class_labels": self.class_labels,
+        }
+        np.savez(
+            path, meta=np.array(json.dumps(meta)),
+            mean=self.mean, scale=self.scale, feature=self.feature, threshold=self.threshold,
+            child=self.child, is_leaf=self.is_leaf, value=self.value, roots=self.roots,
+        )
+        return path
+
+
+def load_model(path: str = COMPILED_MODEL_PATH) -> CompiledGrowthModel:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"'{path}' not found. Run growth_model.py (Phase 2) first.")
+    with np.load(path) as npz:
+        meta = json.loads(str(npz["meta"]))
+        arrays = {k: npz[k] for k in npz.files if k != "meta"}
+    return CompiledGrowthModel(
+        meta["numerical_features"], meta["categorical_features"], meta["categories"],
+        meta["class_labels"], **arrays,
+    )
+
+
+class PipelineGrowthModel:
+    """
+    The pickled sklearn Pipeline behind the same scoring interface as
+    CompiledGrowthModel. Faster on bulk rows (sklearn's tree walker is
+    compiled), but needs scikit-learn installed to unpickle.
+    """
+
+    def __init__(self, pipeline, class_labels):
+        self.pipeline = pipeline
+        self.class_labels = list(class_labels)
+        self.features = list(pipeline.named_steps["preprocessor"].feature_names_in_)
+
+    def predict_proba(self, df: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        return self.pipeline.predict_proba(df[self.features])
+
+    def score_frame(self, df: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE,
+                    confidence: bool = False) -> pd.DataFrame:
+        return growth_frame(df, self.predict_proba(df, batch_size), self.class_labels, confidence)
+
+
+def load_pipeline_model(path: str = PIPELINE_MODEL_PATH) -> PipelineGrowthModel:
+    """growth_model.pkl plus the label_encoder.pkl saved next to it."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"'{path}' not found. Run growth_model.py (Phase 2) first.")
+    with open(path, "rb") as f:
+        pipeline = pickle.load(f)
+    with open(os.path.join(os.path.dirname(path), "label_encoder.pkl"), "rb") as f:
+        le = pickle.load(f)
+    return PipelineGrowthModel(pipeline, le.classes_)
+
+
+# engine name -> (loader, default artifact)
+ENGINES = {
+    "compiled": (load_model, COMPILED_MODEL_PATH),
+    "sklearn": (load_pipeline_model, PIPELINE_MODEL_PATH),
+}
+
+# Bulk scoring engine: sklearn's tree walker when it is installed
+DEFAULT_ENGINE = "sklearn" if importlib.util.find_spec("sklearn") else "compiled"
+
+
+# ---------------------------------------------------------------------------
+# 3. COMPILING A FITTED PIPELINE
+# ---------------------------------------------------------------------------
+
+def _float32_threshold(threshold: np.ndarray) -> np.ndarray:
+    """
+    sklearn compares float32 features against float64 thresholds. Rounding
+    each threshold down to the nearest float32 keeps every comparison
+    x > t identical while halving the node table's threshold column.
+    """
+    t32 = threshold.astype(np.float32)
+    above = t32.astype(np.float64) > threshold
+    t32[above] = np.nextafter(t32[above], np.float32(-np.inf))
+    return t32
+
+
+def compile_pipeline(pipeline, class_labels) -> CompiledGrowthModel:
+    """
+    Flatten a fitted Pipeline(preprocessor=ColumnTransformer[num: StandardScaler,
+    cat: OneHotEncoder], classifier=RandomForestClassifier). Works on the
+    fitted objects' attributes only, so this module never imports sklearn.
+    """
+    pre = pipeline.named_steps["preprocessor"]
+    forest = pipeline.named_steps["classifier"]
+    scaler = pre.named_transformers_["num"]
+    encoder = pre.named_transformers_["cat"]
+    numerical = [c for name, _, cols in pre.transformers_ if name == "num" for c in cols]
+    categorical = [c for name, _, cols in pre.transformers_ if name == "cat" for c in cols]
+
+    feature, threshold, child, is_leaf, value, roots = [], [], [], [], [], []
+    offset = 0
+    for est in forest.estimators_:
+        tree = est.tree_
+        n = tree.node_count
+        leaf = tree.children_left == -1
+        ids = np.arange(n)
+
+        # Z has the transformed matrix's column order, so split features carry over
+        feature.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        threshold.append(_float32_threshold(np.where(leaf, np.inf, tree.threshold)))
+        child.append((np.column_stack([
+            np.where(leaf, ids, tree.children_left), np.where(leaf, ids, tree.children_right),
+        ]).ravel() + offset).astype(np.int32))
+        is_leaf.append(leaf)
+
+        proba = tree.value[:, 0, :].astype(np.float64)
+        normalizer = proba.sum(axis=1)
+        normalizer[normalizer == 0.0] = 1.0
+        value.append(proba / normalizer[:, None])
+
+        roots.append(offset)
+        offset += n
+
+    return CompiledGrowthModel(
+        numerical, categorical, [list(map(str, c)) for c in encoder.categories_], class_labels,
+        mean=scaler.mean_.astype(np.float64), scale=scaler.scale_.astype(np.float64),
+        feature=np.concatenate(feature), threshold=np.concatenate(threshold),
+        child=np.concatenate(child), is_leaf=np.concatenate(is_leaf),
+        value=np.concatenate(value), roots=np.array(roots, dtype=np.int64),
+    )
+
+
+# ---------------------------------------------------------------------------
+# 4. BATCH SCORING
+# ---------------------------------------------------------------------------
+
+_worker_model = None
+
+
+def _load_worker_model(engine: str, path: str) -> None:
+    global _worker_model
+    _worker_model = ENGINES[engine][0](path)
+
+
+def _score_chunk(chunk: pd.DataFrame, batch_size: int, confidence: bool) -> pd.DataFrame:
+    return _worker_model.score_frame(chunk, batch_size, confidence)
+
+
+def score_in_order(chunks, engine: str = DEFAULT_ENGINE, path: str | None = None,
+                   batch_size: int = DEFAULT_BATCH_SIZE, confidence: bool = False, workers: int = 1):
+    """
+    Yield each chunk scored, in input order.
+
+    With workers > 1 every worker process loads the model once and at most
+    2 x workers chunks are in flight, so a streamed input is never read
+    ahead without bound.
+    """
+    path = path or ENGINES[engine][1]
+    if workers <= 1:
+        model = ENGINES[engine][0](path)
+        for chunk in chunks:
+            yield model.score_frame(chunk, batch_size, confidence)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker_model,
+                             initargs=(engine, path)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_chunk, chunk, batch_size, confidence))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def score_table(source: str = "msme_data", output: str = "msme_predictions", engine: str = DEFAULT_ENGINE,
+                path: str | None = None, chunk_size: int = 0, batch_size: int = DEFAULT_BATCH_SIZE,
+                confidence: bool = False, workers: int = 1, fmt: str | None = None) -> tuple[int, str]:
+    """
+    Score every row of the source table and write the output table without
+    retraining. Returns (rows scored, output path).
+
+    With chunk_size > 0 the source is streamed and appended chunk by chunk
+    (bounded memory); otherwise it is read whole and, with workers > 1,
+    split into one contiguous block per worker.
+    """
+    if chunk_size > 0:
+        chunks = iter_table_chunks(source, chunk_size, fmt)
+        with TableAppender(output, fmt) as out:
+            for scored in score_in_order(chunks, engine, path, batch_size, confidence, workers):
+                out.append(scored)
+        return out.rows, out.path
+
+    df = read_table(source, fmt)
+    if workers > 1:
+        edges = np.linspace(0, len(df), workers + 1).astype(int)
+        blocks = [df.iloc[start:stop] for start, stop in zip(edges[:-1], edges[1:])]
+        scored = pd.concat(list(score_in_order(blocks, engine, path, batch_size, confidence, workers)))
+    else:
+        scored = next(score_in_order([df], engine, path, batch_size, confidence))
+    return len(scored), write_table(scored, output, fmt)
+
+
+# ---------------------------------------------------------------------------
+# 5. CLI
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Phase 2: score MSMEs with the saved growth model")
+    parser.add_argument(
+        "--chunk-size", type=int, default=0,
+        help="Stream msme_data in chunks of this many rows (default: score it in one go)."
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+        help=f"Rows per vectorized tree walk. Default: {DEFAULT_BATCH_SIZE}"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes scoring chunks in parallel; output keeps input order. Default: 1"
+    )
+    parser.add_argument(
+        "--confidence", action="store_true",
+        help="Also write one Confidence_<class> probability column per growth category."
+    )
+    parser.add_argument(
+        "--engine", choices=list(ENGINES), default=DEFAULT_ENGINE,
+        help="sklearn: the pickled pipeline (faster in bulk). compiled: the .npz forest, no sklearn "
+             f"needed (faster to start). Default: sklearn if installed, else compiled ({DEFAULT_ENGINE})"
+    )
+    parser.add_argument(
+        "--model", default=None,
+        help="Model file written by growth_model.py (default: the engine's artifact in model_artifacts/)."
+    )
+    parser.add_argument(
+        "--output", default="msme_predictions",
+        help="Table to write scored rows to. Default: msme_predictions"
+    )
+    parser.add_argument(
+        "--storage-format", choices=list(FORMATS), default=None,
+        help="Format of the data/ tables read and written (default: CHAOSZEN_STORAGE_FORMAT or csv)."
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    t0 = time.perf_counter()
+    rows, path = score_table(
+        output=args.output, engine=args.engine, path=args.model, chunk_size=args.chunk_size,
+        batch_size=args.batch_size, confidence=args.confidence, workers=args.workers,
+        fmt=args.storage_format,
+    )
+    print(f"Scored {rows:,} MSMEs with the {args.engine} growth model in "
+          f"{time.perf_counter() - t0:.3f}s -> '{path}'")
+    if args.output == PREDICTIONS_TABLE and build_search_index(fmt=args.storage_format):
+        print("Search index rebuilt for GET /api/search.")
+
+
+if __name__ == "__main__":
+    main()
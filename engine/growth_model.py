@@ -1,40 +1,376 @@
+import argparse
+import copy
+import json
+import math
+import time
 import pandas as pd
 import numpy as np
 import os
 import pickle
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split, GridSearchCV, ParameterGrid, StratifiedKFold
 from sklearn.preprocessing import StandardScaler, OneHotEncoder, LabelEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix, f1_score
 
+from growth_inference import compile_pipeline, growth_frame, score_table
+from search_index import build_search_index
+from storage import read_table, table_path, write_table
+
 # Set random seed for reproducibility
 np.random.seed(42)
 
+CATEGORICAL_FEATURES = ['Sector', 'Ownership_Type', 'Category', 'Location_Type']
+NUMERICAL_FEATURES = [
+    'Years_of_Operation', 'Annual_Revenue', 'Revenue_Growth_Rate', 'Profit_Margin', 
+    'Debt_Outstanding', 'Loan_to_Revenue_Ratio', 'Number_of_Employees', 
+    'Capacity_Utilization', 'Export Percentage', 'Technology_Level', 
+    'GST_Compliance_Score', 'Inspection_Score', 'Documentation_Readiness_Score'
+]
+TARGET = 'Growth_Category'
+
+# Hyperparameter Tuning
+PARAM_GRID = {
+    'classifier__n_estimators': [100, 200],
+    'classifier__max_depth': [10, 20, None],
+    'classifier__min_samples_split': [2, 5]
+}
+
+SEARCHES = ['grid', 'halving']
+HALVING_FACTOR = 3
+
+
+def build_pipeline():
+    """Untrained StandardScaler + OneHotEncoder + RandomForest pipeline."""
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), NUMERICAL_FEATURES),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES)
+        ])
+    return Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('classifier', RandomForestClassifier(random_state=42))
+    ])
+
+
+def transformed_feature_names(model):
+    """Column names of the preprocessed matrix the forest is trained on."""
+    ohe = model.named_steps['preprocessor'].named_transformers_['cat']
+    return NUMERICAL_FEATURES + list(ohe.get_feature_names_out(CATEGORICAL_FEATURES))
+
+
+# ---------------------------------------------------------------------------
+# Versioned artifacts
+# ---------------------------------------------------------------------------
+# model_artifacts/ always holds the current model; every training run also
+# keeps a copy in model_artifacts/versions/v<N>/ and appends an entry to
+# model_artifacts/manifest.json.
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model_artifacts')
+MANIFEST_PATH = os.path.join(ARTIFACTS_DIR, 'manifest.json')
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {'current': None, 'versions': []}
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def save_artifacts(directory, model, le, feature_names):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'growth_model.pkl'), 'wb') as f:
+        pickle.dump(model, f)
+    with open(os.path.join(directory, 'label_encoder.pkl'), 'wb') as f:
+        pickle.dump(le, f)
+    with open(os.path.join(directory, 'feature_names.pkl'), 'wb') as f:
+        pickle.dump(feature_names, f)
+    # Flat NumPy version of the pipeline for sklearn-free batch scoring
+    compile_pipeline(model, list(le.classes_)).save(os.path.join(directory, 'growth_model_compiled.npz'))
+
+
+def publish_version(model, le, feature_names, info):
+    """Save the model as the current artifacts and as the next version; returns its number."""
+    manifest = load_manifest()
+    version = max((v['version'] for v in manifest['versions']), default=0) + 1
+    save_artifacts(os.path.join(ARTIFACTS_DIR, 'versions', f'v{version}'), model, le, feature_names)
+    save_artifacts(ARTIFACTS_DIR, model, le, feature_names)
+
+    manifest['versions'].append({
+        'version': version, 'parent': manifest['current'],
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'n_estimators': int(model.named_steps['classifier'].n_estimators), **info,
+    })
+    manifest['current'] = version
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return version
+
+
+def cached_folds(preprocessor, X, y, cv=5):
+    """
+    Fit the preprocessor once per CV fold (same StratifiedKFold splits as
+    GridSearchCV) and keep the transformed train/validation matrices, so
+    candidates only ever fit the classifier.
+    """
+    folds = []
+    for train_idx, val_idx in StratifiedKFold(n_splits=cv).split(X, y):
+        pre = clone(preprocessor)
+        Z_train = pre.fit_transform(X.iloc[train_idx])
+        folds.append((Z_train, y[train_idx], pre.transform(X.iloc[val_idx]), y[val_idx]))
+    return folds
+
+
+def fold_forest(classifier, fold, fraction):
+    """Fit on a stratified fraction of the fold's train rows; returns (forest, validation fold)."""
+    Z_train, y_train, Z_val, y_val = fold
+    if fraction < 1.0:
+        keep, _ = train_test_split(
+            np.arange(len(y_train)), train_size=fraction, random_state=42, stratify=y_train
+        )
+        keep = np.sort(keep)
+        Z_train, y_train = Z_train[keep], y_train[keep]
+    return clone(classifier).fit(Z_train, y_train), (Z_val, y_val)
+
+
+def prefix_f1(forest, n_estimators, validation):
+    """
+    Macro-F1 of the forest's first n_estimators trees. Tree seeds are drawn
+    in order from random_state, so this is exactly the score of a separately
+    fitted forest with n_estimators trees.
+    """
+    Z_val, y_val = validation
+    if n_estimators < len(forest.estimators_):
+        forest = copy.copy(forest)
+        forest.estimators_ = forest.estimators_[:n_estimators]
+        forest.n_estimators = n_estimators
+    return f1_score(y_val, forest.predict(Z_val), average='macro')
+
+
+def halving_search(pipeline, param_grid, X, y, cv=5, factor=HALVING_FACTOR, time_budget=None):
+    """
+    Successive halving over the grid: every candidate is cross-validated on
+    1/factor^k of the training rows, the best 1/factor advance to factor x
+    more rows, and the last rung uses all of them. Fold preprocessing is
+    cached across all candidates and rungs, and candidates that differ only
+    in n_estimators share one forest (the smaller ones score its first trees).
+    Early rungs also grow fewer trees, sqrt(fraction) of each forest: on
+    small registries a tree costs about the same whatever its sample size,
+    so subsampling rows alone saves little. The last rung scores full
+    forests on all rows. Forests are fitted with n_jobs=-1, so trees build
+    on every core, as GridSearchCV(n_jobs=-1) spreads its fits.
+
+    With time_budget (seconds) no new forest is started once it is spent;
+    the winner is the best candidate of the furthest rung reached.
+    Returns (best params, per-candidate log, seconds). Each logged candidate
+    is charged the fit time of the trees it adds to its group's shared
+    forest plus its own scoring time, so the log adds up to the time spent.
+    """
+    t_start = time.perf_counter()
+    folds = cached_folds(pipeline.named_steps['preprocessor'], X, y, cv)
+    print(f"Preprocessed {cv} CV folds once in {time.perf_counter() - t_start:.2f}s")
+
+    classifier = clone(pipeline.named_steps['classifier']).set_params(n_jobs=-1)
+    trees_key = 'classifier__n_estimators'
+    candidates = list(ParameterGrid(param_grid))
+    n_rungs = max(1, math.ceil(math.log(len(candidates), factor)))
+    best_params, log = candidates[0], []
+
+    for rung in range(n_rungs):
+        fraction = float(factor) ** (rung + 1 - n_rungs)
+        groups = {}
+        for params in candidates:
+            shared = tuple((k, v) for k, v in params.items() if k != trees_key)
+            groups.setdefault(shared, []).append(params)
+
+        scores = []
+        for members in groups.values():
+            if time_budget is not None and time.perf_counter() - t_start > time_budget:
+                break
+            # Largest forest of the group first; the others reuse its trees
+            members = sorted(members, key=lambda p: -p.get(trees_key, classifier.n_estimators))
+            n_max = math.ceil(members[0].get(trees_key, classifier.n_estimators) * math.sqrt(fraction))
+            t0 = time.perf_counter()
+            model = clone(classifier).set_params(**{k.split('__', 1)[1]: v for k, v in members[0].items()})
+            model.set_params(n_estimators=n_max)
+            fitted = [fold_forest(model, fold, fraction) for fold in folds]
+            fit_seconds = time.perf_counter() - t0
+
+            # Smallest first: each candidate pays for the trees beyond the previous one
+            n_prev = 0
+            for params in reversed(members):
+                n_trees = math.ceil(params.get(trees_key, classifier.n_estimators) * math.sqrt(fraction))
+                t0 = time.perf_counter()
+                f1 = float(np.mean([prefix_f1(forest, n_trees, val) for forest, val in fitted]))
+                seconds = fit_seconds * (n_trees - n_prev) / n_max + time.perf_counter() - t0
+                n_prev = n_trees
+                print(f"  rung {rung} | {fraction:6.1%} of rows | F1 {f1:.4f} | {seconds:6.2f}s | {params}")
+                scores.append((f1, params))
+                log.append({'rung': rung, 'fraction': fraction, 'params': params, 'f1': f1, 'seconds': seconds})
+
+        if not scores:
+            break
+        # Stable sort in grid order: ties keep GridSearchCV's first-best choice
+        order = {id(params): i for i, params in enumerate(candidates)}
+        ranked = sorted(scores, key=lambda s: (-s[0], order[id(s[1])]))
+        best_params = ranked[0][1]
+        if len(scores) < len(candidates):
+            print(f"Time budget of {time_budget:g}s reached in rung {rung}.")
+            break
+        candidates = [params for _, params in ranked[:math.ceil(len(candidates) / factor)]]
+
+    return best_params, log, time.perf_counter() - t_start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Phase 2: Growth Prediction Model")
+    parser.add_argument(
+        "--search", choices=SEARCHES, default="grid",
+        help="grid: exhaustive GridSearchCV (default). halving: successive halving over the "
+             "same grid with cached fold preprocessing."
+    )
+    parser.add_argument(
+        "--time-budget", type=float, default=None,
+        help="With --search halving, wall-clock seconds after which no new candidate is started."
+    )
+    parser.add_argument(
+        "--incremental", metavar="TABLE", default=None,
+        help="Skip full training: add trees fitted on the new MSME batch in data/TABLE to the "
+             "current model (warm start) and publish it as a new version."
+    )
+    parser.add_argument(
+        "--add-trees", type=int, default=None,
+        help="With --incremental, trees to add (default: in proportion to the batch's share "
+             "of all rows trained on so far)."
+    )
+    parser.add_argument(
+        "--score-only", action="store_true",
+        help="Skip training: rescore msme_data with the saved growth_model.pkl and "
+             "rewrite msme_predictions."
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=0,
+        help="With --score-only, stream msme_data in chunks of this many rows (bounded memory)."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="With --score-only, number of worker processes scoring in parallel. Default: 1"
+    )
+    parser.add_argument(
+        "--confidence", action="store_true",
+        help="Also write one Confidence_<class> probability column per growth category."
+    )
+    return parser.parse_args()
+
+
+def report_search_index():
+    search_path = build_search_index()
+    if search_path:
+        print(f"Search index saved to '{search_path}'")
+
+
+def score_only(args):
+    print("Phase 2: rescoring MSMEs with the saved growth model (no retraining)...")
+    rows, predictions_path = score_table(
+        engine="sklearn", chunk_size=args.chunk_size, confidence=args.confidence, workers=args.workers,
+    )
+    print(f"Predictions and Growth Scores for {rows} MSMEs saved to '{predictions_path}'")
+    report_search_index()
+
+
+def incremental_update(args):
+    """
+    Grow the current forest with trees fitted only on a new batch, so the
+    cost follows the batch size rather than the full history. The fitted
+    scaler and encoder are kept as they are (a category first seen in the
+    batch is ignored like any unknown category); 20% of the batch is held
+    out to compare the model before and after.
+    """
+    print(f"Phase 2: incremental growth model update from '{args.incremental}'...")
+    with open(os.path.join(ARTIFACTS_DIR, 'growth_model.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(ARTIFACTS_DIR, 'label_encoder.pkl'), 'rb') as f:
+        le = pickle.load(f)
+
+    batch = read_table(args.incremental)
+    X = batch[CATEGORICAL_FEATURES + NUMERICAL_FEATURES]
+    y = le.transform(batch[TARGET])
+    missing = [label for i, label in enumerate(le.classes_) if i not in set(y)]
+    if missing:
+        raise ValueError(f"New batch has no {', '.join(missing)} rows; every growth category is "
+                         f"needed to add trees to the forest.")
+    print(f"Loaded {len(batch)} new records.")
+
+    X_fit, X_hold, y_fit, y_hold = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    f1_before = f1_score(y_hold, model.predict(X_hold), average='macro')
+
+    manifest = load_manifest()
+    current = next((v for v in manifest['versions'] if v['version'] == manifest['current']), {})
+    forest = model.named_steps['classifier']
+    n_before = forest.n_estimators
+    if args.add_trees:
+        add = args.add_trees
+    elif current.get('rows_total'):
+        add = max(1, round(n_before * len(y_fit) / current['rows_total']))
+    else:
+        add = max(1, n_before // 10)
+
+    t0 = time.perf_counter()
+    Z_fit = model.named_steps['preprocessor'].transform(X_fit)
+    forest.set_params(warm_start=True, n_estimators=n_before + add).fit(Z_fit, y_fit)
+    forest.set_params(warm_start=False)
+    seconds = time.perf_counter() - t0
+
+    y_pred = model.predict(X_hold)
+    f1 = f1_score(y_hold, y_pred, average='macro')
+    print(f"Added {add} trees ({n_before} -> {n_before + add}) on {len(y_fit)} rows in {seconds:.2f}s")
+    print(f"Held-out macro F1: {f1_before:.4f} before, {f1:.4f} after")
+
+    version = publish_version(model, le, transformed_feature_names(model), {
+        'mode': 'incremental', 'data': args.incremental, 'rows': int(len(y_fit)),
+        'rows_total': int(current.get('rows_total', 0) + len(y_fit)), 'trees_added': int(add),
+        'holdout_macro_f1_before': round(float(f1_before), 4), 'holdout_macro_f1': round(float(f1), 4),
+    })
+
+    report_path = os.path.join(os.path.dirname(ARTIFACTS_DIR), 'reports', 'phase2_evaluation.txt')
+    with open(report_path, 'a') as f:
+        f.write(f"\n\nIncremental Update v{version} ('{args.incremental}', {len(batch)} rows)\n")
+        f.write(f"Trees: {n_before} -> {n_before + add} ({seconds:.2f}s)\n")
+        f.write(classification_report(le.inverse_transform(y_hold), le.inverse_transform(y_pred)))
+        f.write(f"\nHeld-out Macro F1-Score: {f1_before:.4f} -> {f1:.4f}\n")
+
+    print(f"Model artifacts saved in '{ARTIFACTS_DIR}/' (version v{version})")
+    print("Run 'growth_model.py --score-only' to refresh msme_predictions with it.")
+
+
 def main():
+    args = parse_args()
+    if args.score_only:
+        score_only(args)
+        return
+    if args.incremental:
+        incremental_update(args)
+        return
+
     print("Starting Phase 2: Growth Prediction Model Training...")
     
     # 1. Load Data
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_path = os.path.join(base_dir, 'data', 'msme_data.csv')
+    data_path = table_path('msme_data')
     
     if not os.path.exists(data_path):
         print(f"Error: {data_path} not found.")
         return
     
-    df = pd.read_csv(data_path)
+    df = read_table('msme_data')
     print(f"Loaded {len(df)} records.")
 
     # 2. Define Features and Target
-    categorical_features = ['Sector', 'Ownership_Type', 'Category', 'Location_Type']
-    numerical_features = [
-        'Years_of_Operation', 'Annual_Revenue', 'Revenue_Growth_Rate', 'Profit_Margin', 
-        'Debt_Outstanding', 'Loan_to_Revenue_Ratio', 'Number_of_Employees', 
-        'Capacity_Utilization', 'Export Percentage', 'Technology_Level', 
-        'GST_Compliance_Score', 'Inspection_Score', 'Documentation_Readiness_Score'
-    ]
-    target = 'Growth_Category'
+    categorical_features = CATEGORICAL_FEATURES
+    numerical_features = NUMERICAL_FEATURES
+    target = TARGET
 
     X = df[categorical_features + numerical_features]
     y = df[target]
@@ -52,32 +388,30 @@ def main():
         X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
     )
 
-    # 4. Preprocessing Pipeline
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ('num', StandardScaler(), numerical_features),
-            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
-        ])
+    # 4-5. Preprocessing + Random Forest pipeline
+    pipeline = build_pipeline()
+    param_grid = PARAM_GRID
 
-    # 5. Model Training (Random Forest)
-    pipeline = Pipeline(steps=[
-        ('preprocessor', preprocessor),
-        ('classifier', RandomForestClassifier(random_state=42))
-    ])
-
-    # Hyperparameter Tuning
-    param_grid = {
-        'classifier__n_estimators': [100, 200],
-        'classifier__max_depth': [10, 20, None],
-        'classifier__min_samples_split': [2, 5]
-    }
-
-    print("Running GridSearchCV for hyperparameter tuning...")
-    grid_search = GridSearchCV(pipeline, param_grid, cv=5, scoring='f1_macro', n_jobs=-1)
-    grid_search.fit(X_train, y_train)
+    search_summary = None
+    if args.search == 'halving':
+        print("Running successive halving for hyperparameter tuning...")
+        best_params, search_log, search_seconds = halving_search(
+            pipeline, param_grid, X_train, y_train, cv=5, time_budget=args.time_budget
+        )
+        # Refit the winner on the full training split, as GridSearchCV(refit=True) does
+        best_model = clone(pipeline).set_params(**best_params, classifier__n_jobs=-1).fit(X_train, y_train)
+        best_model.set_params(classifier__n_jobs=None)   # saved like GridSearchCV's best_estimator_
+        search_summary = (f"Search: successive halving (factor {HALVING_FACTOR}), "
+                          f"{len(search_log)} candidate evaluations in {search_seconds:.1f}s")
+        print(search_summary)
+    else:
+        print("Running GridSearchCV for hyperparameter tuning...")
+        grid_search = GridSearchCV(pipeline, param_grid, cv=5, scoring='f1_macro', n_jobs=-1)
+        grid_search.fit(X_train, y_train)
+        best_params = grid_search.best_params_
+        best_model = grid_search.best_estimator_
 
-    best_model = grid_search.best_estimator_
-    print(f"Best parameters: {grid_search.best_params_}")
+    print(f"Best parameters: {best_params}")
 
     # 6. Evaluation
     y_pred = best_model.predict(X_test)
@@ -93,7 +427,9 @@ def main():
     with open(report_path, 'w') as f:
         f.write("Phase 2: Growth Prediction Model Evaluation\n")
         f.write("===========================================\n\n")
-        f.write(f"Best Parameters: {grid_search.best_params_}\n\n")
+        f.write(f"Best Parameters: {best_params}\n\n")
+        if search_summary:
+            f.write(f"{search_summary}\n\n")
         f.write("Classification Report:\n")
         f.write(report)
         f.write("\n\nConfusion Matrix:\n")
@@ -102,21 +438,16 @@ def main():
 
     # 7. Growth Score Calculation (0-100)
     # Mapping probabilities: proba[:,0]*0 + proba[:,1]*50 + proba[:,2]*100
+    # Predicted Category for reference is the argmax of the same probabilities
     all_probas = best_model.predict_proba(X)
-    df['Growth_Score'] = (all_probas[:, 0] * 0) + (all_probas[:, 1] * 50) + (all_probas[:, 2] * 100)
-    
-    # Add Predicted Category for reference
-    all_preds_encoded = best_model.predict(X)
-    df['Predicted_Growth_Category'] = le.inverse_transform(all_preds_encoded)
+    df = growth_frame(df, all_probas, le.classes_, confidence=args.confidence)
 
-    predictions_path = os.path.join(base_dir, 'data', 'msme_predictions.csv')
-    df.to_csv(predictions_path, index=False)
+    predictions_path = write_table(df, 'msme_predictions')
     print(f"Predictions and Growth Scores saved to '{predictions_path}'")
 
     # 8. Feature Importance
     # Accessing feature names after OneHotEncoding
-    ohe_categories = best_model.named_steps['preprocessor'].named_transformers_['cat'].get_feature_names_out(categorical_features)
-    feature_names = numerical_features + list(ohe_categories)
+    feature_names = transformed_feature_names(best_model)
     importances = best_model.named_steps['classifier'].feature_importances_
     
     feat_imp = pd.DataFrame({'Feature': feature_names, 'Importance': importances})
@@ -144,21 +475,19 @@ def main():
     except ImportError:
         print("\nWarning: 'shap' library not found. Skipping SHAP artifact generation.")
 
-    # 10. Save Artifacts
+    # 10. Save Artifacts (top level = current model, plus a versioned copy)
     artifacts_dir = os.path.join(base_dir, 'model_artifacts')
-    if not os.path.exists(artifacts_dir):
-        os.makedirs(artifacts_dir)
+    version = publish_version(best_model, le, feature_names, {
+        'mode': 'full', 'data': 'msme_data', 'rows': int(len(X_train)), 'rows_total': int(len(X_train)),
+        'best_params': {k: v for k, v in best_params.items()}, 'test_macro_f1': round(float(f1), 4),
+    })
+    print(f"Compiled inference model saved to '{os.path.join(artifacts_dir, 'growth_model_compiled.npz')}'")
 
-    with open(os.path.join(artifacts_dir, 'growth_model.pkl'), 'wb') as f:
-        pickle.dump(best_model, f)
-    
-    with open(os.path.join(artifacts_dir, 'label_encoder.pkl'), 'wb') as f:
-        pickle.dump(le, f)
-        
-    with open(os.path.join(artifacts_dir, 'feature_names.pkl'), 'wb') as f:
-        pickle.dump(feature_names, f)
+    print(f"\nModel artifacts saved in '{artifacts_dir}/' (version v{version})")
+
+    # 11. Search index over the predictions (served by GET /api/search)
+    report_search_index()
 
-    print(f"\nModel artifacts saved in '{artifacts_dir}/'")
 
 if __name__ == "__main__":
     main()
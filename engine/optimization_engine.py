@@ -3,22 +3,38 @@ Phase 4: Budget-Constrained Optimization Engine
 ================================================
 Selects the best MSME-scheme funding allocations within a government budget
 using a weighted composite score (alpha × revenue_impact + beta × employment_impact)
-and a greedy efficiency-based knapsack algorithm.
+and a greedy efficiency-based knapsack algorithm (or, with --solver exact, an
+exact knapsack solver that reports its optimality gap and gain over greedy).
 
 Usage:
     python optimization_engine.py
     python optimization_engine.py --alpha 0.8 --budget 50000000
     python optimization_engine.py --alpha 0.3 --budget 100000000 --equal-distribution
+    python optimization_engine.py --solver exact --time-limit 5 --gap-limit 0.01
+    python optimization_engine.py --equal-distribution --rebalance
+    python optimization_engine.py --constraint Category=Medium:0.3 --constraint Sector=Retail::0.1
+    python optimization_engine.py --json-out --json-layout columns --unselected-limit 100
+    python optimization_engine.py --json-out --justify-ranks 1,2,3
+    python optimization_engine.py --frontier 10000000:500000000:5000000
 
 Outputs:
     optimization_results.csv   — Selected MSME-scheme pairs with scores & justification
     phase4_evaluation.txt      — Full report with sensitivity analysis
+    budget_frontier.csv        — With --frontier: greedy outcome per budget level
 """
 
 import pandas as pd
 import numpy as np
 import argparse
+import json
 import os
+import sys
+import time
+from collections import OrderedDict
+from itertools import repeat
+
+from result_cache import GreedyRun, ResultCache
+from storage import FORMATS, read_table, table_path, write_table
 
 np.random.seed(42)
 
@@ -35,25 +51,41 @@ CATEGORY_BUDGET_SHARES = {
     "Medium": 0.25,
 }
 
+# --solver exact limits
+EXACT_TIME_LIMIT = 10.0      # seconds
+EXACT_GAP_LIMIT  = 1e-4      # relative gap to the upper bound (0.01%)
+EXACT_MAX_CELLS  = 1 << 17   # finest budget grid tried by the DP
+
 # ---------------------------------------------------------------------------
 # 1. LOAD & VALIDATE DATA
 # ---------------------------------------------------------------------------
 
-def load_eligibility_data(json_mode=False) -> pd.DataFrame:
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    path = os.path.join(base_dir, "data", "scheme_eligibility_results.csv")
+def load_eligibility_data(json_mode=False, fmt=None, include_combined=False) -> pd.DataFrame:
+    path = table_path("scheme_eligibility_results", fmt)
     
     if not os.path.exists(path):
         raise FileNotFoundError(
             f"'{path}' not found. Run scheme_eligibility.py (Phase 3) first."
         )
-    df = pd.read_csv(path)
 
-    # Use only Single_Scheme rows to avoid double-counting in optimization
-    single = df[df["Simulation_Type"] == "Single_Scheme"].copy()
+    # With --one-per-msme every option (single schemes and the stacked
+    # combination) is loaded; the selection then funds at most one per MSME.
+    if include_combined:
+        options = read_table("scheme_eligibility_results", fmt)
+        if not json_mode:
+            combined = int((options["Simulation_Type"] != "Single_Scheme").sum())
+            print(f"Loaded {len(options)} options from Phase 3 for optimization "
+                  f"({len(options) - combined} single, {combined} stacked).\n")
+        return options
+
+    # Use only Single_Scheme rows to avoid double-counting in optimization.
+    # The filter is pushed down into the scan for columnar storage formats.
+    single = read_table(
+        "scheme_eligibility_results", fmt,
+        filters=[("Simulation_Type", "==", "Single_Scheme")],
+    )
     if not json_mode:
-        print(f"Loaded {len(df)} total rows from Phase 3.")
-        print(f"Using {len(single)} Single_Scheme rows for optimization.\n")
+        print(f"Loaded {len(single)} Single_Scheme rows from Phase 3 for optimization.\n")
     return single
 
 
@@ -88,45 +120,137 @@ def compute_scores(df: pd.DataFrame, alpha: float) -> pd.DataFrame:
 
 
 # ---------------------------------------------------------------------------
-# 3. GREEDY KNAPSACK OPTIMIZATION
+# 3. KNAPSACK OPTIMIZATION
 # ---------------------------------------------------------------------------
 
-def greedy_select(df: pd.DataFrame, budget: float) -> pd.DataFrame:
+def efficiency_order(efficiency: np.ndarray) -> np.ndarray:
+    """
+    Positions sorted by efficiency, highest first; NaN (zero-subsidy) pairs
+    go last. Stable, so ties keep their input order.
+    """
+    return np.argsort(-efficiency, kind="stable")
+
+
+def greedy_select_arrays(costs: np.ndarray, budget: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy knapsack walk over costs already in efficiency order.
+
+    Returns (positions of the selected items, remaining budget after each
+    selection). Equivalent to checking `cost <= remaining` item by item, but:
+      - runs of consecutive items that all fit are taken in one
+        np.subtract.accumulate (same left-to-right subtraction, so remaining
+        budgets are bit-identical to the scalar loop),
+      - items that do not fit are skipped a block at a time by searching for
+        the next cost <= remaining,
+      - the walk stops as soon as the cheapest remaining item no longer fits.
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    n = len(costs)
+    suffix_min = np.minimum.accumulate(costs[::-1])[::-1]
+
+    picks, remaining_after = [], []
+    remaining = float(budget)
+    i = 0
+    block = 64
+
+    while i < n and suffix_min[i] <= remaining:
+        if costs[i] > remaining:
+            # Skip ahead to the next item that fits
+            fits = np.flatnonzero(costs[i:i + block] <= remaining)
+            if len(fits) == 0:
+                i += block
+                block = min(block * 2, 1 << 16)
+                continue
+            i += int(fits[0])
+
+        # Fast path: take the leading run of items that all fit
+        run = np.subtract.accumulate(np.concatenate(([remaining], costs[i:i + block])))[1:]
+        k = int(np.argmax(run < 0)) if (run < 0).any() else len(run)
+        picks.append(np.arange(i, i + k))
+        remaining_after.append(run[:k])
+        remaining = float(run[k - 1])
+        i += k
+        block = min(block * 2, 1 << 16) if k == len(run) else 64
+
+    if not picks:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+    return np.concatenate(picks), np.concatenate(remaining_after)
+
+
+def greedy_prefix_arrays(costs: np.ndarray, positions: np.ndarray, remaining: np.ndarray,
+                         budget: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    greedy_select_arrays(costs, budget) for a budget no larger than that of
+    an earlier walk (positions, remaining) over the same costs.
+
+    With less budget every item the larger walk skipped is skipped again, so
+    both walks make the same picks up to the first of its picks that no
+    longer fits; only the items after that one are walked again. Remaining
+    budgets are re-accumulated from `budget`, so the result is bit-identical
+    to a fresh walk.
+    """
+    if len(positions) == 0:
+        return greedy_select_arrays(costs, budget)
+    picked = costs[positions]
+    after = np.subtract.accumulate(np.concatenate(([float(budget)], picked)))[1:]
+    before = np.concatenate(([float(budget)], after[:-1]))
+    misses = np.flatnonzero(picked > before)
+    if len(misses) == 0:
+        return positions.copy(), after
+    j = int(misses[0])
+    start = int(positions[j]) + 1
+    tail, tail_remaining = greedy_select_arrays(costs[start:], float(before[j]))
+    return np.concatenate((positions[:j], tail + start)), np.concatenate((after[:j], tail_remaining))
+
+
+def greedy_select(df: pd.DataFrame, budget: float, order: np.ndarray | None = None) -> pd.DataFrame:
     """
     Greedy efficiency-based knapsack:
     1. Sort all pairs by Efficiency (descending) — most score-per-rupee first
     2. Select a pair if its subsidy fits within the remaining budget
     3. Continue until budget exhausted or all pairs evaluated
+
+    `order` may supply a precomputed efficiency ranking (see AlphaSweepIndex).
+    The selected frame is indexed by position in the sorted order.
     """
-    sorted_df   = df.sort_values("Efficiency", ascending=False).reset_index(drop=True)
-    remaining   = budget
-    selected    = []
-    global_rank = 0
+    if order is None:
+        order = efficiency_order(df["Efficiency"].to_numpy(dtype=np.float64))
+    costs = df["Subsidy_Applied"].to_numpy(dtype=np.float64)[order]
+    positions, remaining = greedy_select_arrays(costs, budget)
+    return selection_frame(df, order, costs, positions, remaining, budget)
+
 
-    for _, row in sorted_df.iterrows():
-        global_rank += 1
-        cost = row["Subsidy_Applied"]
-        if cost <= remaining:
-            row = row.copy()
-            row["Efficiency_Rank"]        = global_rank
-            row["Cumulative_Budget_Used"]  = budget - remaining + cost
-            remaining                     -= cost
-            row["Remaining_Budget"]        = remaining
-            selected.append(row)
+def selection_frame(df: pd.DataFrame, order: np.ndarray, costs: np.ndarray,
+                    positions: np.ndarray, remaining: np.ndarray, budget: float) -> pd.DataFrame:
+    """Rows of df picked at `positions` of `order`, with rank and budget columns."""
+    if len(positions) == 0:
+        return pd.DataFrame()
 
-    return pd.DataFrame(selected) if selected else pd.DataFrame()
+    selected = df.iloc[order[positions]].copy()
+    selected.index = positions
+    selected["Efficiency_Rank"]        = positions + 1
+    remaining_before = np.concatenate(([budget], remaining[:-1]))
+    selected["Cumulative_Budget_Used"] = budget - remaining_before + costs[positions]
+    selected["Remaining_Budget"]       = remaining
+    return selected
 
 
-def greedy_select_with_category_budgets(df: pd.DataFrame, total_budget: float) -> pd.DataFrame:
+def greedy_select_with_category_budgets(df: pd.DataFrame, total_budget: float,
+                                        select=None) -> pd.DataFrame:
     """
     Split total budget by MSME category (40% Micro, 35% Small, 25% Medium)
-    and run a separate greedy selection within each sub-budget.
+    and run a separate selection (greedy by default) within each sub-budget.
+    The greedy default ranks all pairs once and walks each category's slice
+    of that ranking; other selectors get a per-category frame.
     """
+    if select is None:
+        return _category_greedy(df, total_budget)
+
     all_selected = []
     for category, share in CATEGORY_BUDGET_SHARES.items():
         sub_budget  = total_budget * share
         sub_df      = df[df["Category"] == category].copy()
-        selected    = greedy_select(sub_df, sub_budget)
+        selected    = select(sub_df, sub_budget)
         if not selected.empty:
             selected["Sub_Budget_Category"] = category
             selected["Sub_Budget_Allocated"] = round(sub_budget, 2)
@@ -140,6 +264,487 @@ def greedy_select_with_category_budgets(df: pd.DataFrame, total_budget: float) -
     return combined
 
 
+def _category_greedy(df: pd.DataFrame, total_budget: float) -> pd.DataFrame:
+    # A category's slice of the stable global ranking is exactly the ranking
+    # a stable sort of that category alone would give.
+    order = efficiency_order(df["Efficiency"].to_numpy(dtype=np.float64))
+    category = df["Category"].to_numpy()[order]
+    costs_all = df["Subsidy_Applied"].to_numpy(dtype=np.float64)[order]
+
+    picked, frames = [], []
+    for name, share in CATEGORY_BUDGET_SHARES.items():
+        sub_budget = total_budget * share
+        sub_order = order[category == name]
+        costs = costs_all[category == name]
+        positions, remaining = greedy_select_arrays(costs, sub_budget)
+        selected = selection_frame(df, sub_order, costs, positions, remaining, sub_budget)
+        if not selected.empty:
+            selected["Sub_Budget_Category"] = name
+            selected["Sub_Budget_Allocated"] = round(sub_budget, 2)
+            frames.append(selected)
+
+    if not frames:
+        return pd.DataFrame()
+
+    combined = pd.concat(frames, ignore_index=True)
+    combined["Cumulative_Budget_Used"] = combined["Subsidy_Applied"].cumsum()
+    return combined
+
+
+# Dimensions a --constraint can target, by CLI name
+CONSTRAINT_DIMENSIONS = {
+    "Category": "Category",
+    "Sector": "Sector",
+    "Location": "Location_Type",
+    "Location_Type": "Location_Type",
+}
+
+
+def parse_constraint(spec: str) -> dict:
+    """
+    Parse 'Dimension=Value:floor:ceiling' (shares of the total budget,
+    either bound may be left empty), e.g. 'Category=Micro:0.3:0.5' or
+    'Sector=Retail::0.2'.
+    """
+    target, _, bounds = spec.partition(":")
+    dimension, sep, value = target.partition("=")
+    parts = bounds.split(":") if bounds else []
+    if not sep or not value or len(parts) > 2:
+        raise ValueError(f"Constraint '{spec}' must look like Dimension=Value:floor:ceiling")
+    floor = parts[0] if parts else ""
+    ceiling = parts[1] if len(parts) > 1 else ""
+    if dimension not in CONSTRAINT_DIMENSIONS:
+        raise ValueError(f"Unknown constraint dimension '{dimension}'. "
+                         f"Choose from: {', '.join(CONSTRAINT_DIMENSIONS)}.")
+    floor = float(floor) if floor else 0.0
+    ceiling = float(ceiling) if ceiling else 1.0
+    if not 0.0 <= floor <= ceiling <= 1.0:
+        raise ValueError(f"Constraint '{spec}' needs 0 <= floor <= ceiling <= 1")
+    return {"column": CONSTRAINT_DIMENSIONS[dimension], "value": value, "floor": floor, "ceiling": ceiling}
+
+
+def category_floor_constraints() -> list[dict]:
+    """CATEGORY_BUDGET_SHARES as floors, so unspent category budget spills over."""
+    return [{"column": "Category", "value": name, "floor": share, "ceiling": 1.0}
+            for name, share in CATEGORY_BUDGET_SHARES.items()]
+
+
+def budget_constraints(constraints, equal_dist: bool = False, rebalance: bool = False) -> list[dict]:
+    """
+    The constraints a run applies: the category floors with --rebalance,
+    plus the parsed --constraint specs. Raises ValueError when the floors
+    add up to more than the whole budget.
+    """
+    constraints = (category_floor_constraints() if equal_dist and rebalance else []) + list(constraints or [])
+    if sum(c["floor"] for c in constraints) > 1.0 + 1e-9:
+        raise ValueError("Constraint floors add up to more than the whole budget.")
+    return constraints
+
+
+def constrained_select_arrays(costs: np.ndarray, members: np.ndarray, floors: np.ndarray,
+                              ceilings: np.ndarray, budget: float):
+    """
+    Greedy over costs already in efficiency order, subject to per-group
+    floors and ceilings (rupee amounts; members[i, k] says item i counts
+    towards group k).
+
+    Pass 1 reserves each floor: items of a floored group are taken while
+    they fit that group's unfilled floor. Pass 2 fills: any item is taken
+    while it fits the remaining budget. Both passes respect every ceiling.
+    Whatever a floor could not use is simply left in the pool for pass 2,
+    so no budget is stranded. Returns (positions, pass per position: 1 or 2,
+    spend per group).
+
+    Without binding ceilings and with non-overlapping floors (the usual
+    per-category case) both passes reduce to greedy_select_arrays walks;
+    otherwise items are walked one by one.
+    """
+    n, k = members.shape
+    floored = members[:, floors > 0]
+    if np.all(ceilings >= budget) and not (floored.sum(axis=1) > 1).any():
+        taken = np.zeros(n, dtype=bool)
+        for g in np.flatnonzero(floors > 0):
+            idx = np.flatnonzero(members[:, g])
+            taken[idx[greedy_select_arrays(costs[idx], floors[g])[0]]] = True
+        passes = np.where(taken, 1, 2).astype(np.int8)
+        rest = np.flatnonzero(~taken)
+        taken[rest[greedy_select_arrays(costs[rest], budget - costs[taken].sum())[0]]] = True
+        positions = np.flatnonzero(taken)
+        return positions, passes[positions], costs[positions] @ members[positions]
+
+    spent = np.zeros(k)
+    room = ceilings.astype(np.float64).copy()
+    taken = np.zeros(n, dtype=bool)
+    passes = np.zeros(n, dtype=np.int8)
+    remaining = float(budget)
+    groups = [np.flatnonzero(row).tolist() for row in members]
+
+    floor_left = floors.astype(np.float64).copy()
+    for i in np.flatnonzero(members[:, floors > 0].any(axis=1)).tolist():
+        cost = costs[i]
+        if cost > remaining:
+            continue
+        mine = groups[i]
+        if any(room[g] < cost for g in mine) or not any(floor_left[g] >= cost for g in mine):
+            continue
+        taken[i], passes[i] = True, 1
+        remaining -= cost
+        for g in mine:
+            spent[g] += cost
+            room[g] -= cost
+            floor_left[g] -= cost
+
+    suffix_min = np.minimum.accumulate(np.where(taken, np.inf, costs)[::-1])[::-1]
+    for i in np.flatnonzero(~taken).tolist():
+        if suffix_min[i] > remaining:
+            break
+        cost = costs[i]
+        if cost > remaining:
+            continue
+        mine = groups[i]
+        if any(room[g] < cost for g in mine):
+            continue
+        taken[i], passes[i] = True, 2
+        remaining -= cost
+        for g in mine:
+            spent[g] += cost
+            room[g] -= cost
+
+    positions = np.flatnonzero(taken)
+    return positions, passes[positions], spent
+
+
+def constrained_select(df: pd.DataFrame, budget: float, constraints: list[dict]):
+    """
+    Budget-wide greedy with floors and ceilings per category, sector or
+    location, from a single ranking of all pairs. Returns (selected frame
+    in efficiency order, per-constraint spend summary).
+    """
+    order = efficiency_order(df["Efficiency"].to_numpy(dtype=np.float64))
+    costs = df["Subsidy_Applied"].to_numpy(dtype=np.float64)[order]
+    members = np.column_stack(
+        [df[c["column"]].to_numpy()[order] == c["value"] for c in constraints]
+    ) if constraints else np.zeros((len(order), 0), dtype=bool)
+    floors = np.array([c["floor"] * budget for c in constraints])
+    ceilings = np.array([c["ceiling"] * budget for c in constraints])
+
+    positions, passes, spent = constrained_select_arrays(costs, members, floors, ceilings, budget)
+    remaining = np.subtract.accumulate(np.concatenate(([float(budget)], costs[positions])))[1:]
+    selected = selection_frame(df, order, costs, positions, remaining, budget)
+    if not selected.empty:
+        selected["Allocation_Pass"] = np.where(passes == 1, "Floor", "Fill")
+
+    summary = [
+        {**c, "floor_amount": float(f), "ceiling_amount": float(u), "spent": float(x)}
+        for c, f, u, x in zip(constraints, floors, ceilings, spent)
+    ]
+    return selected, summary
+
+
+def _lp_bound(values: np.ndarray, costs: np.ndarray, budget: float) -> tuple[float, int]:
+    """
+    Dantzig bound of the LP relaxation over items in efficiency order.
+    Returns (bound, break index); the break index is len(costs) if all fit.
+    """
+    cum = np.cumsum(costs)
+    b = int(np.searchsorted(cum, budget, side="right"))
+    if b == len(costs):
+        return float(values.sum()), b
+    taken = float(cum[b - 1]) if b else 0.0
+    return float(values[:b].sum()) + (budget - taken) * values[b] / costs[b], b
+
+
+def _knapsack_dp(values: np.ndarray, weights: np.ndarray, cells: int, deadline: float,
+                 keep: bool = True):
+    """
+    0/1 knapsack over integer weights and capacity `cells`, one vectorized
+    pass per item. Returns (best value, chosen item indices or None), or
+    None when the deadline passes first.
+    """
+    dp = np.zeros(cells + 1)
+    taken = [] if keep else None
+    for i, (v, w) in enumerate(zip(values, weights)):
+        if i % 64 == 0 and time.perf_counter() > deadline:
+            return None
+        if w > cells:
+            if keep:
+                taken.append(None)
+            continue
+        if w == 0:
+            dp += v
+            if keep:
+                taken.append(np.ones(1, dtype=np.uint8))
+            continue
+        cand = dp[:cells + 1 - w] + v
+        better = cand > dp[w:]
+        dp[w:] = np.where(better, cand, dp[w:])
+        if keep:
+            taken.append(np.packbits(np.concatenate((np.zeros(w, dtype=bool), better))))
+
+    if not keep:
+        return float(dp[cells]), None
+
+    chosen, cap = [], cells
+    for i in range(len(values) - 1, -1, -1):
+        bits = taken[i]
+        if bits is None:
+            continue
+        if weights[i] == 0 or (bits[cap >> 3] >> (7 - (cap & 7))) & 1:
+            chosen.append(i)
+            cap -= int(weights[i])
+    return float(dp[cells]), np.array(chosen[::-1], dtype=np.int64)
+
+
+def _common_unit(costs: np.ndarray) -> float | None:
+    """Largest unit every cost is a whole multiple of, if costs are whole paise."""
+    paise = np.round(costs * 100)
+    if len(costs) == 0 or np.any(np.abs(paise - costs * 100) > 1e-6):
+        return None
+    unit = int(np.gcd.reduce(paise.astype(np.int64))) / 100
+    return unit if unit > 0 else None
+
+
+def exact_select_arrays(values: np.ndarray, costs: np.ndarray, budget: float,
+                        time_limit: float = EXACT_TIME_LIMIT,
+                        gap_limit: float = EXACT_GAP_LIMIT,
+                        max_cells: int = EXACT_MAX_CELLS) -> tuple[np.ndarray, dict]:
+    """
+    Maximize total value subject to total cost <= budget over items already
+    in efficiency order. Returns (selected positions ascending, solver info).
+
+    1. The greedy walk gives the incumbent; the LP (Dantzig) bound with the
+       break item's ratio r gives an upper bound U.
+    2. Reduction: item j's reduced value v_j - r*c_j bounds what forcing it
+       out (if it is in the LP solution) or in (if not) can achieve; where
+       that bound falls below the incumbent the item is fixed. On scored
+       pairs this leaves a small core around the break item.
+    3. The core is solved by a dynamic program over a budget grid: costs
+       rounded up give a feasible selection, costs rounded down an upper
+       bound. The grid is refined until the gap to the bound is within
+       gap_limit or time_limit runs out; the best selection found so far
+       (never worse than greedy) is returned either way.
+    """
+    start = time.perf_counter()
+    deadline = start + time_limit
+    values = np.asarray(values, dtype=np.float64)
+    costs = np.asarray(costs, dtype=np.float64)
+
+    greedy_pos, _ = greedy_select_arrays(costs, budget)
+    greedy_value = float(values[greedy_pos].sum())
+    best_pos, best_value = greedy_pos, greedy_value
+
+    # Free items and items that can never fit are settled up front
+    free_cost = costs <= 0
+    usable = ~free_cost & (costs <= budget) & (values > 0)
+    idx = np.flatnonzero(usable)
+    base_value = float(values[free_cost].sum())
+    v, c = values[idx], costs[idx]
+
+    lp_upper, b = _lp_bound(v, c, budget)
+    upper = lp_upper + base_value
+    info = {
+        "solver": "exact", "status": "optimal", "greedy_objective": greedy_value,
+        "core_items": 0, "fixed_items": int(len(idx)), "grid_cells": 0,
+    }
+
+    if b == len(idx):
+        best_pos = np.flatnonzero(free_cost | usable)
+    else:
+        reduced = v - (v[b] / c[b]) * c
+        in_lp = np.arange(len(idx)) < b
+        unit_exact = _common_unit(c)
+        cells = 1024
+        while True:
+            # Re-fix against the current incumbent; a better one shrinks the core
+            incumbent = best_value
+            cut = incumbent - base_value - 1e-9 * max(abs(upper), 1.0)
+            fix_in = in_lp & (lp_upper - reduced < cut)
+            core = np.flatnonzero(~fix_in & ~(~in_lp & (lp_upper + reduced < cut)))
+            fixed_value = base_value + float(v[fix_in].sum())
+            capacity = budget - float(c[fix_in].sum())
+            info.update(core_items=int(len(core)), fixed_items=int(len(idx) - len(core)))
+
+            exact_grid = unit_exact is not None and capacity / unit_exact <= max_cells
+            unit = unit_exact if exact_grid else capacity / cells
+            grid = int(capacity // unit) if exact_grid else cells
+
+            solved = _knapsack_dp(v[core], np.ceil(c[core] / unit - 1e-9).astype(np.int64), grid, deadline)
+            if solved is None:
+                info["status"] = "time_limit"
+                break
+            core_value, chosen = solved
+            info["grid_cells"] = grid
+            if fixed_value + core_value > best_value and c[core[chosen]].sum() <= capacity:
+                best_value = fixed_value + core_value
+                best_pos = np.concatenate((np.flatnonzero(free_cost), idx[fix_in], idx[core[chosen]]))
+
+            if exact_grid:
+                upper = min(upper, max(incumbent, fixed_value + core_value))
+            else:
+                # Rounding costs down relaxes the problem: an upper bound
+                relaxed = _knapsack_dp(v[core], np.floor(c[core] / unit).astype(np.int64), grid,
+                                       deadline, keep=False)
+                if relaxed is None:
+                    info["status"] = "time_limit"
+                    break
+                upper = min(upper, max(incumbent, fixed_value + relaxed[0]))
+
+            if exact_grid or upper - best_value <= gap_limit * upper:
+                break
+            if cells >= max_cells:
+                info["status"] = "grid_limit"
+                break
+            cells *= 2
+
+    best_pos = np.sort(best_pos)
+    best_value = float(values[best_pos].sum())
+    upper = float(max(upper, best_value))
+    if info["status"] == "optimal" and upper - best_value > 1e-9 * max(upper, 1.0):
+        info["status"] = "within_gap"
+    info.update(
+        objective=best_value,
+        upper_bound=upper,
+        gap_pct=(upper - best_value) / upper * 100 if upper > 0 else 0.0,
+        gain_vs_greedy_pct=(best_value - greedy_value) / greedy_value * 100 if greedy_value > 0 else 0.0,
+        seconds=time.perf_counter() - start,
+    )
+    return best_pos, info
+
+
+def exact_select(df: pd.DataFrame, budget: float, order: np.ndarray | None = None,
+                 time_limit: float = EXACT_TIME_LIMIT, gap_limit: float = EXACT_GAP_LIMIT):
+    """
+    Exact counterpart of greedy_select maximizing total Composite_Score.
+    Returns (selected frame in efficiency order, solver info dict).
+    """
+    if order is None:
+        order = efficiency_order(df["Efficiency"].to_numpy(dtype=np.float64))
+    costs = df["Subsidy_Applied"].to_numpy(dtype=np.float64)[order]
+    values = df["Composite_Score"].to_numpy(dtype=np.float64)[order]
+    positions, info = exact_select_arrays(values, costs, budget, time_limit, gap_limit)
+    remaining = np.subtract.accumulate(np.concatenate(([float(budget)], costs[positions])))[1:]
+    return selection_frame(df, order, costs, positions, remaining, budget), info
+
+
+def merge_solver_info(infos: list[dict]) -> dict:
+    """Combine per-category solver reports (equal-distribution mode)."""
+    statuses = [i["status"] for i in infos]
+    merged = {
+        "solver": "exact",
+        "status": next((s for s in statuses if s != "optimal"), "optimal"),
+        **{k: sum(i[k] for i in infos) for k in
+           ("greedy_objective", "objective", "upper_bound", "core_items", "fixed_items", "seconds")},
+        "grid_cells": max(i["grid_cells"] for i in infos),
+    }
+    upper, value, greedy = merged["upper_bound"], merged["objective"], merged["greedy_objective"]
+    merged["gap_pct"] = (upper - value) / upper * 100 if upper > 0 else 0.0
+    merged["gain_vs_greedy_pct"] = (value - greedy) / greedy * 100 if greedy > 0 else 0.0
+    return merged
+
+
+def _msme_hull(groups: np.ndarray, values: np.ndarray, costs: np.ndarray):
+    """
+    Per-MSME upgrade path for the multiple-choice knapsack.
+
+    Options of each MSME are sorted by cost; options that cost more without
+    scoring more, or that lie below the line between their neighbours (LP
+    dominated), are dropped. What remains is a concave path whose steps
+    (option k replaces option k-1) have decreasing score-per-rupee.
+    Returns (option positions along the paths, step within the path).
+    """
+    opts = np.lexsort((-values, costs, groups))
+    g, v, c = groups[opts], values[opts], costs[opts]
+
+    # Dominated: no more score than a cheaper (or equal-cost) option of the same MSME
+    start = np.r_[True, g[1:] != g[:-1]]
+    seg = np.cumsum(start) - 1
+    best_before = np.full(len(v), -np.inf)
+    run_max = pd.Series(v).groupby(seg).cummax().to_numpy()
+    best_before[~start] = run_max[:-1][~start[1:]]
+    keep = v > np.maximum(best_before, 0.0)
+    opts, g, v, c = opts[keep], g[keep], v[keep], c[keep]
+
+    # LP dominance: repeatedly drop options where the next step is steeper
+    while True:
+        first = np.r_[True, g[1:] != g[:-1]]
+        dv = np.where(first, v, v - np.r_[0.0, v[:-1]])
+        dc = np.where(first, c, c - np.r_[0.0, c[:-1]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(dc > 0, dv / dc, np.inf)
+        has_next = np.r_[~first[1:], False]
+        next_slope = np.r_[slope[1:], -np.inf]
+        drop = has_next & (next_slope > slope)
+        if not drop.any():
+            break
+        # Drop one option per run of violations so neighbours are re-checked
+        drop &= ~np.r_[False, drop[:-1]]
+        opts, g, v, c = opts[~drop], g[~drop], v[~drop], c[~drop]
+
+    first = np.r_[True, g[1:] != g[:-1]]
+    step = np.arange(len(g)) - np.maximum.accumulate(np.where(first, np.arange(len(g)), 0))
+    return opts, step
+
+
+def mckp_select_arrays(groups: np.ndarray, values: np.ndarray, costs: np.ndarray,
+                       budget: float) -> np.ndarray:
+    """
+    Greedy for the multiple-choice knapsack: at most one option per group.
+
+    Walks every MSME's upgrade steps (see _msme_hull) in one global order of
+    decreasing step efficiency. A step is taken if it fits the remaining
+    budget and the MSME is still on that step of its path; an MSME whose
+    next step does not fit keeps its current option. Returns the positions
+    of the chosen options.
+    """
+    groups = np.asarray(groups)
+    values = np.asarray(values, dtype=np.float64)
+    costs = np.asarray(costs, dtype=np.float64)
+
+    opts, step = _msme_hull(groups, values, costs)
+    prev = np.r_[-1, opts[:-1]]
+    dv = values[opts] - np.where(step > 0, values[prev], 0.0)
+    dc = costs[opts] - np.where(step > 0, costs[prev], 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eff = np.where(dc > 0, dv / dc, np.inf)
+    walk = np.lexsort((step, -eff))
+    dc_walk = dc[walk]
+    suffix_min = np.minimum.accumulate(dc_walk[::-1])[::-1]
+
+    _, group_id = np.unique(groups[opts], return_inverse=True)
+    level = np.zeros(group_id.max() + 1 if len(group_id) else 0, dtype=np.int64)
+    chosen = np.full(len(level), -1, dtype=np.int64)
+    remaining = float(budget)
+    for i, w in enumerate(walk.tolist()):
+        if suffix_min[i] > remaining:
+            break
+        gid = group_id[w]
+        if level[gid] != step[w]:
+            continue          # an earlier step of this MSME was not funded
+        if dc_walk[i] <= remaining:
+            remaining -= dc_walk[i]
+            level[gid] += 1
+            chosen[gid] = opts[w]
+        else:
+            level[gid] = -1   # freeze at the current option
+    return np.sort(chosen[chosen >= 0])
+
+
+def one_per_msme_select(df: pd.DataFrame, budget: float) -> pd.DataFrame:
+    """
+    Fund at most one option per MSME: one single scheme or the stacked
+    Combined_Multi_Scheme row. Selected rows are listed in efficiency order
+    and indexed by their position in it, like greedy_select.
+    """
+    order = efficiency_order(df["Efficiency"].to_numpy(dtype=np.float64))
+    costs = df["Subsidy_Applied"].to_numpy(dtype=np.float64)[order]
+    values = df["Composite_Score"].to_numpy(dtype=np.float64)[order]
+    groups = pd.factorize(df["MSME_ID"].to_numpy()[order])[0]
+
+    positions = mckp_select_arrays(groups, values, costs, budget)
+    remaining = np.subtract.accumulate(np.concatenate(([float(budget)], costs[positions])))[1:]
+    return selection_frame(df, order, costs, positions, remaining, budget)
+
+
 # ---------------------------------------------------------------------------
 # 4. DECISION JUSTIFICATION
 # ---------------------------------------------------------------------------
@@ -158,11 +763,74 @@ def build_justification(row: pd.Series, total_rows: int, budget: float) -> str:
     )
 
 
-def add_justifications(selected: pd.DataFrame, total_rows: int, budget: float) -> pd.DataFrame:
+def _formatted(values: pd.Series, spec: str) -> np.ndarray:
+    """One column formatted with a format spec, as an object array of str."""
+    return np.array([format(v, spec) for v in values.tolist()], dtype=object)
+
+
+def justification_texts(selected: pd.DataFrame, total_rows: int) -> np.ndarray:
+    """
+    build_justification() for every row at once: each field is formatted
+    column by column, then each row's pieces are joined, so there is no
+    per-row Series lookup or f-string.
+    """
+    if selected.empty:
+        return np.array([], dtype=object)
+    subsidy = selected["Subsidy_Applied"]
+    pieces = [
+        "Selected (Efficiency Rank #", _formatted(selected["Efficiency_Rank"].astype(np.int64), "d"),
+        f" of {total_rows}). Revenue impact: ", _formatted(selected["Revenue_Increase_Pct"], ".2f"),
+        "% (weight=", _formatted(selected["Policy_Alpha"], ".1f"),
+        "), Employment impact: ", _formatted(selected["Employment_Increase_Pct"], ".2f"),
+        "% (weight=", _formatted(selected["Policy_Beta"], ".1f"),
+        "). Composite score: ", _formatted(selected["Composite_Score"], ".4f"),
+        ". Subsidy ₹", _formatted(subsidy, ",.0f"),
+        " fit within remaining budget ₹", _formatted(selected["Remaining_Budget"] + subsidy, ",.0f"),
+        ".",
+    ]
+    columns = [repeat(piece) if isinstance(piece, str) else piece for piece in pieces]
+    return np.array(["".join(parts) for parts in zip(*columns)], dtype=object)
+
+
+JUSTIFICATION_MODES = ["full", "lazy"]
+
+
+class LazyJustifications:
+    """
+    Decision_Justification text rendered only for the rows actually viewed,
+    keyed by Selection_Rank (1-based position in `selected`), and cached.
+    """
+
+    def __init__(self, selected: pd.DataFrame, total_rows: int):
+        self.selected = selected
+        self.total_rows = total_rows
+        self._texts = {}
+
+    def __getitem__(self, rank: int) -> str:
+        return self.render([rank])[rank]
+
+    def render(self, ranks) -> dict:
+        """{rank: text} for the requested ranks (out-of-range ranks are skipped)."""
+        ranks = [int(r) for r in ranks]
+        missing = sorted({r for r in ranks if r not in self._texts and 1 <= r <= len(self.selected)})
+        if missing:
+            texts = justification_texts(self.selected.iloc[[r - 1 for r in missing]], self.total_rows)
+            self._texts.update(zip(missing, texts.tolist()))
+        return {r: self._texts[r] for r in ranks if r in self._texts}
+
+
+def add_justifications(selected: pd.DataFrame, total_rows: int, budget: float,
+                       mode: str = "full") -> pd.DataFrame:
+    """
+    Add Selection_Rank and, in "full" mode, the Decision_Justification
+    text. In "lazy" mode the text is left out of the frame (and so of the
+    CSV/JSON outputs); LazyJustifications renders it per rank on demand.
+    """
+    if mode not in JUSTIFICATION_MODES:
+        raise ValueError(f"Unknown justification mode '{mode}'. Choose from: {', '.join(JUSTIFICATION_MODES)}.")
     selected = selected.copy()
-    selected["Decision_Justification"] = selected.apply(
-        lambda r: build_justification(r, total_rows, budget), axis=1
-    )
+    if mode == "full":
+        selected["Decision_Justification"] = justification_texts(selected, total_rows)
     selected.insert(0, "Selection_Rank", range(1, len(selected) + 1))
     return selected
 
@@ -171,7 +839,233 @@ def add_justifications(selected: pd.DataFrame, total_rows: int, budget: float) -
 # 5. SENSITIVITY ANALYSIS
 # ---------------------------------------------------------------------------
 
-def sensitivity_analysis(df: pd.DataFrame, budget: float) -> str:
+SENSITIVITY_ALPHAS = [0.1, 0.3, 0.5, 0.7, 0.9]
+
+
+class AlphaSweepIndex:
+    """
+    Ranking index over the Phase 3 pairs for fast re-optimization at any alpha.
+
+    Normalization does not depend on alpha, so every pair's efficiency is a
+    line in alpha:  eff(alpha) = a + alpha * b  with
+        a = Norm_Emp / Subsidy,  b = (Norm_Rev - Norm_Emp) / Subsidy.
+    Two adjacent pairs in a ranking only swap where their lines cross, so a
+    ranking stays valid over the alpha interval bounded by the nearest
+    crossing (breakpoint) of any adjacent pair on either side.
+
+    Each ranking computed is cached with that validity interval. A query
+    inside a cached interval returns that ranking as is, once a linear
+    check confirms it is sorted at the query's efficiencies (the interval
+    comes from the line form, which rounds differently). Otherwise it starts
+    from the nearest cached ranking and repairs it with an adaptive stable
+    sort, whose cost grows with the number of crossings between the two
+    alphas rather than with a full n log n re-sort. Rankings are always
+    identical to efficiency_order() on compute_scores() output. At most
+    max_cached rankings are kept, evicting the least recently used.
+    """
+
+    def __init__(self, df: pd.DataFrame, max_cached: int = 32):
+        self.df = df
+        rev = df["Revenue_Increase_Pct"].to_numpy(dtype=np.float64)
+        emp = df["Employment_Increase_Pct"].to_numpy(dtype=np.float64)
+        max_rev, max_emp = rev.max(), emp.max()
+
+        # Same arithmetic as compute_scores() so efficiencies match bit for bit
+        self.norm_rev = rev / max_rev if max_rev > 0 else np.zeros_like(rev)
+        self.norm_emp = emp / max_emp if max_emp > 0 else np.zeros_like(emp)
+        self.cost = df["Subsidy_Applied"].to_numpy(dtype=np.float64)
+        self._cost_nan = np.where(self.cost == 0, np.nan, self.cost)
+
+        with np.errstate(invalid="ignore"):
+            self.intercept = self.norm_emp / self._cost_nan
+            self.slope = (self.norm_rev - self.norm_emp) / self._cost_nan
+
+        self.max_cached = max_cached
+        self._rankings = OrderedDict()   # alpha -> (order, valid_lo, valid_hi), least recently used first
+
+    def efficiency(self, alpha: float) -> np.ndarray:
+        beta = 1.0 - alpha
+        return ((alpha * self.norm_rev) + (beta * self.norm_emp)) / self._cost_nan
+
+    def breakpoints(self, order: np.ndarray, alpha: float) -> tuple[float, float]:
+        """Alpha interval around `alpha` in which no adjacent pair of `order` swaps."""
+        a, b = self.intercept[order], self.slope[order]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cross = (a[1:] - a[:-1]) / (b[:-1] - b[1:])
+        cross = cross[np.isfinite(cross)]
+        below, above = cross[cross < alpha], cross[cross > alpha]
+        return (below.max() if len(below) else -np.inf,
+                above.min() if len(above) else np.inf)
+
+    def order(self, alpha: float) -> np.ndarray:
+        """Positions in descending efficiency at `alpha` (stable; NaN last)."""
+        if alpha in self._rankings:
+            self._rankings.move_to_end(alpha)
+            return self._rankings[alpha][0]
+
+        eff = self.efficiency(alpha)
+        if not self._rankings:
+            order = efficiency_order(eff)
+        else:
+            valid = [a for a, (_, lo, hi) in self._rankings.items() if lo < alpha < hi]
+            # Breakpoints come from the line form; confirm against the
+            # efficiencies themselves (O(n), no sort) before reusing as is
+            if valid and self._is_ranking(self._rankings[valid[0]][0], eff):
+                self._rankings.move_to_end(valid[0])
+                return self._rankings[valid[0]][0]
+            start = valid[0] if valid else min(self._rankings, key=lambda a: abs(a - alpha))
+            order = self._repair(self._rankings[start][0], eff)
+
+        if len(self._rankings) >= self.max_cached:
+            self._rankings.popitem(last=False)
+        self._rankings[alpha] = (order, *self.breakpoints(order, alpha))
+        return order
+
+    @staticmethod
+    def _is_ranking(order: np.ndarray, eff: np.ndarray) -> bool:
+        """Whether order is exactly efficiency_order(eff): descending, ties and NaN (last) by position."""
+        key = eff[order]
+        nan = np.isnan(key)
+        n_valid = len(key) - int(nan.sum())
+        if nan[:n_valid].any():
+            return False
+        later = order[1:] > order[:-1]
+        m = max(n_valid - 1, 0)
+        desc = key[1:m + 1] < key[:m]
+        tie = key[1:m + 1] == key[:m]
+        return bool((desc | (tie & later[:m])).all() and later[n_valid:].all())
+
+    @staticmethod
+    def _repair(order: np.ndarray, eff: np.ndarray) -> np.ndarray:
+        # Timsort is adaptive: a nearly sorted input costs ~O(n + swaps)
+        order = order[np.argsort(-eff[order], kind="stable")]
+
+        # Ties must be broken by input position, as a fresh stable sort would
+        key = eff[order]
+        tied = (key[1:] == key[:-1]) | (np.isnan(key[1:]) & np.isnan(key[:-1]))
+        if (tied & (order[1:] < order[:-1])).any():
+            group = np.concatenate(([0], np.cumsum(~tied)))
+            order = order[np.lexsort((order, group))]
+        return order
+
+    def select(self, alpha: float, budget: float) -> pd.DataFrame:
+        """Same result as greedy_select(compute_scores(df, alpha), budget)."""
+        return greedy_select(compute_scores(self.df, alpha), budget, order=self.order(alpha))
+
+    def summarize(self, alpha: float, budget: float) -> dict:
+        """Headline greedy outcome at `alpha` without materializing a frame."""
+        order = self.order(alpha)
+        positions, _ = greedy_select_arrays(self.cost[order], budget)
+        row = {"Alpha": alpha, "Beta": 1 - alpha, "Selected": len(positions)}
+        if len(positions) == 0:
+            return row
+
+        # Sums run in selection order, exactly as over greedy_select() output
+        picked = order[positions]
+        composite = (alpha * self.norm_rev[picked]) + ((1.0 - alpha) * self.norm_emp[picked])
+        df = self.df
+        row.update({
+            "Budget_Used": self.cost[picked].sum(),
+            "Top_Scheme": df["Scheme_Name"].iloc[picked].value_counts().idxmax(),
+            "Avg_Score": composite.sum() / len(picked),
+            "New_Jobs": int(df["New_Jobs_Added"].to_numpy()[picked].sum()),
+            "Revenue_Gain": (df["Projected_Revenue"].to_numpy()[picked]
+                             - df["Before_Annual_Revenue"].to_numpy()[picked]).sum(),
+        })
+        return row
+
+
+def alpha_sweep(df: pd.DataFrame, budget: float, alphas, index: AlphaSweepIndex | None = None,
+                one_per_msme: bool = False) -> pd.DataFrame:
+    """Greedy outcome at each alpha, re-ranking incrementally through an AlphaSweepIndex."""
+    if one_per_msme:
+        return pd.DataFrame([_sweep_row(float(alpha), one_per_msme_select(compute_scores(df, alpha), budget))
+                             for alpha in alphas])
+    index = index or AlphaSweepIndex(df)
+    return pd.DataFrame([index.summarize(float(alpha), budget) for alpha in alphas])
+
+
+def _sweep_row(alpha: float, sel: pd.DataFrame) -> dict:
+    row = {"Alpha": alpha, "Beta": 1 - alpha, "Selected": len(sel)}
+    if not sel.empty:
+        row.update({
+            "Budget_Used": sel["Subsidy_Applied"].sum(),
+            "Top_Scheme": sel["Scheme_Name"].value_counts().idxmax(),
+            "Avg_Score": sel["Composite_Score"].mean(),
+            "New_Jobs": int(sel["New_Jobs_Added"].sum()),
+            "Revenue_Gain": (sel["Projected_Revenue"] - sel["Before_Annual_Revenue"]).sum(),
+        })
+    return row
+
+
+# Budget levels of the dashboard slider: MIN:MAX:STEP in rupees
+FRONTIER_RANGE = "10000000:500000000:5000000"
+
+
+def parse_budget_range(spec: str) -> np.ndarray:
+    """'MIN:MAX:STEP' -> budgets MIN, MIN+STEP, ..., up to and including MAX."""
+    try:
+        low, high, step = (float(part) for part in spec.split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid budget range '{spec}'. Expected MIN:MAX:STEP.") from None
+    if not (0 < low <= high and step > 0):
+        raise ValueError(f"Invalid budget range '{spec}': need 0 < MIN <= MAX and STEP > 0.")
+    return low + step * np.arange(int(np.floor((high - low) / step + 1e-9)) + 1)
+
+
+def budget_frontier(df_scored: pd.DataFrame, budgets, order: np.ndarray | None = None) -> pd.DataFrame:
+    """
+    Greedy outcome at every budget from one efficiency ranking, without a
+    separate run per budget.
+
+    The ranking does not depend on the budget, so each budget funds the
+    leading run of the ranking that fits (located with the prefix sums and
+    confirmed with the same left-to-right subtraction greedy_select_arrays
+    uses), then skip-and-continues from the first pair that did not fit
+    with what is left. That leftover is smaller than the pair that missed,
+    so the tail walk only funds cheaper pairs further down. Pair counts
+    match greedy_select at each budget; sums match to float rounding.
+    """
+    if order is None:
+        order = efficiency_order(df_scored["Efficiency"].to_numpy(dtype=np.float64))
+    alpha = float(df_scored["Policy_Alpha"].iloc[0]) if len(df_scored) else np.nan
+    costs = df_scored["Subsidy_Applied"].to_numpy(dtype=np.float64)[order]
+    jobs = df_scored["New_Jobs_Added"].to_numpy(dtype=np.float64)[order]
+    gain = (df_scored["Projected_Revenue"].to_numpy(dtype=np.float64)
+            - df_scored["Before_Annual_Revenue"].to_numpy(dtype=np.float64))[order]
+    cum_cost, cum_jobs, cum_gain = (np.concatenate(([0.0], np.cumsum(v))) for v in (costs, jobs, gain))
+
+    rows = []
+    for budget in np.asarray(budgets, dtype=np.float64):
+        k = int(np.searchsorted(cum_cost, budget, side="right"))
+        run = np.subtract.accumulate(np.concatenate(([budget], costs[:k])))[1:]
+        prefix = int(np.argmax(run < 0)) if (run < 0).any() else len(run)
+        remaining = float(run[prefix - 1]) if prefix else float(budget)
+        start = prefix + 1 if prefix < len(run) else prefix
+        tail = greedy_select_arrays(costs[start:], remaining)[0] + start
+
+        used = cum_cost[prefix] + costs[tail].sum()
+        rows.append({
+            "Alpha": alpha,
+            "Budget": budget,
+            "Pairs_Funded": prefix + len(tail),
+            "Skipped_Then_Funded": len(tail),
+            "Budget_Used": used,
+            "Utilization_Pct": used / budget * 100,
+            "New_Jobs": int(round(cum_jobs[prefix] + jobs[tail].sum())),
+            "Revenue_Gain": cum_gain[prefix] + gain[tail].sum(),
+        })
+    return pd.DataFrame(rows)
+
+
+def frontier_at(curve: pd.DataFrame, budget: float) -> dict | None:
+    """Frontier row for the largest budget level <= budget (None below the first level)."""
+    i = int(np.searchsorted(curve["Budget"].to_numpy(), budget, side="right")) - 1
+    return None if i < 0 else curve.iloc[i].to_dict()
+
+
+def sensitivity_analysis(df: pd.DataFrame, budget: float, index: AlphaSweepIndex | None = None,
+                         one_per_msme: bool = False) -> str:
     """
     Run optimization at alpha = 0.1, 0.3, 0.5, 0.7, 0.9 and report
     how the number of selected pairs and dominant schemes shift.
@@ -180,18 +1074,14 @@ def sensitivity_analysis(df: pd.DataFrame, budget: float) -> str:
     lines.append(f"{'Alpha':>6} {'Beta':>5} {'Selected':>9} {'Budget Used':>14} {'Top Scheme':>30} {'Avg Score':>10}")
     lines.append("-" * 80)
 
-    for alpha in [0.1, 0.3, 0.5, 0.7, 0.9]:
-        scored  = compute_scores(df.copy(), alpha)
-        sel     = greedy_select(scored, budget)
-        if sel.empty:
+    for _, r in alpha_sweep(df, budget, SENSITIVITY_ALPHAS, index, one_per_msme).iterrows():
+        alpha = r["Alpha"]
+        if r["Selected"] == 0:
             lines.append(f"{alpha:>6.1f} {1-alpha:>5.1f}  {'—':>9}  {'—':>14}  {'—':>30}  {'—':>10}")
             continue
-        top_scheme  = sel["Scheme_Name"].value_counts().idxmax()
-        budget_used = sel["Subsidy_Applied"].sum()
-        avg_score   = sel["Composite_Score"].mean()
         lines.append(
-            f"{alpha:>6.1f} {1-alpha:>5.1f} {len(sel):>9,} "
-            f"₹{budget_used:>12,.0f}  {top_scheme:>30}  {avg_score:>10.4f}"
+            f"{alpha:>6.1f} {1-alpha:>5.1f} {int(r['Selected']):>9,} "
+            f"₹{r['Budget_Used']:>12,.0f}  {r['Top_Scheme']:>30}  {r['Avg_Score']:>10.4f}"
         )
 
     return "\n".join(lines)
@@ -202,7 +1092,8 @@ def sensitivity_analysis(df: pd.DataFrame, budget: float) -> str:
 # ---------------------------------------------------------------------------
 
 def build_report(selected: pd.DataFrame, df_all: pd.DataFrame,
-                 alpha: float, budget: float, equal_dist: bool) -> str:
+                 alpha: float, budget: float, equal_dist: bool, run_info: dict | None = None,
+                 one_per_msme: bool = False) -> str:
     beta = 1 - alpha
     lines = []
     add  = lines.append
@@ -218,8 +1109,15 @@ def build_report(selected: pd.DataFrame, df_all: pd.DataFrame,
     add(f"  Total Budget               : ₹{budget:,.0f}")
     add(f"  Revenue Weight (alpha)     : {alpha:.2f}")
     add(f"  Employment Weight (beta)   : {beta:.2f}")
-    add(f"  Distribution Mode          : {'Category Sub-budgets' if equal_dist else 'Global Greedy'}")
+    constraints = (run_info or {}).get("constraints")
+    if constraints is not None:
+        mode = "Floors/Ceilings with Spillover"
+    else:
+        mode = "Category Sub-budgets" if equal_dist else "Global Greedy"
+    add(f"  Distribution Mode          : {mode}")
     add(f"  Input MSME-Scheme Pairs    : {len(df_all)}")
+    if one_per_msme:
+        add("  Funding Rule               : One option per MSME (single scheme or stacked)")
     add("")
 
     # --- 2. Optimization Summary ---
@@ -235,9 +1133,28 @@ def build_report(selected: pd.DataFrame, df_all: pd.DataFrame,
     add("-" * 40)
     add(f"  Pairs Selected             : {len(selected)}")
     add(f"  Unique MSMEs Funded        : {selected['MSME_ID'].nunique()}")
+    if one_per_msme:
+        stacked = int((selected["Simulation_Type"] != "Single_Scheme").sum())
+        add(f"  Funded via Stacked Schemes : {stacked}")
     add(f"  Budget Used                : ₹{budget_used:,.2f}")
     add(f"  Budget Unused              : ₹{budget_unused:,.2f}")
     add(f"  Budget Utilization         : {utilization:.2f}%")
+    solver_info = (run_info or {}).get("solver")
+    if solver_info is not None:
+        add(f"  Solver                     : exact ({solver_info['status']}, "
+            f"{solver_info['seconds']:.2f}s, {solver_info['core_items']:,} core pairs)")
+        add(f"  Total Composite Score      : {solver_info['objective']:.4f} "
+            f"(greedy {solver_info['greedy_objective']:.4f}, {solver_info['gain_vs_greedy_pct']:+.3f}%)")
+        add(f"  Upper Bound / Gap          : {solver_info['upper_bound']:.4f} / {solver_info['gap_pct']:.4f}%")
+    if constraints:
+        add("")
+        add(f"  {'Constraint':<30} {'Floor':>14} {'Ceiling':>14} {'Spent':>14}")
+        add("  " + "-" * 75)
+        for c in constraints:
+            add(f"  {c['column'] + '=' + c['value']:<30} ₹{c['floor_amount']:>12,.0f} "
+                f"₹{c['ceiling_amount']:>12,.0f} ₹{c['spent']:>12,.0f}")
+        filled = int((selected["Allocation_Pass"] == "Fill").sum())
+        add(f"  Pairs funded from spillover: {filled}")
     add("")
 
     # --- 3. Aggregate Before vs After ---
@@ -294,9 +1211,12 @@ def build_report(selected: pd.DataFrame, df_all: pd.DataFrame,
     # --- 6. Decision Justification Sample ---
     add("6. DECISION JUSTIFICATION (Top 3 Selections)")
     add("-" * 70)
-    for _, r in selected.head(3).iterrows():
+    top = selected.head(3)
+    texts = (top["Decision_Justification"] if "Decision_Justification" in top.columns
+             else justification_texts(top, len(df_all)))
+    for (_, r), text in zip(top.iterrows(), texts):
         add(f"  Rank #{int(r['Selection_Rank'])}: {r['MSME_ID']} → {r['Scheme_Name']}")
-        add(f"    {r['Decision_Justification']}")
+        add(f"    {text}")
         add("")
 
     # --- 7. Sensitivity Analysis ---
@@ -304,7 +1224,7 @@ def build_report(selected: pd.DataFrame, df_all: pd.DataFrame,
     add("-" * 70)
     add("  Varying alpha from 0.1 (employment-heavy) to 0.9 (revenue-heavy):")
     add("")
-    add("  " + sensitivity_analysis(df_all, budget).replace("\n", "\n  "))
+    add("  " + sensitivity_analysis(df_all, budget, one_per_msme=one_per_msme).replace("\n", "\n  "))
     add("")
 
     # --- 8. Budget Utilization ---
@@ -325,7 +1245,354 @@ def build_report(selected: pd.DataFrame, df_all: pd.DataFrame,
 
 
 # ---------------------------------------------------------------------------
-# 7. CLI ARGUMENT PARSING
+# 7. OPTIMIZATION RUN & API RESPONSE
+# ---------------------------------------------------------------------------
+
+OUTPUT_COLUMNS = [
+    "Selection_Rank", "MSME_ID", "Sector", "Category", "Location_Type",
+    "Scheme_ID", "Scheme_Name",
+    "Before_Annual_Revenue", "Before_Employees",
+    "Subsidy_Applied", "New_Jobs_Added",
+    "Projected_Revenue", "Projected_Employees",
+    "Revenue_Increase_Pct", "Employment_Increase_Pct",
+    "Norm_Rev_Score", "Norm_Emp_Score",
+    "Composite_Score", "Efficiency",
+    "Policy_Alpha", "Policy_Beta",
+    "Efficiency_Rank", "Cumulative_Budget_Used", "Remaining_Budget",
+    "Decision_Justification",
+]
+
+
+SOLVERS = ["greedy", "exact"]
+
+
+def select_pairs(df_scored: pd.DataFrame, budget: float, equal_dist: bool,
+                 order: np.ndarray | None = None, solver: str = "greedy",
+                 time_limit: float = EXACT_TIME_LIMIT, gap_limit: float = EXACT_GAP_LIMIT,
+                 one_per_msme: bool = False, constraints: list[dict] | None = None,
+                 rebalance: bool = False):
+    """
+    Run the configured selection strategy over already-scored pairs.
+    Returns (selected frame, run info). The info dict carries what the
+    strategy has to report: "solver" for the exact solver, "constraints"
+    for floors/ceilings; it is None for plain greedy.
+    """
+    if constraints or rebalance:
+        if solver != "greedy" or one_per_msme:
+            raise ValueError("Budget constraints are only supported with the greedy solver.")
+        constraints = budget_constraints(constraints, equal_dist, rebalance)
+        selected, summary = constrained_select(df_scored, budget, constraints)
+        return selected, {"constraints": summary}
+    if one_per_msme:
+        if solver != "greedy":
+            raise ValueError("--one-per-msme is only supported with the greedy solver.")
+        if equal_dist:
+            return greedy_select_with_category_budgets(df_scored, budget, select=one_per_msme_select), None
+        return one_per_msme_select(df_scored, budget), None
+    if solver == "greedy":
+        if equal_dist:
+            return greedy_select_with_category_budgets(df_scored, budget), None
+        return greedy_select(df_scored, budget, order=order), None
+    if solver != "exact":
+        raise ValueError(f"Unknown solver '{solver}'. Choose from: {', '.join(SOLVERS)}.")
+
+    if not equal_dist:
+        selected, info = exact_select(df_scored, budget, order, time_limit, gap_limit)
+        return selected, {"solver": info}
+
+    # Each category's sub-budget shares the overall time limit
+    infos = []
+    def select(sub_df, sub_budget):
+        selected, info = exact_select(sub_df, sub_budget, None, time_limit / len(CATEGORY_BUDGET_SHARES), gap_limit)
+        infos.append(info)
+        return selected
+    selected = greedy_select_with_category_budgets(df_scored, budget, select=select)
+    return selected, {"solver": merge_solver_info(infos)}
+
+
+def output_frame(selected: pd.DataFrame, one_per_msme: bool = False) -> pd.DataFrame:
+    # Only include columns that exist (equal-dist mode adds extras)
+    columns = OUTPUT_COLUMNS
+    if one_per_msme:
+        # Say whether each MSME is funded under one scheme or the stacked combination
+        columns = columns[:columns.index("Scheme_Name") + 1] + ["Simulation_Type"] + \
+                  columns[columns.index("Scheme_Name") + 1:]
+    return selected[[c for c in columns if c in selected.columns]]
+
+
+def _run_query(df: pd.DataFrame, alpha: float, budget: float, equal_dist: bool,
+               index: AlphaSweepIndex | None, solver: str, time_limit: float, gap_limit: float,
+               one_per_msme: bool, constraints: list[dict] | None, rebalance: bool,
+               cache: ResultCache | None = None):
+    """Score and select for optimize()/justify(): (alpha, beta, df_scored, selected, run_info)."""
+    alpha = max(0.0, min(1.0, alpha))
+    beta = round(1.0 - alpha, 4)
+
+    if cache is not None and solver == "greedy" and not (equal_dist or one_per_msme or constraints or rebalance):
+        df_scored, selected = _cached_greedy(cache, df, alpha, budget, index)
+        return alpha, beta, df_scored, selected, None
+
+    df_scored = compute_scores(df, alpha)
+    order = index.order(alpha) if index is not None and not one_per_msme else None
+    selected, run_info = select_pairs(df_scored, budget, equal_dist, order, solver, time_limit, gap_limit,
+                                      one_per_msme, constraints, rebalance)
+    return alpha, beta, df_scored, selected, run_info
+
+
+def _cached_greedy(cache: ResultCache, df: pd.DataFrame, alpha: float, budget: float,
+                   index: AlphaSweepIndex | None):
+    """Plain greedy selection, reusing the cached walk at this alpha when it covers `budget`."""
+    key = cache.run_key(alpha)
+    run = cache.runs.get(key)
+    if run is None:
+        df_scored = compute_scores(df, alpha)
+        order = index.order(alpha) if index is not None else \
+            efficiency_order(df_scored["Efficiency"].to_numpy(dtype=np.float64))
+        run = GreedyRun(df_scored, order, budget, *greedy_select_arrays(
+            df_scored["Subsidy_Applied"].to_numpy(dtype=np.float64)[order], budget))
+        cache.runs.put(key, run)
+        positions, remaining = run.positions, run.remaining
+    elif budget <= run.budget:
+        positions, remaining = greedy_prefix_arrays(run.costs, run.positions, run.remaining, budget)
+    else:
+        # Larger than any budget seen at this alpha: walk again and keep the longer walk
+        positions, remaining = greedy_select_arrays(run.costs, budget)
+        run.budget, run.positions, run.remaining = budget, positions, remaining
+    return run.df_scored, selection_frame(run.df_scored, run.order, run.costs, positions, remaining, budget)
+
+
+def _query_params(**params) -> dict:
+    """Query parameters normalized for the result cache key."""
+    params["alpha"] = max(0.0, min(1.0, float(params["alpha"])))
+    params["budget"] = float(params["budget"])
+    return params
+
+
+def optimize(df: pd.DataFrame, alpha: float, budget: float, equal_dist: bool = False,
+             index: AlphaSweepIndex | None = None, solver: str = "greedy",
+             time_limit: float = EXACT_TIME_LIMIT, gap_limit: float = EXACT_GAP_LIMIT,
+             one_per_msme: bool = False, constraints: list[dict] | None = None,
+             rebalance: bool = False, layout: str = "records", unselected_limit: int | None = None,
+             unselected_offset: int = 0, justifications: str = "lazy",
+             cache: ResultCache | None = None) -> dict:
+    """
+    Score, select and justify in one call; returns the --json-out response
+    dict ({} when nothing fits the budget). Used by the persistent
+    optimization server so it answers exactly like the CLI; pass the
+    AlphaSweepIndex built over df to re-rank incrementally across alphas.
+    With one_per_msme, df must include the Combined_Multi_Scheme rows.
+    Decision_Justification text is only included with justifications="full";
+    justify() renders it for the ranks a viewer opens. With a ResultCache
+    (kept current with cache.use()), repeated queries are answered from it.
+    """
+    if cache is not None:
+        key = cache.key("optimize", _query_params(
+            alpha=alpha, budget=budget, equal_dist=equal_dist, solver=solver, time_limit=time_limit,
+            gap_limit=gap_limit, one_per_msme=one_per_msme, constraints=constraints, rebalance=rebalance,
+            layout=layout, unselected_limit=unselected_limit, unselected_offset=unselected_offset,
+            justifications=justifications,
+        ))
+        response = cache.responses.get(key)
+        if response is not None:
+            return response
+
+    alpha, beta, df_scored, selected, run_info = _run_query(
+        df, alpha, budget, equal_dist, index, solver, time_limit, gap_limit, one_per_msme, constraints, rebalance,
+        cache,
+    )
+    if selected.empty:
+        response = {}
+    else:
+        selected = add_justifications(selected, len(df_scored), budget, justifications)
+        response = build_json_response(df_scored, selected, output_frame(selected, one_per_msme),
+                                       budget, alpha, beta, run_info, layout, unselected_limit, unselected_offset)
+        response["justifications"] = justifications
+    if cache is not None:
+        cache.responses.put(key, response)
+    return response
+
+
+def justify(df: pd.DataFrame, ranks, alpha: float, budget: float, equal_dist: bool = False,
+            index: AlphaSweepIndex | None = None, solver: str = "greedy",
+            time_limit: float = EXACT_TIME_LIMIT, gap_limit: float = EXACT_GAP_LIMIT,
+            one_per_msme: bool = False, constraints: list[dict] | None = None,
+            rebalance: bool = False, cache: ResultCache | None = None) -> dict:
+    """
+    {Selection_Rank: Decision_Justification} for the given ranks of the
+    selection optimize() returns for the same query (lazy rendering).
+    """
+    if cache is not None:
+        key = cache.key("justify", _query_params(
+            ranks=[int(r) for r in ranks], alpha=alpha, budget=budget, equal_dist=equal_dist, solver=solver,
+            time_limit=time_limit, gap_limit=gap_limit, one_per_msme=one_per_msme, constraints=constraints,
+            rebalance=rebalance,
+        ))
+        texts = cache.responses.get(key)
+        if texts is not None:
+            return texts
+
+    _, _, df_scored, selected, _ = _run_query(
+        df, alpha, budget, equal_dist, index, solver, time_limit, gap_limit, one_per_msme, constraints, rebalance,
+        cache,
+    )
+    texts = {} if selected.empty else LazyJustifications(
+        add_justifications(selected, len(df_scored), budget, "lazy"), len(df_scored)).render(ranks)
+    if cache is not None:
+        cache.responses.put(key, texts)
+    return texts
+
+
+def frontier(df: pd.DataFrame, alpha: float, budgets: str = FRONTIER_RANGE,
+             index: AlphaSweepIndex | None = None, layout: str = "columns",
+             cache: ResultCache | None = None) -> dict:
+    """
+    Global greedy budget frontier at one alpha over the MIN:MAX:STEP range
+    `budgets`, as {alpha, budgets, frontier}; the budget slider looks its
+    rows up instead of re-optimizing on every move.
+    """
+    alpha = max(0.0, min(1.0, float(alpha)))
+    if cache is not None:
+        key = cache.key("frontier", {"alpha": alpha, "budgets": budgets, "layout": layout})
+        response = cache.responses.get(key)
+        if response is not None:
+            return response
+
+    df_scored = compute_scores(df, alpha)
+    order = index.order(alpha) if index is not None else None
+    table = budget_frontier(df_scored, parse_budget_range(budgets), order)
+    response = {"alpha": alpha, "budgets": budgets, "frontier": json_table(table, layout)}
+    if cache is not None:
+        cache.responses.put(key, response)
+    return response
+
+
+JSON_LAYOUTS = ["records", "columns"]
+
+# Decimal places kept for floats in JSON responses (pandas' to_json default)
+JSON_FLOAT_DECIMALS = 10
+
+
+def _json_column(values: pd.Series) -> list:
+    """One column as plain Python values; NaN becomes null."""
+    array = values.to_numpy()
+    if array.dtype.kind == "f":
+        missing = np.isnan(array)
+        array = np.round(array, JSON_FLOAT_DECIMALS)
+        if missing.any():
+            return [None if m else v for v, m in zip(array.tolist(), missing.tolist())]
+        return array.tolist()
+    if array.dtype.kind == "O":
+        return values.astype(object).where(values.notna(), None).tolist()
+    return array.tolist()
+
+
+def json_table(df: pd.DataFrame, layout: str = "records"):
+    """
+    df as JSON-ready Python values: a list of row dicts ("records") or
+    {"columns": [names], "data": [one list per column]} ("columns"), which
+    names each column once instead of once per row.
+    """
+    data = [_json_column(df[c]) for c in df.columns]
+    if layout == "columns":
+        return {"columns": list(df.columns), "data": data}
+    if layout != "records":
+        raise ValueError(f"Unknown JSON layout '{layout}'. Choose from: {', '.join(JSON_LAYOUTS)}.")
+    names = list(df.columns)
+    return [dict(zip(names, row)) for row in zip(*data)]
+
+
+def build_json_response(df_scored: pd.DataFrame, selected: pd.DataFrame, out_df: pd.DataFrame,
+                        budget: float, alpha: float, beta: float, run_info: dict | None = None,
+                        layout: str = "records", unselected_limit: int | None = None,
+                        unselected_offset: int = 0) -> dict:
+    """
+    The --json-out payload, built from plain Python values so it is
+    serialized exactly once (json.dumps / write_json_response).
+
+    The unselected pairs are listed by descending Efficiency; pass
+    unselected_limit (0 = none) and unselected_offset to return one page
+    of them. "unselected_total" and "unselected_next" (the offset of the
+    next page, or null) describe the paging. The "columns" layout gives
+    the shared not-selected reason once as "unselected_reason" instead of
+    repeating it on every row.
+    """
+    # Selected frames are indexed by rank, not by df_scored row, so match pairs by key
+    key = [c for c in ("MSME_ID", "Scheme_ID") if c in df_scored.columns]
+    is_selected = pd.MultiIndex.from_frame(df_scored[key]).isin(pd.MultiIndex.from_frame(selected[key]))
+    unselected = np.flatnonzero(~is_selected)
+    unselected = unselected[efficiency_order(df_scored["Efficiency"].to_numpy(dtype=np.float64)[unselected])]
+
+    # Only the requested page of rows and columns is ever copied
+    total_unselected = len(unselected)
+    start = max(0, unselected_offset)
+    stop = total_unselected if unselected_limit is None else min(total_unselected, start + max(0, unselected_limit))
+    un_cols = ["MSME_ID", "Scheme_Name", "Subsidy_Applied", "Composite_Score", "Efficiency"]
+    un_df = df_scored.iloc[unselected[start:stop], [df_scored.columns.get_loc(c) for c in un_cols
+                                                    if c in df_scored.columns]]
+
+    # For simplicity, if not selected, they ran out of budget at their rank
+    reason = f"Budget limits exhausted before Rank {len(selected) + 1} could be funded."
+    if layout == "records":
+        un_df = un_df.assign(Reason=reason)
+
+    budget_used = float(selected['Subsidy_Applied'].sum())
+    response = {
+        "budget": budget,
+        "budget_used": budget_used,
+        "utilization_pct": budget_used / budget * 100,
+        "alpha": alpha,
+        "beta": beta,
+        "total_selected": len(selected),
+        "total_jobs_created": float(selected['New_Jobs_Added'].sum()),
+        "total_revenue_gain": float((selected['Projected_Revenue'] - selected['Before_Annual_Revenue']).sum()),
+        "layout": layout,
+        "selected": json_table(out_df, layout),
+        "unselected": json_table(un_df, layout),
+        "unselected_total": total_unselected,
+        "unselected_next": stop if stop < total_unselected else None,
+    }
+    if layout == "columns":
+        response["unselected_reason"] = reason
+    response.update(run_info or {})
+    return response
+
+
+# Rows encoded per json.dumps call when streaming a long list
+JSON_STREAM_BLOCK = 10_000
+
+
+def write_json_response(response, stream) -> None:
+    """
+    Serialize the response once, straight to stream. Long lists are encoded
+    in blocks of JSON_STREAM_BLOCK items by the C encoder, so the output is
+    identical to json.dumps(response) without building it as one string.
+    """
+    if isinstance(response, dict):
+        stream.write("{")
+        for i, (key, value) in enumerate(response.items()):
+            stream.write(f"{', ' if i else ''}{json.dumps(str(key))}: ")
+            write_json_response(value, stream)
+        stream.write("}")
+    elif isinstance(response, list) and len(response) > JSON_STREAM_BLOCK:
+        stream.write("[")
+        for start in range(0, len(response), JSON_STREAM_BLOCK):
+            if start:
+                stream.write(", ")
+            stream.write(json.dumps(response[start:start + JSON_STREAM_BLOCK])[1:-1])
+        stream.write("]")
+    elif isinstance(response, list) and response and isinstance(response[0], list):
+        stream.write("[")
+        for i, value in enumerate(response):
+            if i:
+                stream.write(", ")
+            write_json_response(value, stream)
+        stream.write("]")
+    else:
+        stream.write(json.dumps(response))
+
+
+# ---------------------------------------------------------------------------
+# 8. CLI ARGUMENT PARSING
 # ---------------------------------------------------------------------------
 
 def parse_args():
@@ -352,11 +1619,102 @@ def parse_args():
         "--json-out", action="store_true",
         help="Output results as JSON string to stdout (for API integration)."
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--json-layout", choices=JSON_LAYOUTS, default="records",
+        help="With --json-out: records (one object per row, default) or columns "
+             "(column names once, one array per column; smaller and faster)."
+    )
+    parser.add_argument(
+        "--justifications", choices=JUSTIFICATION_MODES, default=None,
+        help="full: Decision_Justification text on every selected row. lazy: leave it out "
+             "(render per rank with --justify-ranks). Default: full for the CSV, lazy with --json-out."
+    )
+    parser.add_argument(
+        "--justify-ranks", type=str, default=None, metavar="R1,R2,...",
+        help="With --json-out: print only the justification text of these Selection_Ranks."
+    )
+    parser.add_argument(
+        "--unselected-limit", type=int, default=None,
+        help="With --json-out: return at most N unselected pairs, best efficiency first "
+             "(default: all; 0 for none)."
+    )
+    parser.add_argument(
+        "--unselected-offset", type=int, default=0,
+        help="With --json-out: skip this many unselected pairs (page through them with "
+             "the response's unselected_next)."
+    )
+    parser.add_argument(
+        "--storage-format", choices=list(FORMATS), default=None,
+        help="Format of the data/ tables read and written (default: CHAOSZEN_STORAGE_FORMAT or csv)."
+    )
+    parser.add_argument(
+        "--rebalance", action="store_true",
+        help="With --equal-distribution: treat the category shares as floors and let budget a "
+             "category cannot use spill over to the others."
+    )
+    parser.add_argument(
+        "--constraint", action="append", default=[], metavar="DIM=VALUE:FLOOR:CEILING",
+        help="Budget share floor/ceiling for a Category, Sector or Location, e.g. "
+             "Category=Micro:0.3:0.5 or Sector=Retail::0.2. Repeatable."
+    )
+    parser.add_argument(
+        "--one-per-msme", action="store_true",
+        help="Fund at most one option per MSME, choosing between its single schemes and the "
+             "stacked Combined_Multi_Scheme row (multiple-choice knapsack)."
+    )
+    parser.add_argument(
+        "--solver", choices=SOLVERS, default="greedy",
+        help="greedy: efficiency-ratio knapsack (default). exact: reduction + scaled-cost DP, "
+             "reports the optimality gap and the gain over greedy."
+    )
+    parser.add_argument(
+        "--time-limit", type=float, default=EXACT_TIME_LIMIT,
+        help=f"Seconds the exact solver may spend before returning its best selection. Default: {EXACT_TIME_LIMIT:g}"
+    )
+    parser.add_argument(
+        "--gap-limit", type=float, default=EXACT_GAP_LIMIT * 100,
+        help=f"Relative optimality gap (%%) at which the exact solver stops. Default: {EXACT_GAP_LIMIT * 100:g}"
+    )
+    parser.add_argument(
+        "--sweep-steps", type=int, default=0,
+        help="Also evaluate N evenly spaced alphas in [0, 1] and save them as alpha_sweep."
+    )
+    parser.add_argument(
+        "--frontier", nargs="?", const=FRONTIER_RANGE, default=None, metavar="MIN:MAX:STEP",
+        help="Also compute the global greedy outcome at every budget in MIN:MAX:STEP in one pass "
+             f"and save it as budget_frontier (default range: {FRONTIER_RANGE}). "
+             "With --json-out, print only the frontier."
+    )
+    args = parser.parse_args()
+    if args.one_per_msme and args.solver != "greedy":
+        parser.error("--one-per-msme is only supported with --solver greedy")
+    if args.rebalance and not args.equal_distribution:
+        parser.error("--rebalance requires --equal-distribution")
+    if (args.constraint or args.rebalance) and (args.solver != "greedy" or args.one_per_msme):
+        parser.error("--constraint/--rebalance are only supported with the greedy solver")
+    try:
+        args.constraint = [parse_constraint(spec) for spec in args.constraint]
+        budget_constraints(args.constraint, args.equal_distribution, args.rebalance)
+        if args.justify_ranks is not None:
+            args.justify_ranks = [int(r) for r in args.justify_ranks.split(",") if r.strip()]
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.justify_ranks is not None and not args.json_out:
+        parser.error("--justify-ranks requires --json-out")
+    if args.frontier is not None:
+        if args.equal_distribution or args.one_per_msme or args.constraint or args.solver != "greedy":
+            parser.error("--frontier is only supported for global greedy selection")
+        try:
+            parse_budget_range(args.frontier)
+        except ValueError as exc:
+            parser.error(str(exc))
+    if args.justifications is None:
+        args.justifications = "lazy" if args.json_out else "full"
+    return args
 
 
 # ---------------------------------------------------------------------------
-# 8. MAIN
+# 9. MAIN
 # ---------------------------------------------------------------------------
 
 def main():
@@ -379,22 +1737,31 @@ def main():
     log(f"  Budget    : ₹{budget:,.0f}")
     log(f"  Alpha     : {alpha}  (Revenue weight)")
     log(f"  Beta      : {beta}  (Employment weight)")
-    log(f"  Mode      : {'Category Sub-budgets' if equal_dist else 'Global Greedy'}")
+    if args.constraint or args.rebalance:
+        log("  Mode      : Floors/Ceilings with Spillover")
+    else:
+        log(f"  Mode      : {'Category Sub-budgets' if equal_dist else 'Global Greedy'}")
     log()
 
     # 1. Load Phase 3 data
-    df = load_eligibility_data(json_mode=args.json_out)
+    df = load_eligibility_data(json_mode=args.json_out, fmt=args.storage_format,
+                               include_combined=args.one_per_msme)
 
     # 2. Score every pair
     df_scored = compute_scores(df, alpha)
     log(f"Composite scores computed. Avg score: {df_scored['Composite_Score'].mean():.4f}")
     log(f"Score range: {df_scored['Composite_Score'].min():.4f} – {df_scored['Composite_Score'].max():.4f}\n")
 
+    if args.frontier is not None and args.json_out:
+        write_json_response(frontier(df, alpha, args.frontier, layout=args.json_layout), sys.stdout)
+        print()
+        return
+
     # 3. Run optimization
-    if equal_dist:
-        selected = greedy_select_with_category_budgets(df_scored, budget)
-    else:
-        selected = greedy_select(df_scored, budget)
+    selected, run_info = select_pairs(df_scored, budget, equal_dist, solver=args.solver,
+                                      time_limit=args.time_limit, gap_limit=args.gap_limit / 100,
+                                      one_per_msme=args.one_per_msme, constraints=args.constraint,
+                                      rebalance=args.rebalance)
 
     if selected.empty:
         log("WARNING: No pairs could be selected within the given budget.")
@@ -403,69 +1770,38 @@ def main():
         return
 
     log(f"Optimization complete: {len(selected)} pairs selected.")
+    solver_info = (run_info or {}).get("solver")
+    if solver_info is not None:
+        log(f"Exact solver: {solver_info['status']} in {solver_info['seconds']:.2f}s, "
+            f"gap {solver_info['gap_pct']:.4f}%, {solver_info['gain_vs_greedy_pct']:+.3f}% score vs greedy.")
     log(f"Budget used: ₹{selected['Subsidy_Applied'].sum():,.2f} / ₹{budget:,.0f} "
           f"({selected['Subsidy_Applied'].sum()/budget*100:.1f}%)\n")
 
     # 4. Add justifications and selection rank
-    selected = add_justifications(selected, len(df_scored), budget)
+    selected = add_justifications(selected, len(df_scored), budget, args.justifications)
+
+    if args.justify_ranks is not None:
+        print(json.dumps(LazyJustifications(selected, len(df_scored)).render(args.justify_ranks)))
+        return
 
     # 5. Select & reorder output columns
-    output_cols = [
-        "Selection_Rank", "MSME_ID", "Sector", "Category", "Location_Type",
-        "Scheme_ID", "Scheme_Name",
-        "Before_Annual_Revenue", "Before_Employees",
-        "Subsidy_Applied", "New_Jobs_Added",
-        "Projected_Revenue", "Projected_Employees",
-        "Revenue_Increase_Pct", "Employment_Increase_Pct",
-        "Norm_Rev_Score", "Norm_Emp_Score",
-        "Composite_Score", "Efficiency",
-        "Policy_Alpha", "Policy_Beta",
-        "Efficiency_Rank", "Cumulative_Budget_Used", "Remaining_Budget",
-        "Decision_Justification",
-    ]
-    # Only include columns that exist (equal-dist mode adds extras)
-    output_cols = [c for c in output_cols if c in selected.columns]
-    out_df = selected[output_cols]
+    out_df = output_frame(selected, args.one_per_msme)
 
     if args.json_out:
-        import json
-        
-        # Determine unselected pairs correctly
-        unselected = df_scored[~df_scored.index.isin(selected.index)].copy()
-        
-        # Calculate reason for not selecting
-        # For simplicity, if not selected, they ran out of budget at their rank
-        unselected = unselected.sort_values("Efficiency", ascending=False).reset_index(drop=True)
-        unselected["Reason"] = f"Budget limits exhausted before Rank {len(selected) + 1} could be funded."
-        
-        # Select key columns for unselected
-        un_cols = ["MSME_ID", "Scheme_Name", "Subsidy_Applied", "Composite_Score", "Efficiency", "Reason"]
-        un_cols = [c for c in un_cols if c in unselected.columns]
-        un_df = unselected[un_cols]
-
-        response = {
-            "budget": budget,
-            "budget_used": float(selected['Subsidy_Applied'].sum()),
-            "utilization_pct": float(selected['Subsidy_Applied'].sum() / budget * 100),
-            "alpha": alpha,
-            "beta": beta,
-            "total_selected": len(selected),
-            "total_jobs_created": float(selected['New_Jobs_Added'].sum()),
-            "total_revenue_gain": float((selected['Projected_Revenue'] - selected['Before_Annual_Revenue']).sum()),
-            "selected": json.loads(out_df.to_json(orient="records")),
-            "unselected": json.loads(un_df.to_json(orient="records"))
-        }
-        print(json.dumps(response))
+        response = build_json_response(df_scored, selected, out_df, budget, alpha, beta, run_info,
+                                       args.json_layout, args.unselected_limit, args.unselected_offset)
+        response["justifications"] = args.justifications
+        write_json_response(response, sys.stdout)
+        print()
         return
 
-    # 6. Save results CSV
+    # 6. Save results table
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    csv_path = os.path.join(base_dir, "data", f"{prefix}optimization_results.csv")
-    out_df.to_csv(csv_path, index=False)
-    print(f"Results saved to '{csv_path}'.")
+    results_path = write_table(out_df, f"{prefix}optimization_results", args.storage_format)
+    print(f"Results saved to '{results_path}'.")
 
     # 7. Build & save report
-    report = build_report(selected, df_scored, alpha, budget, equal_dist)
+    report = build_report(selected, df_scored, alpha, budget, equal_dist, run_info, args.one_per_msme)
     print()
     print(report)
 
@@ -474,7 +1810,21 @@ def main():
         f.write(report)
     print(f"\nEvaluation report saved to '{report_path}'.")
 
-    # 8. Final summary
+    # 8. Optional fine-grained alpha sweep
+    if args.sweep_steps > 1:
+        alphas = np.round(np.linspace(0.0, 1.0, args.sweep_steps), 6)
+        sweep = alpha_sweep(df, budget, alphas, one_per_msme=args.one_per_msme)
+        sweep_path = write_table(sweep, f"{prefix}alpha_sweep", args.storage_format)
+        print(f"Alpha sweep ({len(alphas)} steps) saved to '{sweep_path}'.")
+
+    # 8b. Optional budget frontier
+    if args.frontier is not None:
+        curve = budget_frontier(df_scored, parse_budget_range(args.frontier))
+        frontier_path = write_table(curve, f"{prefix}budget_frontier", args.storage_format)
+        print(f"Budget frontier ({len(curve)} levels, ₹{curve['Budget'].iloc[0]:,.0f} – "
+              f"₹{curve['Budget'].iloc[-1]:,.0f}) saved to '{frontier_path}'.")
+
+    # 9. Final summary
     log("\n" + "=" * 60)
     log("FINAL SUMMARY")
     log("=" * 60)
@@ -0,0 +1,185 @@
+"""
+Phase 4: Persistent Optimization Server
+=======================================
+Long-lived worker that answers policy optimization queries from memory, so
+the dashboard does not pay interpreter start-up, pandas/numpy import and a
+full re-read of the Phase 3 results on every slider move.
+
+Protocol: JSON-RPC style, one JSON object per line over stdin/stdout.
+
+    → {"id": 1, "method": "optimize",
+       "params": {"budget": 50000000, "alpha": 0.6, "equal_distribution": false,
+                  "solver": "greedy", "one_per_msme": false,
+                  "constraints": ["Category=Micro:0.3:0.5"], "rebalance": false,
+                  "layout": "records", "unselected_limit": null, "unselected_offset": 0}}
+    ← {"id": 1, "result": { ...same payload as optimization_engine.py --json-out... }}
+
+    → {"id": 2, "method": "justify", "params": {"ranks": [1, 2], "budget": 50000000, "alpha": 0.6}}
+    ← {"id": 2, "result": {"1": "Selected (Efficiency Rank #1 of ...", "2": "..."}}
+
+    → {"id": 3, "method": "frontier", "params": {"alpha": 0.6, "budgets": "10000000:500000000:5000000"}}
+    ← {"id": 3, "result": {"alpha": 0.6, "budgets": "...", "frontier": {"columns": [...], "data": [...]}}}
+
+    → {"id": 4, "method": "ping"}
+    ← {"id": 4, "result": "pong"}
+
+    → {"id": 5, "method": "stats"}
+    ← {"id": 5, "result": {"responses": 12, "response_hits": 40, ...}}
+
+optimize leaves out the Decision_Justification text unless params carry
+"justifications": "full"; justify renders it for the ranks being viewed.
+frontier returns the global greedy outcome (pairs funded, jobs, revenue
+gain, utilization) at every budget level of the range, for slider lookups.
+
+Errors come back as {"id": ..., "error": "<message>"}. The eligibility data
+is loaded once at start-up and reloaded automatically when the Phase 3
+output file changes on disk. Answers are kept in a ResultCache keyed by
+the file's content hash and the query, so repeated queries (and smaller
+budgets at an alpha already walked) are served from memory; "stats"
+reports its hit counts. Rankings are kept in an AlphaSweepIndex, so
+moving the alpha slider re-ranks incrementally instead of re-sorting.
+Diagnostics go to stderr; stdout carries responses only.
+
+Usage:
+    python optimization_server.py
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from optimization_engine import (
+    DEFAULT_ALPHA, DEFAULT_BUDGET, FRONTIER_RANGE, AlphaSweepIndex, frontier, justify, load_eligibility_data,
+    optimize, parse_constraint,
+)
+from result_cache import DEFAULT_MAX_RESPONSES, DEFAULT_MAX_RUNS, ResultCache, file_fingerprint
+from storage import FORMATS, table_path
+
+
+class OptimizationService:
+    """Holds the Phase 3 Single_Scheme pairs in memory and answers queries."""
+
+    def __init__(self, fmt: str | None = None, max_responses: int = DEFAULT_MAX_RESPONSES,
+                 max_runs: int = DEFAULT_MAX_RUNS):
+        self.fmt = fmt
+        self.cache = ResultCache(max_responses, max_runs)
+        self.path = table_path("scheme_eligibility_results", fmt)
+        self.df = None
+        self.options = None   # all rows incl. Combined_Multi_Scheme, loaded on demand
+        self.index = None
+        self._stamp = None
+
+    def _file_stamp(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def data(self, include_combined=False):
+        """Current eligibility frame, reloaded if Phase 3 rewrote its output."""
+        stamp = self._file_stamp()
+        if stamp != self._stamp:
+            self.df = load_eligibility_data(json_mode=True, fmt=self.fmt)
+            self.options = None
+            self.index = AlphaSweepIndex(self.df)
+            self.cache.use(file_fingerprint(self.path))
+            self._stamp = stamp
+            log(f"Loaded {len(self.df)} Single_Scheme pairs from {self.path}")
+        if include_combined:
+            if self.options is None:
+                self.options = load_eligibility_data(json_mode=True, fmt=self.fmt, include_combined=True)
+            return self.options
+        return self.df
+
+    def optimize(self, budget=DEFAULT_BUDGET, alpha=DEFAULT_ALPHA, equal_distribution=False, solver="greedy",
+                 one_per_msme=False, constraints=(), rebalance=False, layout="records",
+                 unselected_limit=None, unselected_offset=0, justifications="lazy"):
+        df = self.data(include_combined=bool(one_per_msme))
+        return optimize(df, float(alpha), float(budget), bool(equal_distribution),
+                        index=self.index, solver=solver, one_per_msme=bool(one_per_msme),
+                        constraints=[parse_constraint(spec) for spec in constraints],
+                        rebalance=bool(rebalance), layout=layout,
+                        unselected_limit=None if unselected_limit is None else int(unselected_limit),
+                        unselected_offset=int(unselected_offset), justifications=justifications,
+                        cache=self.cache)
+
+    def justify(self, ranks=(), budget=DEFAULT_BUDGET, alpha=DEFAULT_ALPHA, equal_distribution=False,
+                solver="greedy", one_per_msme=False, constraints=(), rebalance=False, **_output_options):
+        df = self.data(include_combined=bool(one_per_msme))
+        return justify(df, ranks, float(alpha), float(budget), bool(equal_distribution),
+                       index=self.index, solver=solver, one_per_msme=bool(one_per_msme),
+                       constraints=[parse_constraint(spec) for spec in constraints],
+                       rebalance=bool(rebalance), cache=self.cache)
+
+    def frontier(self, alpha=DEFAULT_ALPHA, budgets=FRONTIER_RANGE, layout="columns"):
+        return frontier(self.data(), float(alpha), budgets, index=self.index, layout=layout, cache=self.cache)
+
+    def handle(self, request: dict) -> dict:
+        req_id = request.get("id")
+        method = request.get("method", "optimize")
+        params = request.get("params") or {}
+        try:
+            if method == "ping":
+                result = "pong"
+            elif method == "optimize":
+                result = self.optimize(**params)
+            elif method == "justify":
+                result = self.justify(**params)
+            elif method == "frontier":
+                result = self.frontier(**params)
+            elif method == "stats":
+                result = self.cache.stats()
+            else:
+                raise ValueError(f"Unknown method '{method}'")
+        except Exception as exc:  # report back to the caller, keep serving
+            return {"id": req_id, "error": f"{type(exc).__name__}: {exc}"}
+        return {"id": req_id, "result": result}
+
+
+def log(msg: str) -> None:
+    print(f"[optimization_server] {msg}", file=sys.stderr, flush=True)
+
+
+def serve(service: OptimizationService, stdin=sys.stdin, stdout=sys.stdout) -> None:
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as exc:
+            response = {"id": None, "error": f"Invalid JSON: {exc}"}
+        else:
+            response = service.handle(request)
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Phase 4: persistent optimization server (JSON lines over stdin/stdout)"
+    )
+    parser.add_argument(
+        "--storage-format", choices=list(FORMATS), default=None,
+        help="Format of the Phase 3 results table (default: CHAOSZEN_STORAGE_FORMAT or csv)."
+    )
+    parser.add_argument(
+        "--cache-responses", type=int, default=DEFAULT_MAX_RESPONSES,
+        help=f"Query answers kept in the LRU result cache (0 disables it). Default: {DEFAULT_MAX_RESPONSES}"
+    )
+    parser.add_argument(
+        "--cache-runs", type=int, default=DEFAULT_MAX_RUNS,
+        help=f"Per-alpha greedy walks kept for answering smaller budgets. Default: {DEFAULT_MAX_RUNS}"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    service = OptimizationService(args.storage_format, args.cache_responses, args.cache_runs)
+    service.data()  # load and index up front so the first query is fast
+    log("Ready")
+    serve(service)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Phase 4: Optimization Result Cache
+==================================
+Content-addressed cache for the persistent optimization server. The
+dashboard keeps asking for the same or nearby (budget, alpha) queries;
+each answer is keyed by a hash of the Phase 3 results file plus the
+normalized query, so:
+
+  - a repeated query is answered from memory,
+  - rewriting scheme_eligibility_results invalidates everything cached for
+    the old content (rewriting it with identical content does not),
+  - both the answers and the greedy walks behind them are held in LRU
+    order with a bounded number of entries.
+
+For plain global greedy queries it also keeps, per alpha, the scored
+pairs, the efficiency ranking and the greedy walk at the largest budget
+seen. A smaller budget at that alpha reuses the walk's prefix
+(optimization_engine.greedy_prefix_arrays) instead of re-scoring,
+re-ranking and re-walking every pair.
+
+Usage:
+    cache = ResultCache()
+    cache.use(file_fingerprint(path))        # after (re)loading the data
+    optimize(df, alpha, budget, index=index, cache=cache)
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_RESPONSES = 64
+DEFAULT_MAX_RUNS = 8
+FINGERPRINT_BLOCK = 1 << 24
+
+
+def file_fingerprint(path: str) -> str:
+    """BLAKE2b digest of a file's content."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while block := f.read(FINGERPRINT_BLOCK):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def query_key(fingerprint: str, method: str, params: dict) -> str:
+    """Content address of one query: data fingerprint + method + normalized params."""
+    blob = json.dumps([fingerprint, method, params], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class LRU:
+    """Ordered dict with least-recently-used eviction beyond max_entries."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value) -> None:
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class GreedyRun:
+    """A greedy walk at one alpha: scored pairs, ranking, sorted costs and picks at `budget`."""
+
+    def __init__(self, df_scored, order: np.ndarray, budget: float, positions: np.ndarray,
+                 remaining: np.ndarray):
+        self.df_scored = df_scored
+        self.order = order
+        self.costs = df_scored["Subsidy_Applied"].to_numpy(dtype=np.float64)[order]
+        self.budget = budget
+        self.positions = positions
+        self.remaining = remaining
+
+
+class ResultCache:
+    """
+    Query answers (`responses`) and greedy walks (`runs`), both LRU-bounded
+    and both dropped when use() is given a different data fingerprint.
+    """
+
+    def __init__(self, max_responses: int = DEFAULT_MAX_RESPONSES, max_runs: int = DEFAULT_MAX_RUNS):
+        self.responses = LRU(max_responses)
+        self.runs = LRU(max_runs)
+        self.fingerprint = None
+
+    def use(self, fingerprint: str) -> None:
+        """Point the cache at the current data; entries for other content are dropped."""
+        if fingerprint != self.fingerprint:
+            self.responses.clear()
+            self.runs.clear()
+            self.fingerprint = fingerprint
+
+    def key(self, method: str, params: dict) -> str:
+        return query_key(self.fingerprint, method, params)
+
+    def run_key(self, alpha: float) -> str:
+        return query_key(self.fingerprint, "greedy_run", {"alpha": alpha})
+
+    def stats(self) -> dict:
+        return {
+            "responses": len(self.responses), "response_hits": self.responses.hits,
+            "response_misses": self.responses.misses,
+            "runs": len(self.runs), "run_hits": self.runs.hits, "run_misses": self.runs.misses,
+        }
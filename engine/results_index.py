@@ -0,0 +1,199 @@
+"""
+Per-MSME Index over Phase 3 Results
+===================================
+Sidecar index written next to scheme_eligibility_results (same path plus
+".idx") so a consumer can jump straight to one MSME's rows instead of
+scanning the whole table. Phase 3 writes every MSME's rows contiguously
+(its single-scheme rows, then its combined row), so each MSME maps to one
+byte range of the CSV and one row range of any format.
+
+File layout (little-endian):
+
+    header  : magic "CZIX", version u16, id_width u16, n_slots u32,
+              n_entries u32, data_size u64 (byte size of the indexed table),
+              data_mtime_ns u64 (its modification time in nanoseconds)
+    slots   : n_slots x [MSME_ID (id_width bytes, NUL padded), offset u64,
+              length u64, first_row u64, rows u32]
+
+The slots form an open-addressing hash table (FNV-1a 32-bit of the ASCII
+MSME_ID, masked to the power-of-two n_slots, linear probing, load <= 0.5),
+so a lookup touches one or two slots whatever the table size; an all-NUL
+MSME_ID marks an empty slot. For CSV, offset/length are the byte range of
+the MSME's rows. For parquet/feather, offset is the storage unit (row
+group / record batch) holding its first row and length the row's position
+in that unit, so a lookup decodes only the units the rows span.
+data_size and data_mtime_ns let readers detect an index that no longer
+matches its table, including a rewrite of the same byte size.
+
+backend/server.js reads the same file for GET /api/msme/:id/schemes.
+
+Usage:
+    from results_index import ResultsIndex
+    rows = ResultsIndex().read_rows("MSME_0001")   # DataFrame of that MSME's rows
+"""
+
+import io
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from storage import csv_row_offsets, read_table, read_unit_rows, resolve_format, storage_units, table_path
+
+RESULTS_TABLE = "scheme_eligibility_results"
+MAGIC = b"CZIX"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIIQQ")
+FNV_OFFSET = np.uint32(2166136261)
+FNV_PRIME = np.uint32(16777619)
+
+
+def index_path(name: str = RESULTS_TABLE, fmt: str | None = None) -> str:
+    return table_path(name, fmt) + ".idx"
+
+
+def slot_dtype(id_width: int) -> np.dtype:
+    return np.dtype([("id", f"S{id_width}"), ("offset", "<u8"), ("length", "<u8"),
+                     ("first_row", "<u8"), ("rows", "<u4")])
+
+
+def fnv1a(ids: np.ndarray) -> np.ndarray:
+    """FNV-1a 32-bit hash of each NUL-padded bytes value, vectorized over ids."""
+    width = ids.dtype.itemsize
+    raw = np.frombuffer(np.ascontiguousarray(ids).tobytes(), dtype=np.uint8).reshape(len(ids), width)
+    lengths = np.char.str_len(ids)
+    h = np.full(len(ids), FNV_OFFSET, dtype=np.uint32)
+    with np.errstate(over="ignore"):
+        for k in range(width):
+            h = np.where(k < lengths, (h ^ raw[:, k]) * FNV_PRIME, h)
+    return h
+
+
+# ---------------------------------------------------------------------------
+# 1. BUILDING
+# ---------------------------------------------------------------------------
+
+def build_index(name: str = RESULTS_TABLE, fmt: str | None = None) -> str:
+    """Index table `name` by MSME_ID; returns the path of the .idx written."""
+    fmt = resolve_format(fmt)
+    path = table_path(name, fmt)
+    ids = read_table(name, fmt, columns=["MSME_ID"])["MSME_ID"].to_numpy(dtype=str).astype(bytes)
+    n = len(ids)
+
+    # One run of consecutive rows per MSME
+    run_start = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if n else np.zeros(0, dtype=np.int64)
+    run_rows = np.diff(np.r_[run_start, n])
+    run_ids = ids[run_start]
+    if len(np.unique(run_ids)) != len(run_ids):
+        raise ValueError(f"'{path}' does not keep each MSME's rows together; cannot index it.")
+
+    if fmt == "csv":
+        line_start = csv_row_offsets(path)
+        if len(line_start) != n + 1:
+            raise ValueError(f"'{path}' has rows spanning several lines; cannot index it.")
+        offsets = line_start[run_start]
+        lengths = line_start[run_start + run_rows] - offsets
+    else:
+        unit_start = np.r_[0, np.cumsum(storage_units(name, fmt))]
+        offsets = np.searchsorted(unit_start, run_start, side="right") - 1
+        lengths = run_start - unit_start[offsets]
+
+    # Open addressing, linear probing. Each round places, for every free
+    # target slot, the first entry probing it; the rest move one slot on.
+    n_slots = 1 << max(3, int(2 * len(run_ids) - 1).bit_length())
+    mask = n_slots - 1
+    home = fnv1a(run_ids).astype(np.int64) & mask
+    slot_of = np.full(n_slots, -1, dtype=np.int64)
+    pending = np.arange(len(run_ids))
+    probe = np.zeros(len(run_ids), dtype=np.int64)
+    while len(pending):
+        target = (home[pending] + probe[pending]) & mask
+        free = slot_of[target] == -1
+        won_slots, first = np.unique(target[free], return_index=True)
+        winners = pending[free][first]
+        slot_of[won_slots] = winners
+        placed = np.zeros(len(run_ids), dtype=bool)
+        placed[winners] = True
+        pending = pending[~placed[pending]]
+        probe[pending] += 1
+
+    id_width = max(1, ids.dtype.itemsize)
+    table = np.zeros(n_slots, dtype=slot_dtype(id_width))
+    used = slot_of >= 0
+    entries = slot_of[used]
+    table["id"][used] = run_ids[entries]
+    table["offset"][used] = offsets[entries]
+    table["length"][used] = lengths[entries]
+    table["first_row"][used] = run_start[entries]
+    table["rows"][used] = run_rows[entries]
+
+    out = index_path(name, fmt)
+    stat = os.stat(path)
+    with open(out, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, id_width, n_slots, len(run_ids), stat.st_size, stat.st_mtime_ns))
+        f.write(table.tobytes())
+    return out
+
+
+# ---------------------------------------------------------------------------
+# 2. LOOKUP
+# ---------------------------------------------------------------------------
+
+class ResultsIndex:
+    """
+    Memory-mapped .idx reader: find() probes the hash table in place, so
+    opening is immediate and a lookup costs the same at any table size.
+    """
+
+    def __init__(self, name: str = RESULTS_TABLE, fmt: str | None = None):
+        self.name = name
+        self.fmt = resolve_format(fmt)
+        self.data_path = table_path(name, self.fmt)
+        self.path = index_path(name, self.fmt)
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"'{self.path}' not found. Run scheme_eligibility.py (Phase 3) first.")
+
+        with open(self.path, "rb") as f:
+            magic, version, self.id_width, self.n_slots, self.n_entries, data_size, data_mtime_ns = \
+                HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{self.path}' is not a version {VERSION} results index.")
+        stat = os.stat(self.data_path)
+        if (stat.st_size, stat.st_mtime_ns) != (data_size, data_mtime_ns):
+            raise ValueError(f"'{self.path}' is stale: '{self.data_path}' changed after it was built.")
+        self.slots = np.memmap(self.path, dtype=slot_dtype(self.id_width), mode="r",
+                               offset=HEADER.size, shape=(self.n_slots,))
+
+    def __len__(self) -> int:
+        return self.n_entries
+
+    def find(self, msme_id: str) -> dict | None:
+        """{offset, length, first_row, rows} of the MSME's rows, or None."""
+        key = msme_id.encode()
+        if len(key) > self.id_width:
+            return None
+        mask = self.n_slots - 1
+        slot = int(fnv1a(np.array([key]))[0]) & mask
+        while True:
+            entry = self.slots[slot]
+            if not entry["id"]:
+                return None
+            if entry["id"] == key:
+                return {k: int(entry[k]) for k in ("offset", "length", "first_row", "rows")}
+            slot = (slot + 1) & mask
+
+    def read_rows(self, msme_id: str) -> pd.DataFrame:
+        """The MSME's result rows (empty frame if it has none)."""
+        entry = self.find(msme_id)
+        if self.fmt != "csv":
+            if entry is None:
+                return read_unit_rows(self.name, self.fmt, 0, 0, 0)
+            return read_unit_rows(self.name, self.fmt, entry["offset"], entry["length"], entry["rows"])
+
+        with open(self.data_path, "rb") as f:
+            header = f.readline()
+            if entry is None:
+                return pd.read_csv(io.BytesIO(header))
+            f.seek(entry["offset"])
+            return pd.read_csv(io.BytesIO(header + f.read(entry["length"])))
@@ -0,0 +1,357 @@
+"""
+Phase 4: Parallel Scenario Batch Runner
+=======================================
+Runs a grid of what-if scenarios (alpha x budget x category shares) over
+the Phase 3 Single_Scheme pairs and writes one consolidated table with
+the greedy outcome of every scenario.
+
+Scoring does not depend on the budget or the shares, so the runner
+normalizes the pairs once and puts the read-only per-pair arrays (scores,
+subsidies, jobs, revenue gain, category and scheme codes) in one
+shared-memory block. Worker processes attach to it at start-up instead of
+each receiving a copy of the DataFrame. Each task is one alpha: the worker
+ranks the pairs once at that alpha, then walks the ranking for every
+(budget, shares) scenario at it. With fewer alphas than workers, each
+alpha's scenarios are split over several tasks (each ranks on its own),
+so a grid of many budgets at one alpha still uses every worker. Tasks go
+through a process pool with at most 2 x workers in flight, and results
+keep grid order.
+
+A scenario without shares is plain global greedy (greedy_select). With
+shares, each category gets its share of the budget and is walked on its
+own slice of the ranking, as with --equal-distribution
+(greedy_select_with_category_budgets). Outcomes match those functions.
+The table also records each scenario's cost in seconds, with its task's
+ranking time split over the task's scenarios.
+
+Grid spec (JSON file for --grid, or the equivalent CLI flags):
+
+    {"alphas": [0.1, 0.3, 0.5, 0.7, 0.9],
+     "budgets": "10000000:500000000:5000000",       # or a list of rupee amounts
+     "shares": ["global", "Micro=0.4,Small=0.35,Medium=0.25"]}
+
+Usage:
+    python scenario_runner.py                                  # sensitivity alphas, default budget
+    python scenario_runner.py --alphas 0:1:0.05 --budgets 10000000:500000000:5000000 --workers 8
+    python scenario_runner.py --shares global --shares Micro=0.5,Small=0.3,Medium=0.2
+    python scenario_runner.py --grid scenarios.json --workers 4
+
+Outputs:
+    scenario_results.csv       — One row per scenario: outcome and Seconds
+"""
+
+import argparse
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from optimization_engine import (
+    CATEGORY_BUDGET_SHARES, DEFAULT_BUDGET, SENSITIVITY_ALPHAS, efficiency_order, greedy_select_arrays,
+    load_eligibility_data,
+)
+from storage import FORMATS, write_table
+
+GLOBAL_SHARES = "global"
+
+# Rows of the shared per-pair matrix
+ARRAY_FIELDS = ["norm_rev", "norm_emp", "cost", "jobs", "gain", "category", "scheme"]
+
+
+# ---------------------------------------------------------------------------
+# 1. GRID SPEC
+# ---------------------------------------------------------------------------
+
+def parse_shares(spec: str) -> dict | None:
+    """'Micro=0.4,Small=0.35,Medium=0.25' -> {category: share}; 'global' -> None."""
+    if spec == GLOBAL_SHARES:
+        return None
+    shares = {}
+    for part in spec.split(","):
+        name, sep, share = part.partition("=")
+        if not sep or name.strip() not in CATEGORY_BUDGET_SHARES:
+            raise ValueError(f"Invalid shares '{spec}'. Expected e.g. Micro=0.4,Small=0.35,Medium=0.25 "
+                             f"(categories: {', '.join(CATEGORY_BUDGET_SHARES)}) or '{GLOBAL_SHARES}'.")
+        shares[name.strip()] = float(share)
+    if any(s < 0 for s in shares.values()) or sum(shares.values()) > 1 + 1e-9:
+        raise ValueError(f"Invalid shares '{spec}': shares must be >= 0 and sum to at most 1.")
+    return shares
+
+
+def shares_label(shares: dict | None) -> str:
+    if shares is None:
+        return GLOBAL_SHARES
+    return ",".join(f"{name}={share:g}" for name, share in shares.items())
+
+
+def parse_values(spec) -> list[float]:
+    """A list of numbers, 'a,b,c', or 'MIN:MAX:STEP' (MIN, MIN+STEP, ..., up to and including MAX)."""
+    if isinstance(spec, (list, tuple)):
+        return [float(v) for v in spec]
+    if isinstance(spec, (int, float)):
+        return [float(spec)]
+    if ":" not in spec:
+        return [float(v) for v in spec.split(",") if v.strip()]
+    try:
+        low, high, step = (float(part) for part in spec.split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid range '{spec}'. Expected MIN:MAX:STEP.") from None
+    if not (low <= high and step > 0):
+        raise ValueError(f"Invalid range '{spec}': need MIN <= MAX and STEP > 0.")
+    return np.round(low + step * np.arange(int(np.floor((high - low) / step + 1e-9)) + 1), 6).tolist()
+
+
+def build_grid(alphas, budgets, shares) -> list[dict]:
+    """Every (alpha, budget, shares) combination, alpha-major."""
+    alphas = [max(0.0, min(1.0, a)) for a in parse_values(alphas)]
+    budgets = parse_values(budgets)
+    if any(b <= 0 for b in budgets):
+        raise ValueError("Budgets must be positive.")
+    shares = [s if isinstance(s, dict) or s is None else parse_shares(s) for s in shares]
+    return [{"alpha": a, "budget": b, "shares": s} for a in alphas for b in budgets for s in shares]
+
+
+def load_grid(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    return build_grid(spec.get("alphas", SENSITIVITY_ALPHAS), spec.get("budgets", [DEFAULT_BUDGET]),
+                      spec.get("shares", [GLOBAL_SHARES]))
+
+
+# ---------------------------------------------------------------------------
+# 2. SHARED PAIR ARRAYS
+# ---------------------------------------------------------------------------
+
+def pair_arrays(df: pd.DataFrame) -> tuple[np.ndarray, list, list]:
+    """
+    The alpha-independent per-pair values as one float64 matrix (rows in
+    ARRAY_FIELDS order), plus the category and scheme names behind the codes.
+    """
+    rev = df["Revenue_Increase_Pct"].to_numpy(dtype=np.float64)
+    emp = df["Employment_Increase_Pct"].to_numpy(dtype=np.float64)
+    max_rev, max_emp = rev.max(), emp.max()
+    category, categories = pd.factorize(df["Category"])
+    scheme, schemes = pd.factorize(df["Scheme_Name"])
+
+    # Same arithmetic as compute_scores() so rankings match bit for bit
+    matrix = np.empty((len(ARRAY_FIELDS), len(df)), dtype=np.float64)
+    matrix[0] = rev / max_rev if max_rev > 0 else 0.0
+    matrix[1] = emp / max_emp if max_emp > 0 else 0.0
+    matrix[2] = df["Subsidy_Applied"].to_numpy(dtype=np.float64)
+    matrix[3] = df["New_Jobs_Added"].to_numpy(dtype=np.float64)
+    matrix[4] = (df["Projected_Revenue"].to_numpy(dtype=np.float64)
+                 - df["Before_Annual_Revenue"].to_numpy(dtype=np.float64))
+    matrix[5] = category
+    matrix[6] = scheme
+    return matrix, list(categories), list(schemes)
+
+
+_worker_shm = None
+_worker_state = None
+
+
+def _attach_worker(shm_name: str, shape: tuple, categories: list, schemes: list) -> None:
+    global _worker_shm, _worker_state
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    matrix = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+    matrix.flags.writeable = False
+    _worker_state = (matrix, categories, schemes)
+
+
+def _run_alpha_task(alpha: float, scenarios: list[dict]) -> list[dict]:
+    return run_alpha(*_worker_state, alpha, scenarios)
+
+
+# ---------------------------------------------------------------------------
+# 3. SCENARIOS
+# ---------------------------------------------------------------------------
+
+def run_alpha(matrix: np.ndarray, categories: list, schemes: list, alpha: float,
+              scenarios: list[dict]) -> list[dict]:
+    """Rank the pairs once at `alpha`, then evaluate each (budget, shares) scenario."""
+    t0 = time.perf_counter()
+    norm_rev, norm_emp, cost, jobs, gain, category, scheme = matrix
+    with np.errstate(invalid="ignore", divide="ignore"):
+        efficiency = ((alpha * norm_rev) + ((1.0 - alpha) * norm_emp)) / np.where(cost == 0, np.nan, cost)
+    order = efficiency_order(efficiency)
+    costs = cost[order]
+    ranked_category = category[order]
+    # Each category's slice of the ranking, as in _category_greedy()
+    slices = {name: (order[ranked_category == code], costs[ranked_category == code])
+              for code, name in enumerate(categories)}
+    rank_seconds = (time.perf_counter() - t0) / max(1, len(scenarios))
+
+    rows = []
+    for scenario in scenarios:
+        t0 = time.perf_counter()
+        budget, shares = scenario["budget"], scenario["shares"]
+        if shares is None:
+            picked = order[greedy_select_arrays(costs, budget)[0]]
+        else:
+            picked = []
+            for name, share in shares.items():
+                if name in slices:
+                    sub_order, sub_costs = slices[name]
+                    picked.append(sub_order[greedy_select_arrays(sub_costs, budget * share)[0]])
+            picked = np.concatenate(picked) if picked else np.zeros(0, dtype=np.int64)
+
+        row = {"Alpha": alpha, "Beta": 1 - alpha, "Budget": budget, "Shares": shares_label(shares),
+               "Selected": len(picked)}
+        if len(picked):
+            # Sums run in selection order, as over the selection frames
+            composite = (alpha * norm_rev[picked]) + ((1.0 - alpha) * norm_emp[picked])
+            used = cost[picked].sum()
+            row.update({
+                "Budget_Used": used,
+                "Utilization_Pct": used / budget * 100,
+                "Top_Scheme": schemes[int(pd.Series(scheme[picked]).value_counts().idxmax())],
+                "Avg_Score": composite.sum() / len(picked),
+                "New_Jobs": int(jobs[picked].sum()),
+                "Revenue_Gain": gain[picked].sum(),
+            })
+        row["Seconds"] = rank_seconds + time.perf_counter() - t0
+        rows.append(row)
+    return rows
+
+
+def scenario_tasks(grid: list[dict], workers: int = 1) -> list[tuple[float, list[int]]]:
+    """
+    (alpha, scenario indices) per task: one task per alpha, or with fewer
+    alphas than workers, each alpha's scenarios split into enough
+    contiguous tasks to give every worker one.
+    """
+    by_alpha = {}
+    for i, scenario in enumerate(grid):
+        by_alpha.setdefault(scenario["alpha"], []).append(i)
+    parts = -(-workers // len(by_alpha)) if by_alpha else 1
+    return [(alpha, chunk.tolist())
+            for alpha, ids in by_alpha.items()
+            for chunk in np.array_split(np.array(ids), min(parts, len(ids)))]
+
+
+def run_scenarios(df: pd.DataFrame, grid: list[dict], workers: int = 1) -> pd.DataFrame:
+    """
+    Evaluate every scenario of `grid` over the pairs in df; one row per
+    scenario, in grid order. With workers > 1 the pair arrays are shared
+    with the worker processes through shared memory, tasks as in
+    scenario_tasks().
+    """
+    matrix, categories, schemes = pair_arrays(df)
+    tasks = scenario_tasks(grid, max(1, workers))
+
+    rows = [None] * len(grid)
+    if workers <= 1:
+        for alpha, ids in tasks:
+            for i, row in zip(ids, run_alpha(matrix, categories, schemes, alpha, [grid[i] for i in ids])):
+                rows[i] = row
+        return pd.DataFrame(rows)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, matrix.nbytes))
+    try:
+        np.ndarray(matrix.shape, dtype=np.float64, buffer=shm.buf)[:] = matrix
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_worker,
+                                 initargs=(shm.name, matrix.shape, categories, schemes)) as pool:
+            pending = deque()
+
+            def collect():
+                ids, future = pending.popleft()
+                for i, row in zip(ids, future.result()):
+                    rows[i] = row
+
+            for alpha, ids in tasks:
+                pending.append((ids, pool.submit(_run_alpha_task, alpha, [grid[i] for i in ids])))
+                if len(pending) >= 2 * workers:
+                    collect()
+            while pending:
+                collect()
+    finally:
+        shm.close()
+        shm.unlink()
+    return pd.DataFrame(rows)
+
+
+# ---------------------------------------------------------------------------
+# 4. CLI
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Phase 4: parallel what-if scenario batch runner")
+    parser.add_argument(
+        "--grid", type=str, default=None,
+        help="JSON grid spec with 'alphas', 'budgets' and 'shares' (overrides the flags below)."
+    )
+    parser.add_argument(
+        "--alphas", type=str, default=",".join(map(str, SENSITIVITY_ALPHAS)),
+        help="Alphas as a,b,c or MIN:MAX:STEP. Default: the sensitivity analysis alphas."
+    )
+    parser.add_argument(
+        "--budgets", type=str, default=str(DEFAULT_BUDGET),
+        help=f"Budgets in rupees as a,b,c or MIN:MAX:STEP. Default: {DEFAULT_BUDGET}"
+    )
+    parser.add_argument(
+        "--shares", action="append", default=None, metavar="CATEGORY=SHARE,...",
+        help="Category budget shares, e.g. Micro=0.4,Small=0.35,Medium=0.25, or 'global' for one "
+             "global greedy. Repeatable. Default: global and the --equal-distribution shares."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes (one alpha per task, split when there are fewer alphas than "
+             "workers); output keeps grid order. Default: 1"
+    )
+    parser.add_argument(
+        "--output-prefix", type=str, default="",
+        help="Optional prefix for the output table name."
+    )
+    parser.add_argument(
+        "--storage-format", choices=list(FORMATS), default=None,
+        help="Format of the data/ tables read and written (default: CHAOSZEN_STORAGE_FORMAT or csv)."
+    )
+    args = parser.parse_args()
+    if args.shares is None:
+        args.shares = [GLOBAL_SHARES, shares_label(CATEGORY_BUDGET_SHARES)]
+    try:
+        args.grid = load_grid(args.grid) if args.grid else build_grid(args.alphas, args.budgets, args.shares)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    if not args.grid:
+        parser.error("the scenario grid is empty")
+    return args
+
+
+def main():
+    args = parse_args()
+    grid = args.grid
+
+    print("=" * 60)
+    print("PHASE 4: Scenario Batch Runner")
+    print("=" * 60)
+    n_alphas = len({s["alpha"] for s in grid})
+    print(f"  Scenarios : {len(grid):,} ({n_alphas} alphas)")
+    print(f"  Workers   : {args.workers}\n")
+
+    df = load_eligibility_data(fmt=args.storage_format)
+
+    t0 = time.perf_counter()
+    results = run_scenarios(df, grid, args.workers)
+    wall = time.perf_counter() - t0
+
+    path = write_table(results, f"{args.output_prefix}scenario_results", args.storage_format)
+    print(f"\nResults saved to '{path}'.")
+
+    seconds = results["Seconds"]
+    print("\n" + "=" * 60)
+    print("FINAL SUMMARY")
+    print("=" * 60)
+    print(f"  Scenarios         : {len(results):,}")
+    print(f"  Wall Time         : {wall:.3f}s ({len(results) / wall:,.0f} scenarios/s)")
+    print(f"  Per Scenario      : mean {seconds.mean() * 1000:.2f} ms, max {seconds.max() * 1000:.2f} ms")
+    print(f"  Scenario CPU Time : {seconds.sum():.3f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
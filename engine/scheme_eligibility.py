@@ -4,6 +4,11 @@ Phase 3: Scheme Eligibility and Impact Simulation
 Multi-scheme eligibility checking and revenue/employment impact simulation
 for all MSMEs in msme_data.csv against schemes in schemes_data.csv.
 
+Usage:
+    python scheme_eligibility.py
+    python scheme_eligibility.py --chunk-size 100000   # bounded-memory streaming
+    python scheme_eligibility.py --workers 8           # shard across processes
+
 Output Files:
   - scheme_eligibility_results.csv  : Per-scheme and combined impact projections
   - phase3_evaluation.txt           : Simulation summary and spot-check report
@@ -11,7 +16,13 @@ Output Files:
 
 import pandas as pd
 import numpy as np
+import argparse
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from results_index import build_index
+from storage import FORMATS, TableAppender, iter_table_chunks, read_table, table_path, write_table
 
 np.random.seed(42)
 
@@ -20,24 +31,48 @@ np.random.seed(42)
 # 1. DATA LOADING
 # ---------------------------------------------------------------------------
 
-def load_data():
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    msme_path = os.path.join(base_dir, "data", "msme_data.csv")
-    scheme_path = os.path.join(base_dir, "data", "schemes_data.csv")
+# Columns of msme_data that Phase 3 actually reads
+SIMULATION_INPUT_COLUMNS = [
+    "MSME_ID", "Sector", "Category", "Location_Type",
+    "Annual_Revenue", "Number_of_Employees",
+]
+
+
+def _check_inputs(fmt: str | None = None):
+    msme_path = table_path("msme_data", fmt)
+    scheme_path = table_path("schemes_data", fmt)
 
     if not os.path.exists(msme_path):
         raise FileNotFoundError(f"Cannot find {msme_path}. Run data_generator.py first.")
     if not os.path.exists(scheme_path):
         raise FileNotFoundError(f"Cannot find {scheme_path}.")
 
-    msme_df = pd.read_csv(msme_path)
-    scheme_df = pd.read_csv(scheme_path)
+
+def load_data(fmt: str | None = None):
+    _check_inputs(fmt)
+
+    msme_df = read_table("msme_data", fmt)
+    scheme_df = read_table("schemes_data", fmt)
 
     print(f"Loaded {len(msme_df)} MSME records.")
     print(f"Loaded {len(scheme_df)} schemes.\n")
     return msme_df, scheme_df
 
 
+def load_schemes(fmt: str | None = None) -> pd.DataFrame:
+    """Load the scheme catalog only; MSMEs are streamed with iter_msme_chunks()."""
+    _check_inputs(fmt)
+
+    scheme_df = read_table("schemes_data", fmt)
+    print(f"Loaded {len(scheme_df)} schemes.\n")
+    return scheme_df
+
+
+def iter_msme_chunks(chunk_size: int, fmt: str | None = None):
+    """Yield msme_data in blocks of chunk_size rows, reading only the simulation columns."""
+    yield from iter_table_chunks("msme_data", chunk_size, fmt, columns=SIMULATION_INPUT_COLUMNS)
+
+
 # ---------------------------------------------------------------------------
 # 2. ELIGIBILITY LOGIC
 # ---------------------------------------------------------------------------
@@ -80,6 +115,113 @@ def get_eligible_schemes(msme: pd.Series, scheme_df: pd.DataFrame) -> pd.DataFra
     return scheme_df[mask].reset_index(drop=True)
 
 
+# MSME attribute -> scheme criteria column it is checked against
+ELIGIBILITY_CRITERIA = {
+    "Sector": "Eligible_Sectors",
+    "Category": "Target_Category",
+    "Location_Type": "Location_Criteria",
+}
+
+
+def parse_scheme_criteria(scheme_df: pd.DataFrame) -> dict[str, list[set[str]]]:
+    """
+    Parse every scheme's comma-separated criteria exactly once.
+
+    Returns {msme_column: [set of allowed values per scheme]} in scheme order.
+    """
+    return {
+        msme_col: [set(parse_list_field(v)) for v in scheme_df[scheme_col]]
+        for msme_col, scheme_col in ELIGIBILITY_CRITERIA.items()
+    }
+
+
+def _criterion_lookup(values: pd.Series, allowed_per_scheme: list[set[str]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Factorize one MSME column and build its (n_values + 1) x n_schemes
+    admission mask. The extra last row only admits 'All' schemes and is what
+    missing values (factorize code -1) resolve to.
+    """
+    codes, uniques = pd.factorize(values)
+    allows_all = np.array(["All" in allowed for allowed in allowed_per_scheme], dtype=bool)
+
+    lookup = np.empty((len(uniques) + 1, len(allowed_per_scheme)), dtype=bool)
+    for u, value in enumerate(uniques):
+        lookup[u] = allows_all | np.array([value in allowed for allowed in allowed_per_scheme], dtype=bool)
+    lookup[-1] = allows_all
+    return codes, lookup
+
+
+def build_eligibility_matrix(msme_df: pd.DataFrame, scheme_df: pd.DataFrame,
+                             criteria: dict | None = None) -> np.ndarray:
+    """
+    Columnar equivalent of is_eligible() for every MSME x scheme pair.
+
+    For each criterion the distinct MSME values are factorized and a small
+    (n_values + 1) x n_schemes lookup mask is built from the parsed criteria.
+    Indexing that mask with the MSME codes broadcasts it to the full
+    n_msmes x n_schemes boolean matrix; the three criteria are AND-ed together.
+    """
+    if criteria is None:
+        criteria = parse_scheme_criteria(scheme_df)
+
+    matrix = np.ones((len(msme_df), len(scheme_df)), dtype=bool)
+    for msme_col, allowed_per_scheme in criteria.items():
+        codes, lookup = _criterion_lookup(msme_df[msme_col], allowed_per_scheme)
+        matrix &= lookup[codes]
+
+    return matrix
+
+
+def build_candidate_index(msme_df: pd.DataFrame, scheme_df: pd.DataFrame,
+                          criteria: dict | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Inverted index from each distinct (Sector, Category, Location_Type) key
+    of msme_df to the schemes that admit it.
+
+    Only the distinct keys (a few dozen, whatever the registry size) are
+    tested against the catalog, with the same per-criterion masks as
+    build_eligibility_matrix(). Returns (key_of_msme, key_indptr, key_schemes)
+    in CSR form: the schemes of key k are key_schemes[key_indptr[k]:key_indptr[k + 1]],
+    in scheme order.
+    """
+    if criteria is None:
+        criteria = parse_scheme_criteria(scheme_df)
+
+    # Pack the per-criterion codes (-1 for missing) into one integer key
+    packed = np.zeros(len(msme_df), dtype=np.int64)
+    lookups = []
+    for msme_col, allowed_per_scheme in criteria.items():
+        col_codes, lookup = _criterion_lookup(msme_df[msme_col], allowed_per_scheme)
+        packed = packed * len(lookup) + (col_codes + 1)
+        lookups.append(lookup)
+
+    key_of_msme, keys = pd.factorize(packed)
+    key_mask = np.ones((len(keys), len(scheme_df)), dtype=bool)
+    for lookup in reversed(lookups):
+        keys, codes = np.divmod(keys, len(lookup))
+        key_mask &= lookup[codes - 1]
+
+    key_indptr = np.concatenate(([0], np.cumsum(key_mask.sum(axis=1))))
+    return key_of_msme, key_indptr, np.nonzero(key_mask)[1]
+
+
+def eligible_pairs(msme_df: pd.DataFrame, scheme_df: pd.DataFrame,
+                   criteria: dict | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (pair_msme, pair_scheme) positions of every eligible MSME-scheme pair,
+    MSME-major and in scheme order within an MSME (the np.nonzero order of
+    build_eligibility_matrix()), expanded from build_candidate_index()
+    without materializing the n_msmes x n_schemes matrix. The third value
+    is each MSME's index key: MSMEs with the same key have the same schemes.
+    """
+    key_of_msme, key_indptr, key_schemes = build_candidate_index(msme_df, scheme_df, criteria)
+    counts = np.diff(key_indptr)[key_of_msme]
+    pair_msme = np.repeat(np.arange(len(msme_df)), counts)
+    offset = np.arange(len(pair_msme)) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_scheme = key_schemes[np.repeat(key_indptr[:-1][key_of_msme], counts) + offset]
+    return pair_msme, pair_scheme, key_of_msme
+
+
 # ---------------------------------------------------------------------------
 # 3. IMPACT SIMULATION (single scheme)
 # ---------------------------------------------------------------------------
@@ -164,6 +306,9 @@ def simulate_combined_schemes(msme: pd.Series, eligible_schemes: pd.DataFrame) -
     running_revenue = annual_revenue_original
     total_subsidy = 0.0
     total_new_jobs = 0
+    total_factor_rev = 0.0
+    total_factor_emp = 0.0
+    total_max_subsidy = 0.0
     scheme_ids = []
     scheme_names = []
 
@@ -181,6 +326,9 @@ def simulate_combined_schemes(msme: pd.Series, eligible_schemes: pd.DataFrame) -
         new_jobs = round(num_employees_original * (impact_factor_emp / 100))
         total_new_jobs += new_jobs
 
+        total_factor_rev += impact_factor_rev
+        total_factor_emp += impact_factor_emp
+        total_max_subsidy += max_subsidy
         scheme_ids.append(scheme["Scheme_ID"])
         scheme_names.append(scheme["Scheme_Name"])
 
@@ -201,9 +349,9 @@ def simulate_combined_schemes(msme: pd.Series, eligible_schemes: pd.DataFrame) -
         "Before_Annual_Revenue": round(annual_revenue_original, 2),
         "Before_Employees": num_employees_original,
         # Impact factors (combined)
-        "Impact_Factor_Revenue": round(sum(float(s["Impact_Factor_Revenue"]) for _, s in eligible_schemes.iterrows()), 4),
-        "Impact_Factor_Employment": round(sum(float(s["Impact_Factor_Employment"]) for _, s in eligible_schemes.iterrows()), 4),
-        "Max_Subsidy_Amount": sum(float(s["Max_Subsidy_Amount"]) for _, s in eligible_schemes.iterrows()),
+        "Impact_Factor_Revenue": round(total_factor_rev, 4),
+        "Impact_Factor_Employment": round(total_factor_emp, 4),
+        "Max_Subsidy_Amount": total_max_subsidy,
         # Calculated
         "Subsidy_Applied": round(total_subsidy, 2),
         "New_Jobs_Added": total_new_jobs,
@@ -217,51 +365,366 @@ def simulate_combined_schemes(msme: pd.Series, eligible_schemes: pd.DataFrame) -
 
 
 # ---------------------------------------------------------------------------
-# 5. RUN FULL SIMULATION OVER ALL MSMEs
+# 5. BATCHED IMPACT SIMULATION (all MSME-scheme pairs at once)
+# ---------------------------------------------------------------------------
+
+RESULT_COLUMNS = [
+    "MSME_ID", "Sector", "Category", "Location_Type",
+    "Scheme_ID", "Scheme_Name", "Simulation_Type",
+    "Before_Annual_Revenue", "Before_Employees",
+    "Impact_Factor_Revenue", "Impact_Factor_Employment", "Max_Subsidy_Amount",
+    "Subsidy_Applied", "New_Jobs_Added",
+    "Projected_Revenue", "Projected_Employees",
+    "Revenue_Increase_Pct", "Employment_Increase_Pct",
+]
+
+
+def _safe_pct(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator * 100, or 0.0 where the denominator is not positive."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = numerator / denominator * 100
+    return np.where(denominator > 0, pct, 0.0)
+
+
+def simulate_single_arrays(revenue: np.ndarray, employees: np.ndarray,
+                           rev_factor: np.ndarray, emp_factor: np.ndarray,
+                           max_subsidy: np.ndarray) -> dict:
+    """
+    Array form of simulate_single_scheme(). All inputs are aligned per
+    MSME-scheme pair; returns the calculated (rounded) output columns.
+    """
+    subsidy = np.minimum(revenue * rev_factor, max_subsidy)
+    new_jobs = np.rint(employees * (emp_factor / 100)).astype(np.int64)
+
+    return {
+        "Subsidy_Applied": np.round(subsidy, 2),
+        "New_Jobs_Added": new_jobs,
+        "Projected_Revenue": np.round(revenue + subsidy, 2),
+        "Projected_Employees": employees + new_jobs,
+        "Revenue_Increase_Pct": np.round(_safe_pct(subsidy, revenue), 4),
+        "Employment_Increase_Pct": np.round(_safe_pct(new_jobs, employees), 4),
+    }
+
+
+def simulate_combined_arrays(revenue: np.ndarray, employees: np.ndarray,
+                             scheme_positions: np.ndarray,
+                             rev_factor: np.ndarray, emp_factor: np.ndarray,
+                             max_subsidy: np.ndarray) -> dict:
+    """
+    Array form of simulate_combined_schemes() for MSMEs eligible for ≥ 2 schemes.
+
+    scheme_positions is an (n_msmes, max_schemes) matrix of scheme indices in
+    scheme order, padded with -1. Revenue compounding walks the positions
+    left to right so every MSME sees exactly the same sequence of floating
+    point operations as the per-row loop.
+    """
+    running = revenue.astype(np.float64)
+    total_subsidy = np.zeros(len(revenue))
+    total_jobs = np.zeros(len(revenue), dtype=np.int64)
+
+    for k in range(scheme_positions.shape[1]):
+        sch = scheme_positions[:, k]
+        active = sch >= 0
+        sch = np.where(active, sch, 0)
+
+        subsidy = np.minimum(running * rev_factor[sch], max_subsidy[sch])
+        running = np.where(active, running + subsidy, running)
+        total_subsidy = np.where(active, total_subsidy + subsidy, total_subsidy)
+        jobs = np.rint(employees * (emp_factor[sch] / 100)).astype(np.int64)
+        total_jobs += np.where(active, jobs, 0)
+
+    return {
+        "Subsidy_Applied": np.round(total_subsidy, 2),
+        "New_Jobs_Added": total_jobs,
+        "Projected_Revenue": np.round(running, 2),
+        "Projected_Employees": employees + total_jobs,
+        "Revenue_Increase_Pct": np.round(_safe_pct(running - revenue, revenue), 4),
+        "Employment_Increase_Pct": np.round(_safe_pct(total_jobs, employees), 4),
+    }
+
+
+def simulate_all(msme_df: pd.DataFrame, scheme_df: pd.DataFrame, pair_msme: np.ndarray,
+                 pair_scheme: np.ndarray, key_of_msme: np.ndarray | None = None) -> pd.DataFrame:
+    """
+    Simulate every eligible MSME-scheme pair (from eligible_pairs()) plus the
+    combined row of each multi-scheme MSME in one pass, without building
+    per-row dicts. key_of_msme, when given, groups MSMEs with identical
+    scheme lists so their stacked-scheme fields are not searched for.
+
+    Rows come out in the same order as the legacy loop: for each MSME its
+    single-scheme rows in scheme order, followed by its combined row.
+    """
+    revenue = msme_df["Annual_Revenue"].to_numpy(dtype=np.float64)
+    employees = msme_df["Number_of_Employees"].to_numpy(dtype=np.int64)
+    rev_factor = scheme_df["Impact_Factor_Revenue"].to_numpy(dtype=np.float64)
+    emp_factor = scheme_df["Impact_Factor_Employment"].to_numpy(dtype=np.float64)
+    max_subsidy = scheme_df["Max_Subsidy_Amount"].to_numpy(dtype=np.float64)
+
+    counts = np.bincount(pair_msme, minlength=len(msme_df))
+    multi = np.flatnonzero(counts >= 2)
+
+    # Output row slots: each MSME owns count (+1 if combined) consecutive rows
+    rows_per_msme = counts + (counts >= 2)
+    row_start = np.concatenate(([0], np.cumsum(rows_per_msme)[:-1]))
+    pair_start = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    single_slots = row_start[pair_msme] + (np.arange(len(pair_msme)) - pair_start[pair_msme])
+    combined_slots = row_start[multi] + counts[multi]
+    n_rows = int(rows_per_msme.sum())
+
+    if n_rows == 0:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    single = simulate_single_arrays(
+        revenue[pair_msme], employees[pair_msme],
+        rev_factor[pair_scheme], emp_factor[pair_scheme], max_subsidy[pair_scheme],
+    )
+
+    # Padded scheme positions of the multi-scheme MSMEs for the compounding walk
+    max_count = int(counts.max())
+    multi_row = np.full(len(msme_df), -1, dtype=np.int64)
+    multi_row[multi] = np.arange(len(multi))
+    in_multi = counts[pair_msme] >= 2
+    positions = np.full((len(multi), max_count), -1, dtype=np.int64)
+    positions[multi_row[pair_msme[in_multi]], (np.arange(len(pair_msme)) - pair_start[pair_msme])[in_multi]] = \
+        pair_scheme[in_multi]
+    combined = simulate_combined_arrays(
+        revenue[multi], employees[multi], positions,
+        rev_factor, emp_factor, max_subsidy,
+    )
+
+    # Scheme-level combined fields depend only on the eligibility pattern, so
+    # compute them once per distinct pattern with the same scalar arithmetic
+    # as simulate_combined_schemes().
+    if key_of_msme is not None:
+        pattern_of = pd.factorize(key_of_msme[multi])[0]
+        first = np.unique(pattern_of, return_index=True)[1]
+        patterns = positions[first]
+    else:
+        patterns, pattern_of = np.unique(positions, axis=0, return_inverse=True)
+        pattern_of = pattern_of.reshape(-1)
+    ids = scheme_df["Scheme_ID"].tolist()
+    names = scheme_df["Scheme_Name"].tolist()
+    pattern_fields = []
+    for pattern in patterns:
+        members = [int(j) for j in pattern if j >= 0]
+        pattern_fields.append((
+            " + ".join(ids[j] for j in members),
+            " + ".join(names[j] for j in members),
+            round(sum(float(rev_factor[j]) for j in members), 4),
+            round(sum(float(emp_factor[j]) for j in members), 4),
+            sum(float(max_subsidy[j]) for j in members),
+        ))
+
+    def scatter(single_values, combined_values, dtype):
+        out = np.empty(n_rows, dtype=dtype)
+        out[single_slots] = single_values
+        out[combined_slots] = combined_values
+        return out
+
+    def pattern_column(field):
+        values = [fields[field] for fields in pattern_fields]
+        return np.array(values, dtype=object)[pattern_of] if len(multi) else np.array([], dtype=object)
+
+    msme_of_row = scatter(pair_msme, multi, np.int64)
+    columns = {
+        col: msme_df[col].to_numpy()[msme_of_row]
+        for col in ["MSME_ID", "Sector", "Category", "Location_Type"]
+    }
+    columns["Scheme_ID"] = scatter(np.array(ids, dtype=object)[pair_scheme], pattern_column(0), object)
+    columns["Scheme_Name"] = scatter(np.array(names, dtype=object)[pair_scheme], pattern_column(1), object)
+    columns["Simulation_Type"] = scatter("Single_Scheme", "Combined_Multi_Scheme", object)
+    columns["Before_Annual_Revenue"] = np.round(revenue[msme_of_row], 2)
+    columns["Before_Employees"] = employees[msme_of_row]
+    columns["Impact_Factor_Revenue"] = scatter(rev_factor[pair_scheme], pattern_column(2), np.float64)
+    columns["Impact_Factor_Employment"] = scatter(emp_factor[pair_scheme], pattern_column(3), np.float64)
+    columns["Max_Subsidy_Amount"] = scatter(max_subsidy[pair_scheme], pattern_column(4), np.float64)
+    for col, values in single.items():
+        columns[col] = scatter(values, combined[col], values.dtype)
+
+    return pd.DataFrame(columns, columns=RESULT_COLUMNS)
+
+
+# ---------------------------------------------------------------------------
+# 6. RUN FULL SIMULATION OVER ALL MSMEs
 # ---------------------------------------------------------------------------
 
-def run_simulation(msme_df: pd.DataFrame, scheme_df: pd.DataFrame) -> pd.DataFrame:
+def print_eligibility_distribution(eligibility_hist: dict) -> None:
+    print(f"Eligibility distribution (# schemes per MSME):")
+    for k in sorted(eligibility_hist):
+        print(f"  Eligible for {k} scheme(s): {eligibility_hist[k]} MSMEs")
+
+
+def simulate_chunk(msme_df: pd.DataFrame, scheme_df: pd.DataFrame,
+                   criteria: dict | None = None) -> tuple[pd.DataFrame, list]:
+    """Eligibility + impact simulation for one block of MSMEs (no printing)."""
+    pair_msme, pair_scheme, key_of_msme = eligible_pairs(msme_df, scheme_df, criteria)
+    results_df = simulate_all(msme_df, scheme_df, pair_msme, pair_scheme, key_of_msme)
+    return results_df, np.bincount(pair_msme, minlength=len(msme_df)).tolist()
+
+
+def shard_by_msme_range(msme_df: pd.DataFrame, n_shards: int) -> list[pd.DataFrame]:
+    """
+    Split MSMEs into n_shards contiguous MSME_ID ranges (row blocks in file
+    order), so concatenating shard results reproduces the original row order.
+    """
+    bounds = np.linspace(0, len(msme_df), n_shards + 1).astype(int)
+    return [msme_df.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+def simulate_in_order(msme_chunks, scheme_df: pd.DataFrame, workers: int = 1):
+    """
+    Yield simulate_chunk() results for each MSME chunk, in input order.
+
+    With workers > 1 the chunks are simulated in a process pool; at most
+    2 x workers chunks are in flight so a streamed input is never read
+    ahead without bound.
+    """
+    criteria = parse_scheme_criteria(scheme_df)
+    if workers <= 1:
+        for msme_chunk in msme_chunks:
+            yield simulate_chunk(msme_chunk, scheme_df, criteria)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for msme_chunk in msme_chunks:
+            pending.append(pool.submit(simulate_chunk, msme_chunk, scheme_df, criteria))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_simulation(msme_df: pd.DataFrame, scheme_df: pd.DataFrame, workers: int = 1) -> pd.DataFrame:
     """
     For every MSME:
       - Determine which schemes it is eligible for
       - Simulate impact for each eligible scheme individually
       - Simulate combined impact if eligible for ≥ 2 schemes
     Returns a DataFrame of all simulation rows.
+
+    With workers > 1 the MSMEs are sharded by MSME_ID range across a process
+    pool and the shard results are merged back in original order.
     """
-    all_rows = []
-    eligibility_counts = []
+    if workers > 1:
+        shards = shard_by_msme_range(msme_df, workers)
+        parts = list(simulate_in_order(shards, scheme_df, len(shards)))
+        results_df = pd.concat([r for r, _ in parts], ignore_index=True)
+        eligibility_counts = [c for _, counts in parts for c in counts]
+    else:
+        results_df, eligibility_counts = simulate_chunk(msme_df, scheme_df)
+
+    print_eligibility_distribution(pd.Series(eligibility_counts).value_counts().to_dict())
+    return results_df, eligibility_counts
 
-    for _, msme in msme_df.iterrows():
-        eligible = get_eligible_schemes(msme, scheme_df)
-        eligibility_counts.append(len(eligible))
 
-        # Single-scheme rows
-        for _, scheme in eligible.iterrows():
-            row = simulate_single_scheme(msme, scheme)
-            all_rows.append(row)
+def run_streaming_simulation(scheme_df: pd.DataFrame, chunk_size: int, workers: int = 1,
+                             fmt: str | None = None) -> "Phase3Summary":
+    """
+    Bounded-memory variant of run_simulation() for registries larger than RAM.
 
-        # Combined multi-scheme row
-        if len(eligible) >= 2:
-            combined_row = simulate_combined_schemes(msme, eligible)
-            if combined_row:
-                all_rows.append(combined_row)
+    MSMEs are read chunk_size rows at a time, each chunk is simulated and
+    appended to scheme_eligibility_results straight away, and only the running report
+    aggregates are kept between chunks. The output file is identical to the
+    in-memory run.
+    """
+    summary = Phase3Summary()
+    chunks = iter_msme_chunks(chunk_size, fmt)
 
-    print(f"Eligibility distribution (# schemes per MSME):")
-    counts = pd.Series(eligibility_counts).value_counts().sort_index()
-    for k, v in counts.items():
-        print(f"  Eligible for {k} scheme(s): {v} MSMEs")
+    with TableAppender("scheme_eligibility_results", fmt) as out:
+        for results_df, eligibility_counts in simulate_in_order(chunks, scheme_df, workers):
+            out.append(results_df)
+            summary.update(results_df, eligibility_counts)
 
-    results_df = pd.DataFrame(all_rows)
-    return results_df, eligibility_counts
+        if summary.n_msmes == 0:
+            out.append(pd.DataFrame(columns=RESULT_COLUMNS))
+
+    print_eligibility_distribution(summary.eligibility_hist)
+    return summary
 
 
 # ---------------------------------------------------------------------------
-# 6. REPORTING
+# 7. REPORTING
 # ---------------------------------------------------------------------------
 
-def build_report(results_df: pd.DataFrame, eligibility_counts: list, msme_df: pd.DataFrame, scheme_df: pd.DataFrame) -> str:
+class Phase3Summary:
+    """
+    Running aggregates behind the Phase 3 report.
+
+    update() folds in one block of results at a time, so the report can be
+    built from a streamed run without keeping the results in memory. Only
+    the leading rows needed for the snapshot and spot-check sections are
+    retained.
+    """
+
+    SAMPLE_ROWS = 30
+    SPOT_CHECK_ROWS = 3
+    SINGLE_MEAN_COLS = ["Subsidy_Applied", "Revenue_Increase_Pct", "Projected_Revenue",
+                        "New_Jobs_Added", "Employment_Increase_Pct"]
+    COMBINED_MEAN_COLS = ["Subsidy_Applied", "Revenue_Increase_Pct",
+                          "New_Jobs_Added", "Employment_Increase_Pct"]
+
+    def __init__(self):
+        self.n_msmes = 0
+        self.n_rows = 0
+        self.eligibility_hist = {}
+        self.scheme_counts = {}
+
+        self.n_single = 0
+        self.single_sums = dict.fromkeys(self.SINGLE_MEAN_COLS, 0)
+        self.max_subsidy = None
+        self.min_subsidy = None
+        self.max_new_jobs = None
+
+        self.n_combined = 0
+        self.combined_sums = dict.fromkeys(self.COMBINED_MEAN_COLS, 0)
+
+        self.sample_rows = pd.DataFrame()
+        self.spot_check_rows = pd.DataFrame()
+
+    def update(self, results_df: pd.DataFrame, eligibility_counts: list) -> None:
+        self.n_msmes += len(eligibility_counts)
+        self.n_rows += len(results_df)
+        for k, v in pd.Series(eligibility_counts, dtype=np.int64).value_counts().items():
+            self.eligibility_hist[int(k)] = self.eligibility_hist.get(int(k), 0) + int(v)
+
+        if len(self.sample_rows) < self.SAMPLE_ROWS:
+            self.sample_rows = pd.concat([self.sample_rows, results_df.head(self.SAMPLE_ROWS)]).head(self.SAMPLE_ROWS)
+
+        single = results_df[results_df["Simulation_Type"] == "Single_Scheme"]
+        if len(single) > 0:
+            for scheme_id, cnt in single["Scheme_ID"].value_counts().items():
+                self.scheme_counts[scheme_id] = self.scheme_counts.get(scheme_id, 0) + int(cnt)
+            self.n_single += len(single)
+            for col in self.SINGLE_MEAN_COLS:
+                self.single_sums[col] += single[col].sum()
+            self.max_subsidy = _running(max, self.max_subsidy, single["Subsidy_Applied"].max())
+            self.min_subsidy = _running(min, self.min_subsidy, single["Subsidy_Applied"].min())
+            self.max_new_jobs = _running(max, self.max_new_jobs, single["New_Jobs_Added"].max())
+            if len(self.spot_check_rows) < self.SPOT_CHECK_ROWS:
+                self.spot_check_rows = pd.concat([self.spot_check_rows, single.head(self.SPOT_CHECK_ROWS)]).head(self.SPOT_CHECK_ROWS)
+
+        combined = results_df[results_df["Simulation_Type"] == "Combined_Multi_Scheme"]
+        if len(combined) > 0:
+            self.n_combined += len(combined)
+            for col in self.COMBINED_MEAN_COLS:
+                self.combined_sums[col] += combined[col].sum()
+
+    def single_mean(self, col: str) -> float:
+        return self.single_sums[col] / self.n_single
+
+    def combined_mean(self, col: str) -> float:
+        return self.combined_sums[col] / self.n_combined
+
+
+def _running(fn, current, value):
+    return value if current is None else fn(current, value)
+
+
+def build_report(summary: Phase3Summary, scheme_df: pd.DataFrame) -> str:
     lines = []
     add = lines.append
+    hist = summary.eligibility_hist
 
     add("=" * 70)
     add("PHASE 3: SCHEME ELIGIBILITY AND IMPACT SIMULATION REPORT")
@@ -271,58 +734,53 @@ def build_report(results_df: pd.DataFrame, eligibility_counts: list, msme_df: pd
     # --- Eligibility Summary ---
     add("1. ELIGIBILITY SUMMARY")
     add("-" * 40)
-    counts_series = pd.Series(eligibility_counts)
-    add(f"Total MSMEs analyzed          : {len(msme_df)}")
+    add(f"Total MSMEs analyzed          : {summary.n_msmes}")
     add(f"Total schemes available       : {len(scheme_df)}")
-    add(f"MSMEs eligible for 0 schemes  : {(counts_series == 0).sum()}")
-    add(f"MSMEs eligible for 1 scheme   : {(counts_series == 1).sum()}")
-    add(f"MSMEs eligible for ≥2 schemes : {(counts_series >= 2).sum()}")
-    add(f"Max schemes for one MSME      : {counts_series.max()}")
+    add(f"MSMEs eligible for 0 schemes  : {hist.get(0, 0)}")
+    add(f"MSMEs eligible for 1 scheme   : {hist.get(1, 0)}")
+    add(f"MSMEs eligible for ≥2 schemes : {sum(v for k, v in hist.items() if k >= 2)}")
+    add(f"Max schemes for one MSME      : {max(hist) if hist else 0}")
     add("")
 
     # Per-scheme eligibility count
     add("Per-Scheme Eligibility Count:")
-    single = results_df[results_df["Simulation_Type"] == "Single_Scheme"]
-    scheme_counts = single["Scheme_ID"].value_counts().sort_index()
-    for scheme_id, cnt in scheme_counts.items():
-        name = scheme_df.loc[scheme_df["Scheme_ID"] == scheme_id, "Scheme_Name"].values[0]
-        add(f"  {scheme_id} ({name}): {cnt} MSMEs")
+    scheme_names = dict(zip(scheme_df["Scheme_ID"], scheme_df["Scheme_Name"]))
+    for scheme_id in sorted(summary.scheme_counts):
+        add(f"  {scheme_id} ({scheme_names[scheme_id]}): {summary.scheme_counts[scheme_id]} MSMEs")
     add("")
 
     # --- Revenue Impact Summary ---
     add("2. REVENUE IMPACT SIMULATION (Single-Scheme Rows)")
     add("-" * 40)
-    if len(single) > 0:
-        add(f"Total single-scheme impact rows : {len(single)}")
-        add(f"Avg Subsidy Applied             : ₹{single['Subsidy_Applied'].mean():,.2f}")
-        add(f"Avg Revenue Increase            : {single['Revenue_Increase_Pct'].mean():.2f}%")
-        add(f"Max Subsidy Applied             : ₹{single['Subsidy_Applied'].max():,.2f}")
-        add(f"Min Subsidy Applied             : ₹{single['Subsidy_Applied'].min():,.2f}")
-        add(f"Avg Projected Revenue           : ₹{single['Projected_Revenue'].mean():,.2f}")
+    if summary.n_single > 0:
+        add(f"Total single-scheme impact rows : {summary.n_single}")
+        add(f"Avg Subsidy Applied             : ₹{summary.single_mean('Subsidy_Applied'):,.2f}")
+        add(f"Avg Revenue Increase            : {summary.single_mean('Revenue_Increase_Pct'):.2f}%")
+        add(f"Max Subsidy Applied             : ₹{summary.max_subsidy:,.2f}")
+        add(f"Min Subsidy Applied             : ₹{summary.min_subsidy:,.2f}")
+        add(f"Avg Projected Revenue           : ₹{summary.single_mean('Projected_Revenue'):,.2f}")
     add("")
 
     # --- Employment Impact Summary ---
     add("3. EMPLOYMENT IMPACT SIMULATION (Single-Scheme Rows)")
     add("-" * 40)
-    if len(single) > 0:
-        add(f"Total New Jobs Created (all single rows) : {single['New_Jobs_Added'].sum():,}")
-        add(f"Avg New Jobs per Eligible MSME-Scheme    : {single['New_Jobs_Added'].mean():.2f}")
-        add(f"Avg Employment Increase                  : {single['Employment_Increase_Pct'].mean():.2f}%")
-        add(f"Max New Jobs (single scheme)             : {single['New_Jobs_Added'].max():,}")
+    if summary.n_single > 0:
+        add(f"Total New Jobs Created (all single rows) : {summary.single_sums['New_Jobs_Added']:,}")
+        add(f"Avg New Jobs per Eligible MSME-Scheme    : {summary.single_mean('New_Jobs_Added'):.2f}")
+        add(f"Avg Employment Increase                  : {summary.single_mean('Employment_Increase_Pct'):.2f}%")
+        add(f"Max New Jobs (single scheme)             : {summary.max_new_jobs:,}")
     add("")
 
     # --- Multi-Scheme Summary ---
-    combined = results_df[results_df["Simulation_Type"] == "Combined_Multi_Scheme"]
     add("4. MULTI-SCHEME COMBINED IMPACT")
     add("-" * 40)
-    add(f"MSMEs with combined simulation rows     : {len(combined)}")
-    if len(combined) > 0:
-        add(f"Avg Combined Subsidy Applied            : ₹{combined['Subsidy_Applied'].mean():,.2f}")
-        add(f"Avg Combined Revenue Increase           : {combined['Revenue_Increase_Pct'].mean():.2f}%")
-        add(f"Avg Combined New Jobs Added             : {combined['New_Jobs_Added'].mean():.2f}")
-        add(f"Avg Combined Employment Increase        : {combined['Employment_Increase_Pct'].mean():.2f}%")
+    add(f"MSMEs with combined simulation rows     : {summary.n_combined}")
+    if summary.n_combined > 0:
+        add(f"Avg Combined Subsidy Applied            : ₹{summary.combined_mean('Subsidy_Applied'):,.2f}")
+        add(f"Avg Combined Revenue Increase           : {summary.combined_mean('Revenue_Increase_Pct'):.2f}%")
+        add(f"Avg Combined New Jobs Added             : {summary.combined_mean('New_Jobs_Added'):.2f}")
+        add(f"Avg Combined Employment Increase        : {summary.combined_mean('Employment_Increase_Pct'):.2f}%")
     add("")
-
     # --- Before vs After Projection Snapshot ---
     add("5. BEFORE vs AFTER PROJECTION SNAPSHOT (10 Sample MSMEs)")
     add("-" * 70)
@@ -334,7 +792,7 @@ def build_report(results_df: pd.DataFrame, eligibility_counts: list, msme_df: pd
     add(header)
     add("-" * 70)
 
-    sample = results_df.head(30)  # first 30 rows for display
+    sample = summary.sample_rows  # first 30 rows for display
     seen_msme = set()
     count = 0
     for _, row in sample.iterrows():
@@ -356,7 +814,7 @@ def build_report(results_df: pd.DataFrame, eligibility_counts: list, msme_df: pd
     # --- Mathematical Verification ---
     add("6. MATHEMATICAL VERIFICATION (Spot-Check)")
     add("-" * 40)
-    check_rows = results_df[results_df["Simulation_Type"] == "Single_Scheme"].head(3)
+    check_rows = summary.spot_check_rows
     for _, r in check_rows.iterrows():
         expected_subsidy = min(r["Before_Annual_Revenue"] * r["Impact_Factor_Revenue"], r["Max_Subsidy_Amount"])
         expected_rev = r["Before_Annual_Revenue"] + expected_subsidy
@@ -379,31 +837,68 @@ def build_report(results_df: pd.DataFrame, eligibility_counts: list, msme_df: pd
 
 
 # ---------------------------------------------------------------------------
-# 7. MAIN
+# 8. MAIN
 # ---------------------------------------------------------------------------
 
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Phase 3: Scheme Eligibility and Impact Simulation"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=0,
+        help="Stream msme_data in chunks of this many MSMEs and append results "
+             "to the output file incrementally (bounded memory). Default: load everything."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of worker processes. MSMEs are sharded by MSME_ID range and "
+             "merged back in original order. Default: 1 (single process)."
+    )
+    parser.add_argument(
+        "--storage-format", choices=list(FORMATS), default=None,
+        help="Format of the data/ tables read and written (default: CHAOSZEN_STORAGE_FORMAT or csv)."
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+
     print("=" * 60)
     print("PHASE 3: Scheme Eligibility and Impact Simulation")
     print("=" * 60)
     print()
 
-    # Load data
-    msme_df, scheme_df = load_data()
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    fmt = args.storage_format
+    output_path = table_path("scheme_eligibility_results", fmt)
 
-    # Run simulation
-    print("Running eligibility checks and impact simulations...")
-    results_df, eligibility_counts = run_simulation(msme_df, scheme_df)
-    print()
+    if args.chunk_size > 0:
+        scheme_df = load_schemes(fmt)
+        print(f"Streaming MSMEs in chunks of {args.chunk_size:,}...")
+        summary = run_streaming_simulation(scheme_df, args.chunk_size, args.workers, fmt)
+        print(f"Simulated {summary.n_msmes} MSME records.")
+        print()
+    else:
+        # Load data
+        msme_df, scheme_df = load_data(fmt)
 
-    # Save results CSV
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    output_csv = os.path.join(base_dir, "data", "scheme_eligibility_results.csv")
-    results_df.to_csv(output_csv, index=False)
-    print(f"Results saved to '{output_csv}' ({len(results_df)} rows).")
+        # Run simulation
+        print("Running eligibility checks and impact simulations...")
+        results_df, eligibility_counts = run_simulation(msme_df, scheme_df, args.workers)
+        print()
+
+        # Save results CSV
+        write_table(results_df, "scheme_eligibility_results", fmt)
+
+        summary = Phase3Summary()
+        summary.update(results_df, eligibility_counts)
+
+    print(f"Results saved to '{output_path}' ({summary.n_rows} rows).")
+    print(f"Per-MSME index saved to '{build_index('scheme_eligibility_results', fmt)}'.")
 
     # Build and save report
-    report = build_report(results_df, eligibility_counts, msme_df, scheme_df)
+    report = build_report(summary, scheme_df)
     print()
     print(report)
 
@@ -413,16 +908,14 @@ def main():
     print(f"\nEvaluation report saved to '{report_path}'.")
 
     # Quick summary printout
-    single_rows = results_df[results_df["Simulation_Type"] == "Single_Scheme"]
-    combined_rows = results_df[results_df["Simulation_Type"] == "Combined_Multi_Scheme"]
-    total_jobs = single_rows["New_Jobs_Added"].sum()
-    total_subsidy = single_rows["Subsidy_Applied"].sum()
+    total_jobs = summary.single_sums["New_Jobs_Added"]
+    total_subsidy = summary.single_sums["Subsidy_Applied"]
 
     print("\n" + "=" * 60)
     print("SUMMARY")
     print("=" * 60)
-    print(f"  Single-scheme impact rows : {len(single_rows)}")
-    print(f"  Combined impact rows      : {len(combined_rows)}")
+    print(f"  Single-scheme impact rows : {summary.n_single}")
+    print(f"  Combined impact rows      : {summary.n_combined}")
     print(f"  Total subsidy modeled     : ₹{total_subsidy:,.2f}")
     print(f"  Total new jobs modeled    : {total_jobs:,}")
     print("=" * 60)
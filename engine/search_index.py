@@ -0,0 +1,131 @@
+"""
+MSME Search Index
+=================
+Sidecar index over msme_predictions.csv (same path plus ".search") that
+backend/server.js loads once to answer GET /api/search without scanning
+the predictions. Built at the end of growth_model.py, and by any run that
+rewrites msme_predictions (--score-only, growth_inference.py).
+
+It holds:
+
+  - an MSME_ID prefix index: the lower-cased IDs, their part after the
+    last "_", and that part without leading zeros (so "msme_00", "0042"
+    and "42" all find MSME_0042), sorted, with the row of each key; a
+    prefix is one binary-searched key range (a flattened trie)
+  - postings for Sector, Location_Type and Predicted_Growth_Category: one
+    code per row, and each value's rows both in file order and as ranks in
+    the Growth_Score order
+  - the Growth_Score order (rows by descending score, ties in file order)
+    and each row's rank in it
+  - the CSV byte offset of every row, so a page of hits is read directly
+
+File layout (little-endian): magic "CZSX", version u16, reserved u16,
+header length u32, a JSON header (fields, value lists, the size and
+mtime_ns of the indexed CSV, and the offset, dtype and length of each
+array), then the arrays, each 8-byte aligned. Readers treat the index as
+stale when the CSV's size or mtime differs, so a same-size rewrite is
+caught.
+
+Usage:
+    python engine/search_index.py       # rebuild for the current msme_predictions.csv
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from storage import csv_row_offsets, read_table, resolve_format, table_path
+
+PREDICTIONS_TABLE = "msme_predictions"
+SEARCH_FIELDS = ["Sector", "Location_Type", "Predicted_Growth_Category"]
+MAGIC = b"CZSX"
+VERSION = 3
+PREAMBLE = struct.Struct("<4sHHI")
+
+
+def search_index_path(name: str = PREDICTIONS_TABLE) -> str:
+    return table_path(name, "csv") + ".search"
+
+
+def _id_keys(ids: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sorted prefix keys, the row of each key, and each row's (id, tail, number) key positions."""
+    n = len(ids)
+    lowered = np.char.lower(ids.astype(str))
+    tails = np.char.rpartition(lowered, "_")[:, 2]
+    numbers = np.char.lstrip(tails, "0")
+    numbers = np.where(np.char.str_len(numbers) > 0, numbers, tails)
+    keys = np.concatenate((lowered, tails, numbers)).astype(bytes)
+    key_row = np.tile(np.arange(n), 3)
+
+    order = np.argsort(keys, kind="stable")
+    position = np.empty(3 * n, dtype=np.uint32)
+    position[order] = np.arange(3 * n, dtype=np.uint32)
+    return keys[order], key_row[order].astype(np.uint32), position.reshape(3, n).T.copy()
+
+
+def build_search_index(name: str = PREDICTIONS_TABLE, fmt: str | None = None) -> str | None:
+    """
+    Index predictions table `name`; returns the path written, or None when
+    the table is not CSV (the API only serves CSV tables).
+    """
+    if resolve_format(fmt) != "csv":
+        return None
+    path = table_path(name, "csv")
+    df = read_table(name, "csv", columns=["MSME_ID", "Growth_Score"] + SEARCH_FIELDS)
+    n = len(df)
+    row_offset = csv_row_offsets(path)
+    if len(row_offset) != n + 1:
+        raise ValueError(f"'{path}' has rows spanning several lines; cannot index it.")
+
+    score_order = np.argsort(-df["Growth_Score"].to_numpy(dtype=float), kind="stable").astype(np.uint32)
+    score_rank = np.empty(n, dtype=np.uint32)
+    score_rank[score_order] = np.arange(n, dtype=np.uint32)
+
+    keys, key_row, row_keys = _id_keys(df["MSME_ID"].to_numpy())
+    arrays = {
+        "row_offset": row_offset.astype(np.uint64),
+        "score_order": score_order,
+        "score_rank": score_rank,
+        "id_keys": keys,
+        "id_key_row": key_row,
+        "row_keys": row_keys,
+    }
+
+    fields = {}
+    for field in SEARCH_FIELDS:
+        codes, values = df[field].astype(str).factorize(sort=True)
+        by_value = np.argsort(codes, kind="stable")
+        indptr = np.r_[0, np.cumsum(np.bincount(codes, minlength=len(values)))].astype(np.uint32)
+        ranks = score_rank[by_value]
+        for v in range(len(values)):
+            ranks[indptr[v]:indptr[v + 1]].sort()
+        arrays[f"{field}.codes"] = codes.astype(np.uint16)
+        arrays[f"{field}.indptr"] = indptr
+        arrays[f"{field}.rows"] = by_value.astype(np.uint32)
+        arrays[f"{field}.ranks"] = ranks
+        fields[field] = list(values)
+
+    # mtime_ns as a string: JSON numbers past 2**53 lose digits in JavaScript
+    header = {"rows": n, "data_size": int(row_offset[-1]), "data_mtime_ns": str(os.stat(path).st_mtime_ns),
+              "key_width": keys.dtype.itemsize, "fields": fields, "arrays": {}}
+    offset = 0
+    for key, array in arrays.items():
+        header["arrays"][key] = {"offset": offset, "dtype": array.dtype.str, "length": int(array.size)}
+        offset += -(-array.nbytes // 8) * 8
+
+    blob = json.dumps(header).encode()
+    blob += b" " * (-(PREAMBLE.size + len(blob)) % 8)
+    out = search_index_path(name)
+    with open(out, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, 0, len(blob)))
+        f.write(blob)
+        for array in arrays.values():
+            data = array.tobytes()
+            f.write(data + b"\0" * (-len(data) % 8))
+    return out
+
+
+if __name__ == "__main__":
+    print(f"Search index saved to '{build_search_index()}'")
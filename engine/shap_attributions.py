@@ -0,0 +1,319 @@
+"""
+Phase 2: Precomputed SHAP Attribution Store
+===========================================
+Computes SHAP values of every MSME's Growth_Score once, in batch, so the
+advisory screens can explain a prediction with a dictionary lookup instead
+of running an explainer per request.
+
+Attributions are exact path-dependent TreeSHAP values, the same definition
+shap.TreeExplainer(model) uses by default, computed directly from the fitted
+forest in model_artifacts/growth_model.pkl (the shap package is not needed).
+Per leaf, the TreeSHAP sum over feature subsets reduces to a polynomial in
+the path's "one fractions" (does the row satisfy the path's splits on the
+feature) and "zero fractions" (share of training cover that follows them),
+which is evaluated for a whole batch of rows at once.
+
+Growth_Score = 50 * P(Moderate) + 100 * P(High) is linear in the class
+probabilities, so its SHAP values are the same combination of the per-class
+values, and for every MSME
+
+    SHAP_Base + sum of SHAP_<feature> columns = Growth_Score.
+
+One-hot columns are summed back into their categorical feature. The store
+(data/shap_attributions, parquet by default) keeps one float32 column per
+feature keyed by MSME_ID, plus the top-k reasons (feature and impact) by
+absolute contribution.
+
+Usage:
+    python shap_attributions.py                          # all MSMEs, top 3 reasons
+    python shap_attributions.py --workers 4 --top-k 5
+
+    from shap_attributions import AttributionStore
+    store = AttributionStore()
+    store.explain("MSME_0001")   # {'Growth_Score': ..., 'base': ..., 'contributions': {...}, 'reasons': [...]}
+"""
+
+import argparse
+import os
+import pickle
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import factorial
+
+import numpy as np
+import pandas as pd
+
+from growth_inference import GROWTH_SCORE_WEIGHTS, PIPELINE_MODEL_PATH
+from storage import FORMATS, TableAppender, iter_table_chunks, read_table
+
+ATTRIBUTIONS_TABLE = "shap_attributions"
+DEFAULT_FORMAT = "parquet"
+DEFAULT_TOP_K = 3
+DEFAULT_CHUNK_SIZE = 2048
+
+
+# ---------------------------------------------------------------------------
+# 1. TREE SHAP
+# ---------------------------------------------------------------------------
+
+def _shapley_weights(d: int) -> np.ndarray:
+    """w[k] = k! (d - k - 1)! / d!, the weight of a size-k coalition among d players."""
+    return np.array([factorial(k) * factorial(d - k - 1) / factorial(d) for k in range(d)])
+
+
+def _leaf_contribution(phi, z, ones, features, value):
+    """
+    Add one leaf's share of every path feature's SHAP value to phi.
+
+    For path features D with zero fractions z_j and one fractions o_j (0/1
+    per row), the leaf contributes to feature i
+
+        value * (o_i - z_i) * sum_k w[k] * e_k(i),
+
+    where e_k(i) is the t^k coefficient of prod_{j != i} (z_j + o_j t).
+    The full product is built once and each factor divided back out.
+    """
+    d = len(features)
+    n = ones.shape[1]
+    poly = np.zeros((n, d + 1))
+    poly[:, 0] = 1.0
+    for j in range(d):
+        shifted = poly[:, :-1] * ones[j][:, None]
+        poly *= z[j]
+        poly[:, 1:] += shifted
+
+    # Divide out (z_i + t) for rows with o_i = 1 (top-down), z_i for o_i = 0
+    unwound = np.empty((d, n, d))
+    unwound[:, :, d - 1] = poly[None, :, d]
+    for k in range(d - 1, 0, -1):
+        unwound[:, :, k - 1] = poly[None, :, k] - z[:, None] * unwound[:, :, k]
+    unwound = np.where(ones[:, :, None] > 0, unwound, poly[None, :, :d] / z[:, None, None])
+
+    psi = unwound @ _shapley_weights(d)
+    phi[:, features] += (value * (ones - z[:, None]) * psi).T
+
+
+def tree_shap(tree, leaf_values: np.ndarray, Z: np.ndarray) -> tuple[np.ndarray, float]:
+    """
+    Path-dependent TreeSHAP of one sklearn tree for all rows of Z.
+    leaf_values holds the scalar output of every node (only leaves are used).
+    Returns (phi of shape rows x columns of Z, expected value).
+    """
+    left, right = tree.children_left, tree.children_right
+    feature, threshold = tree.feature, tree.threshold
+    cover = tree.weighted_n_node_samples
+    phi = np.zeros(Z.shape)
+    expected = 0.0
+
+    # Depth-first over root-to-leaf paths; each path keeps, per feature split
+    # on so far, its zero fraction and the rows' one fractions
+    stack = [(0, {})]
+    while stack:
+        node, path = stack.pop()
+        if left[node] == -1:
+            share = cover[node] / cover[0]
+            expected += leaf_values[node] * share
+            if path:
+                features = np.array(list(path), dtype=np.int64)
+                z = np.array([path[f][0] for f in features])
+                ones = np.array([path[f][1] for f in features], dtype=np.float64)
+                _leaf_contribution(phi, z, ones, features, leaf_values[node])
+            continue
+
+        f = feature[node]
+        goes_left = Z[:, f] <= threshold[node]
+        for child, follows in ((left[node], goes_left), (right[node], ~goes_left)):
+            zero, one = path.get(f, (1.0, True))
+            child_path = dict(path)
+            child_path[f] = (zero * cover[child] / cover[node], one & follows)
+            stack.append((child, child_path))
+    return phi, expected
+
+
+def growth_score_shap(pipeline, df: pd.DataFrame) -> tuple[np.ndarray, float]:
+    """
+    SHAP values of Growth_Score per original feature (one-hot columns summed
+    into their categorical feature) and the expected Growth_Score.
+    """
+    pre = pipeline.named_steps["preprocessor"]
+    forest = pipeline.named_steps["classifier"]
+    Z = pre.transform(df[list(pre.feature_names_in_)])
+    Z = np.asarray(Z.toarray() if hasattr(Z, "toarray") else Z, dtype=np.float32)
+
+    phi = np.zeros(Z.shape)
+    expected = 0.0
+    for est in forest.estimators_:
+        proba = est.tree_.value[:, 0, :]
+        proba = proba / np.where(proba.sum(axis=1) == 0.0, 1.0, proba.sum(axis=1))[:, None]
+        tree_phi, tree_expected = tree_shap(est.tree_, proba @ GROWTH_SCORE_WEIGHTS, Z)
+        phi += tree_phi
+        expected += tree_expected
+    n_trees = len(forest.estimators_)
+    return phi @ _column_groups(pre) / n_trees, expected / n_trees
+
+
+def _column_groups(pre) -> np.ndarray:
+    """0/1 matrix mapping transformed columns to the original features."""
+    numerical = [c for name, _, cols in pre.transformers_ if name == "num" for c in cols]
+    encoder = pre.named_transformers_["cat"]
+    widths = [1] * len(numerical) + [len(c) for c in encoder.categories_]
+    owner = np.repeat(np.arange(len(widths)), widths)
+    return (owner[:, None] == np.arange(len(widths))[None, :]).astype(np.float64)
+
+
+def original_features(pipeline) -> list[str]:
+    pre = pipeline.named_steps["preprocessor"]
+    return [c for name, _, cols in pre.transformers_ if name in ("num", "cat") for c in cols]
+
+
+# ---------------------------------------------------------------------------
+# 2. BATCH STAGE
+# ---------------------------------------------------------------------------
+
+def attribution_frame(pipeline, df: pd.DataFrame, top_k: int = DEFAULT_TOP_K) -> pd.DataFrame:
+    """MSME_ID, Growth_Score, SHAP_Base, one float32 SHAP_<feature> per feature and the top-k reasons."""
+    features = original_features(pipeline)
+    phi, expected = growth_score_shap(pipeline, df)
+
+    out = pd.DataFrame({"MSME_ID": df["MSME_ID"].to_numpy()})
+    out["Growth_Score"] = (expected + phi.sum(axis=1)).astype(np.float32)
+    out["SHAP_Base"] = np.float32(expected)
+    for i, feature in enumerate(features):
+        out[f"SHAP_{feature}"] = phi[:, i].astype(np.float32)
+
+    top = np.argsort(-np.abs(phi), axis=1, kind="stable")[:, :top_k]
+    names = np.asarray(features, dtype=object)
+    for r in range(top.shape[1]):
+        out[f"Reason_{r + 1}"] = names[top[:, r]]
+        out[f"Reason_{r + 1}_Impact"] = np.take_along_axis(phi, top[:, r:r + 1], axis=1)[:, 0].astype(np.float32)
+    return out
+
+
+_worker_pipeline = None
+
+
+def _load_worker_pipeline(path: str) -> None:
+    global _worker_pipeline
+    _worker_pipeline = load_pipeline(path)
+
+
+def _attribute_chunk(chunk: pd.DataFrame, top_k: int) -> pd.DataFrame:
+    return attribution_frame(_worker_pipeline, chunk, top_k)
+
+
+def attribute_in_order(chunks, path: str = PIPELINE_MODEL_PATH, top_k: int = DEFAULT_TOP_K, workers: int = 1):
+    """
+    Yield attribution_frame() for each chunk, in input order. With
+    workers > 1 each worker process loads the model once and at most
+    2 x workers chunks are in flight.
+    """
+    if workers <= 1:
+        pipeline = load_pipeline(path)
+        for chunk in chunks:
+            yield attribution_frame(pipeline, chunk, top_k)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker_pipeline,
+                             initargs=(path,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_attribute_chunk, chunk, top_k))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_pipeline(path: str = PIPELINE_MODEL_PATH):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"'{path}' not found. Run growth_model.py (Phase 2) first.")
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+# ---------------------------------------------------------------------------
+# 3. LOOKUP
+# ---------------------------------------------------------------------------
+
+class AttributionStore:
+    """
+    In-memory view of the attribution table: MSME_ID -> row position, with
+    the SHAP columns as one float32 matrix, so explain() is a dict lookup
+    and a row slice.
+    """
+
+    def __init__(self, name: str = ATTRIBUTIONS_TABLE, fmt: str | None = DEFAULT_FORMAT):
+        df = read_table(name, fmt)
+        shap_cols = [c for c in df.columns if c.startswith("SHAP_") and c != "SHAP_Base"]
+        reason_cols = [c for c in df.columns if c.startswith("Reason_") and not c.endswith("_Impact")]
+        self.features = [c[len("SHAP_"):] for c in shap_cols]
+        self.position = {msme_id: i for i, msme_id in enumerate(df["MSME_ID"])}
+        self.values = df[shap_cols].to_numpy(dtype=np.float32)
+        self.growth_score = df["Growth_Score"].to_numpy(dtype=np.float32)
+        self.base = df["SHAP_Base"].to_numpy(dtype=np.float32)
+        self.reasons = df[reason_cols].to_numpy(dtype=object)
+        self.impacts = df[[f"{c}_Impact" for c in reason_cols]].to_numpy(dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    def explain(self, msme_id: str) -> dict | None:
+        i = self.position.get(msme_id)
+        if i is None:
+            return None
+        return {
+            "MSME_ID": msme_id,
+            "Growth_Score": float(self.growth_score[i]),
+            "base": float(self.base[i]),
+            "contributions": dict(zip(self.features, self.values[i].tolist())),
+            "reasons": [{"feature": f, "impact": float(v)} for f, v in zip(self.reasons[i], self.impacts[i])],
+        }
+
+
+# ---------------------------------------------------------------------------
+# 4. CLI
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Phase 2: precompute SHAP attributions of Growth_Score")
+    parser.add_argument(
+        "--top-k", type=int, default=DEFAULT_TOP_K,
+        help=f"Reasons stored per MSME, by absolute contribution. Default: {DEFAULT_TOP_K}"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"MSMEs per task (bounds memory). Default: {DEFAULT_CHUNK_SIZE}"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes; output keeps input order. Default: 1"
+    )
+    parser.add_argument(
+        "--model", default=PIPELINE_MODEL_PATH,
+        help="Pickled pipeline written by growth_model.py."
+    )
+    parser.add_argument(
+        "--input-format", choices=list(FORMATS), default=None,
+        help="Format of data/msme_data (default: CHAOSZEN_STORAGE_FORMAT or csv)."
+    )
+    parser.add_argument(
+        "--storage-format", choices=list(FORMATS), default=DEFAULT_FORMAT,
+        help=f"Format of the attribution table written. Default: {DEFAULT_FORMAT}"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    t0 = time.perf_counter()
+    chunks = iter_table_chunks("msme_data", args.chunk_size, args.input_format)
+    with TableAppender(ATTRIBUTIONS_TABLE, args.storage_format) as out:
+        for frame in attribute_in_order(chunks, args.model, args.top_k, args.workers):
+            out.append(frame)
+    print(f"SHAP attributions for {out.rows:,} MSMEs computed in {time.perf_counter() - t0:.2f}s "
+          f"-> '{out.path}'")
+
+
+if __name__ == "__main__":
+    main()
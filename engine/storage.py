@@ -0,0 +1,320 @@
+"""
+Pipeline Storage Layer
+======================
+Reads and writes the tables passed between engine stages in data/
+(msme_data, schemes_data, msme_predictions, scheme_eligibility_results,
+optimization_results) in one of three formats:
+
+  - csv      : default; what the backend API and dashboard read
+  - parquet  : typed columnar storage, dictionary-encoded categoricals,
+               column projection and predicate pushdown
+  - feather  : Arrow IPC (Feather v2) file, same projection and pushdown
+
+The format is chosen per call, or globally with the CHAOSZEN_STORAGE_FORMAT
+environment variable; CHAOSZEN_DATA_DIR points the stages at another data
+directory (e.g. a load-test registry). Columnar formats need pyarrow
+(pip install pyarrow).
+
+Usage:
+    from storage import read_table, write_table
+    df = read_table("scheme_eligibility_results",
+                    columns=["MSME_ID", "Subsidy_Applied"],
+                    filters=[("Simulation_Type", "==", "Single_Scheme")])
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+
+DEFAULT_FORMAT = os.environ.get("CHAOSZEN_STORAGE_FORMAT", "csv").lower()
+
+# Low-cardinality string columns stored dictionary-encoded in columnar formats
+CATEGORICAL_COLUMNS = [
+    "Sector", "Category", "Location_Type", "Ownership_Type",
+    "Growth_Category", "Predicted_Growth_Category",
+    "Scheme_ID", "Scheme_Name", "Simulation_Type",
+]
+
+# Comparison operators accepted in filters=[(column, op, value), ...]
+_OPERATORS = {
+    "==": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v,
+    "in": lambda s, v: s.isin(v),
+}
+
+
+def data_dir() -> str:
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.environ.get("CHAOSZEN_DATA_DIR") or os.path.join(base_dir, "data")
+
+
+def resolve_format(fmt: str | None = None) -> str:
+    fmt = (fmt or DEFAULT_FORMAT).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown storage format '{fmt}'. Choose from: {', '.join(FORMATS)}.")
+    return fmt
+
+
+def table_path(name: str, fmt: str | None = None) -> str:
+    """Path of table `name` (e.g. 'msme_data') in data/ for the given format."""
+    return os.path.join(data_dir(), name + FORMATS[resolve_format(fmt)])
+
+
+def _require_pyarrow(fmt: str):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            f"The '{fmt}' storage format requires pyarrow. Install it with: pip install pyarrow"
+        ) from exc
+
+
+def _to_arrow(df: pd.DataFrame, encode_categoricals: bool = True):
+    import pyarrow as pa
+
+    if encode_categoricals:
+        df = df.astype({c: "category" for c in CATEGORICAL_COLUMNS if c in df.columns})
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _filter_expression(filters):
+    import pyarrow.dataset as ds
+
+    expr = None
+    for column, op, value in filters:
+        field = ds.field(column)
+        term = field.isin(value) if op == "in" else _OPERATORS[op](field, value)
+        expr = term if expr is None else expr & term
+    return expr
+
+
+def _dataset(path: str, fmt: str):
+    import pyarrow.dataset as ds
+
+    return ds.dataset(path, format="parquet" if fmt == "parquet" else "ipc")
+
+
+def _encode_categoricals(table):
+    """Dictionary-encode categorical string columns so they load as pandas categoricals."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    for i, field in enumerate(table.schema):
+        if field.name in CATEGORICAL_COLUMNS and not pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, pc.dictionary_encode(table.column(i)))
+    return table
+
+
+# ---------------------------------------------------------------------------
+# READ / WRITE
+# ---------------------------------------------------------------------------
+
+def write_table(df: pd.DataFrame, name: str, fmt: str | None = None) -> str:
+    """Write df as table `name`; returns the path written."""
+    fmt = resolve_format(fmt)
+    path = table_path(name, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return path
+
+    _require_pyarrow(fmt)
+    table = _to_arrow(df)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, path)
+    return path
+
+
+def read_table(name: str, fmt: str | None = None, columns: list[str] | None = None,
+               filters: list[tuple] | None = None) -> pd.DataFrame:
+    """
+    Read table `name`.
+
+    columns : only load these columns (projection)
+    filters : [(column, op, value), ...] AND-ed together; op is one of
+              ==, !=, <, <=, >, >=, in. Pushed down into the scan for
+              columnar formats, applied after parsing for CSV.
+    """
+    fmt = resolve_format(fmt)
+    path = table_path(name, fmt)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Cannot find {path}.")
+
+    if fmt == "csv":
+        usecols = None
+        if columns is not None:
+            usecols = list(dict.fromkeys(list(columns) + [c for c, _, _ in filters or []]))
+        df = pd.read_csv(path, usecols=usecols)
+        for column, op, value in filters or []:
+            df = df[_OPERATORS[op](df[column], value)]
+        if filters:
+            df = df.reset_index(drop=True)
+        return df if columns is None else df[list(columns)]
+
+    _require_pyarrow(fmt)
+    table = _dataset(path, fmt).to_table(
+        columns=columns,
+        filter=_filter_expression(filters) if filters else None,
+    )
+    return _encode_categoricals(table).to_pandas()
+
+
+def iter_table_chunks(name: str, chunk_size: int, fmt: str | None = None,
+                      columns: list[str] | None = None):
+    """Yield table `name` as DataFrames of at most chunk_size rows."""
+    fmt = resolve_format(fmt)
+    path = table_path(name, fmt)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Cannot find {path}.")
+
+    if fmt == "csv":
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+        return
+
+    _require_pyarrow(fmt)
+    import pyarrow as pa
+
+    for batch in _dataset(path, fmt).to_batches(columns=columns, batch_size=chunk_size):
+        if batch.num_rows:
+            yield _encode_categoricals(pa.Table.from_batches([batch])).to_pandas()
+
+
+def csv_row_offsets(path: str, block_size: int = 1 << 26) -> np.ndarray:
+    """
+    Byte offset of every data row of a CSV file, followed by the file size,
+    so row i spans [offsets[i], offsets[i + 1]). Assumes no quoted newlines
+    (callers check the count against the parsed row count).
+    """
+    starts = [np.zeros(0, dtype=np.int64)]
+    position = 0
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            starts.append(np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10) + position + 1)
+            position += len(block)
+    # A line starts after every newline; the header's newline opens row 0
+    starts = np.concatenate(starts)
+    if not len(starts) or starts[-1] != position:
+        starts = np.append(starts, position)
+    return starts
+
+
+def storage_units(name: str, fmt: str | None = None) -> np.ndarray:
+    """
+    Row count of each storage unit of a columnar table, in order: parquet
+    row groups or feather (Arrow IPC) record batches.
+    """
+    fmt = resolve_format(fmt)
+    if fmt == "csv":
+        raise ValueError("CSV tables have no storage units; use csv_row_offsets().")
+    _require_pyarrow(fmt)
+    path = table_path(name, fmt)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        meta = pq.ParquetFile(path).metadata
+        return np.array([meta.row_group(i).num_rows for i in range(meta.num_row_groups)], dtype=np.int64)
+
+    import pyarrow as pa
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        return np.array([reader.get_batch(i).num_rows for i in range(reader.num_record_batches)],
+                        dtype=np.int64)
+
+
+def read_unit_rows(name: str, fmt: str | None, unit: int, skip: int, rows: int) -> pd.DataFrame:
+    """
+    `rows` rows of a columnar table starting `skip` rows into storage unit
+    `unit` (see storage_units()), reading only the units they span.
+    """
+    fmt = resolve_format(fmt)
+    if fmt == "csv":
+        raise ValueError("CSV tables have no storage units; seek with csv_row_offsets().")
+    _require_pyarrow(fmt)
+    import pyarrow as pa
+
+    path = table_path(name, fmt)
+    parts = []
+    with pa.memory_map(path) as source:
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            file = pq.ParquetFile(source)
+            read_unit, n_units, schema = file.read_row_group, file.num_row_groups, file.schema_arrow
+        else:
+            reader = pa.ipc.open_file(source)
+            read_unit, n_units, schema = reader.get_batch, reader.num_record_batches, reader.schema
+        while rows > 0 and unit < n_units:
+            part = read_unit(unit).slice(skip, rows)
+            parts.append(part if isinstance(part, pa.Table) else pa.Table.from_batches([part]))
+            rows -= part.num_rows
+            unit, skip = unit + 1, 0
+        table = pa.concat_tables(parts) if parts else schema.empty_table()
+        return _encode_categoricals(table).to_pandas()
+
+
+class TableAppender:
+    """
+    Incrementally write a table chunk by chunk (used by streaming stages).
+
+        with TableAppender("scheme_eligibility_results") as out:
+            for chunk in chunks:
+                out.append(chunk)
+
+    Chunks must share the same columns and dtypes. Columnar chunks are
+    written as plain strings because each chunk would otherwise carry its own
+    dictionary; parquet still dictionary-encodes them on disk and readers
+    re-encode them on load.
+    """
+
+    def __init__(self, name: str, fmt: str | None = None):
+        self.fmt = resolve_format(fmt)
+        self.path = table_path(name, self.fmt)
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        if self.fmt != "csv":
+            _require_pyarrow(self.fmt)
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if self.fmt == "csv":
+            self._file = open(self.path, "w", encoding="utf-8", newline="")
+        return self
+
+    def append(self, df: pd.DataFrame) -> None:
+        if self.fmt == "csv":
+            df.to_csv(self._file, index=False, header=(self.rows == 0 and self._file.tell() == 0))
+        else:
+            table = _to_arrow(df, encode_categoricals=False)
+            if self._writer is None:
+                self._writer = self._open_writer(table.schema)
+            self._writer.write_table(table)
+        self.rows += len(df)
+
+    def _open_writer(self, schema):
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.path, schema)
+        import pyarrow as pa
+        return pa.ipc.new_file(self.path, schema)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._file is not None:
+            self._file.close()
+        if self._writer is not None:
+            self._writer.close()
+        return False